@@ -0,0 +1,53 @@
+"""Benchmark streamed csv output with and without background prefetch.
+
+The fake cursor sleeps once per Trino page to stand in for the HTTP round
+trip, so the numbers show how much of the fetch time the prefetch thread
+hides behind encoding. Run with ``python benchmarks/bench_prefetch.py``.
+"""
+
+import io
+import time
+
+from adt_dummy.core.output import write_stream
+from adt_dummy.services import trino
+
+PAGE_ROWS = 5_000
+PAGE_LATENCY = 0.02
+
+
+class SlowCursor:
+    description = [("id", "bigint"), ("name", "varchar"), ("score", "double"), ("day", "date")]
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.position = 0
+        self.fetched = 0
+
+    def fetchmany(self, size):
+        end = min(self.position + size, len(self.rows))
+        while self.fetched < end:
+            time.sleep(PAGE_LATENCY)
+            self.fetched += PAGE_ROWS
+        batch = self.rows[self.position : end]
+        self.position = end
+        return batch
+
+
+def _run(rows, prefetch):
+    batches = trino.RowBatches(SlowCursor(rows), max_rows=0, prefetch=prefetch)
+    start = time.perf_counter()
+    write_stream(batches.columns, batches, "csv", io.BytesIO(), types=batches.types)
+    return time.perf_counter() - start
+
+
+def main():
+    rows = [[i, f"name {i}", i * 0.5, "2024-01-01"] for i in range(500_000)]
+    fetch_only = (len(rows) // PAGE_ROWS) * PAGE_LATENCY
+    print(f"{len(rows)} rows, simulated fetch time {fetch_only * 1000:.0f} ms")
+    for prefetch in (0, 2, 8, 16):
+        elapsed = _run(rows, prefetch)
+        print(f"prefetch {prefetch}: {elapsed * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Benchmark the read-only SQL check on large generated scripts.
+
+Run with ``python benchmarks/bench_sql_lexer.py``.
+"""
+
+import time
+
+from adt_dummy.services import trino
+
+
+def _values_script(rows):
+    values = ",\n".join(f"({i}, 'name ''{i}''', {i * 0.5}, DATE '2024-01-01')" for i in range(rows))
+    return f"-- generated\nSELECT * FROM (VALUES {values}) AS t(id, name, score, day)"
+
+
+def _in_list_script(items, statements):
+    in_list = ", ".join(str(i) for i in range(items))
+    statement = f"SELECT /* check */ count(*) FROM events WHERE id IN ({in_list})"
+    return ";\n".join([statement] * statements)
+
+
+def _best_of(func, arg, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    cases = [
+        ("VALUES list", _values_script(100_000)),
+        ("IN lists", _in_list_script(50_000, 10)),
+    ]
+    for name, sql in cases:
+        size_mb = len(sql) / (1024 * 1024)
+        elapsed = _best_of(trino.is_read_only_sql, sql)
+        print(f"{name:12s} {size_mb:6.2f} MB  is_read_only_sql {elapsed * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,18 @@
 import click
 
 from adt_dummy import __version__
+from adt_dummy.commands.agent import agent_cmd, agent_remote_cmd
+from adt_dummy.commands.bench import bench_cmd, bench_remote_cmd
 from adt_dummy.commands.doctor import doctor_cmd, doctor_remote_cmd
+from adt_dummy.commands.load import load_remote_cmd
+from adt_dummy.commands.meta import meta_cmd, meta_remote_cmd
 from adt_dummy.commands.net import net_cmd, net_remote_cmd
 from adt_dummy.commands.py import py_cmd, py_remote_cmd
 from adt_dummy.commands.query import query_cmd, query_remote_cmd
+from adt_dummy.commands.server import server_remote_cmd
 from adt_dummy.commands.shell import shell_cmd, shell_remote_cmd
+from adt_dummy.commands.sql import session_remote_cmd, sql_cmd
+from adt_dummy.core import transport
 from adt_dummy.core.env import is_in_cluster
 from adt_dummy.core.errors import AppError
 
@@ -20,8 +27,11 @@ def cli(ctx):
 
 
 @cli.group(name="__remote", hidden=True)
-def remote_group():
-    pass
+@click.option(transport.FLAG, "compression", hidden=True)
+@click.pass_context
+def remote_group(ctx, compression):
+    if compression:
+        ctx.call_on_close(transport.install(compression))
 
 
 cli.add_command(doctor_cmd)
@@ -29,12 +39,22 @@ cli.add_command(shell_cmd)
 cli.add_command(query_cmd)
 cli.add_command(net_cmd)
 cli.add_command(py_cmd)
+cli.add_command(bench_cmd)
+cli.add_command(meta_cmd)
+cli.add_command(sql_cmd)
+cli.add_command(agent_cmd)
 
 remote_group.add_command(doctor_remote_cmd)
 remote_group.add_command(shell_remote_cmd)
 remote_group.add_command(query_remote_cmd)
 remote_group.add_command(net_remote_cmd)
 remote_group.add_command(py_remote_cmd)
+remote_group.add_command(server_remote_cmd)
+remote_group.add_command(bench_remote_cmd)
+remote_group.add_command(meta_remote_cmd)
+remote_group.add_command(session_remote_cmd)
+remote_group.add_command(agent_remote_cmd)
+remote_group.add_command(load_remote_cmd)
 
 
 def main():
@@ -0,0 +1,121 @@
+"""Local agent commands."""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+import click
+
+from adt_dummy.core import env
+from adt_dummy.core.cache import cache_root
+from adt_dummy.core.errors import AppError
+from adt_dummy.local import agent_target, remote_exec_cmd
+from adt_dummy.services import agent as agent_service
+
+START_COMMAND = [sys.executable, "-c", "from adt_dummy.cli import main; main()", "agent", "run"]
+
+
+def _exec_timeout():
+    return env.get_int_env("ADT_DUMMY_EXEC_TIMEOUT_SECONDS", default=60)
+
+
+def _local_only(ctx):
+    if ctx.obj.get("in_cluster"):
+        raise AppError("dami agent runs on the laptop; in the pod use dami __remote server.")
+
+
+def _show_status(status):
+    pod = status["pod"] or "not connected"
+    click.echo(f"Agent {status['pid']} on {status['socket']}")
+    click.echo(f"Pod: {pod}")
+    target = status.get("target")
+    if target:
+        click.echo(f"Context: {target['context']}, namespace: {target['namespace']}")
+    click.echo(
+        f"Requests: {status['requests']} ({status['active']} running), "
+        f"up {status['uptime_seconds']:.0f}s"
+    )
+
+
+@click.group(name="agent")
+def agent_cmd():
+    pass
+
+
+@agent_cmd.command(name="run")
+@click.pass_context
+def agent_run_cmd(ctx):
+    _local_only(ctx)
+    path = agent_service.socket_path()
+    if agent_service.request("status", path) is not None:
+        raise AppError(f"An agent is already listening on {path}")
+    target = agent_target()
+    # Pin the context, so workers started after a context switch stay on the target.
+    os.environ["ADT_DUMMY_KUBECTL_CONTEXT"] = target["context"]
+    agent = agent_service.Agent(
+        lambda: remote_exec_cmd(["dami", "__remote", "agent"]), _exec_timeout(), target
+    )
+    try:
+        click.echo(f"Connected to pod {agent.worker().pod}", err=True)
+    except AppError as exc:
+        click.echo(f"Warning: {exc} Retrying on the next request.", err=True)
+    click.echo(f"Agent listening on {path}", err=True)
+    agent_service.serve(agent, path)
+
+
+@agent_cmd.command(name="start")
+@click.pass_context
+def agent_start_cmd(ctx):
+    _local_only(ctx)
+    status = agent_service.request("status")
+    if status is not None:
+        _show_status(status)
+        return
+    log_path = cache_root() / "agent.log"
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_path, "ab") as log:
+        process = subprocess.Popen(
+            START_COMMAND,
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            start_new_session=True,
+        )
+    deadline = time.monotonic() + _exec_timeout()
+    while time.monotonic() < deadline:
+        status = agent_service.request("status")
+        if status is not None:
+            _show_status(status)
+            return
+        if process.poll() is not None:
+            break
+        time.sleep(0.1)
+    raise AppError(f"The agent did not start. See {log_path}")
+
+
+@agent_cmd.command(name="status")
+@click.option("--json", "as_json", is_flag=True, default=False)
+def agent_status_cmd(as_json):
+    status = agent_service.request("status")
+    if status is None:
+        raise AppError("No agent is running. Start one with: dami agent start")
+    if as_json:
+        click.echo(json.dumps(status))
+    else:
+        _show_status(status)
+
+
+@agent_cmd.command(name="stop")
+def agent_stop_cmd():
+    if agent_service.request("stop") is None:
+        raise AppError("No agent is running.")
+    click.echo("Agent stopped.")
+
+
+@click.command(name="agent")
+@click.option("--pool-size", type=int)
+@click.pass_context
+def agent_remote_cmd(ctx, pool_size):
+    agent_service.work(ctx.parent.command, sys.stdin.buffer, sys.stdout.buffer, pool_size=pool_size)
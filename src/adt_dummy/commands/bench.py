@@ -0,0 +1,190 @@
+"""Benchmark command group."""
+
+import json
+import time
+from pathlib import Path
+
+import click
+
+from adt_dummy.core import control
+from adt_dummy.core.errors import AppError
+from adt_dummy.local import proxy_to_remote
+from adt_dummy.services import bench as bench_service
+from adt_dummy.services import trino
+
+
+class _TimingSink:
+    """Discards proxied output while timing its first byte and counting lines."""
+
+    def __init__(self, started):
+        self.started = started
+        self.first_byte = None
+        self.lines = 0
+
+    def write(self, data):
+        if self.first_byte is None:
+            self.first_byte = time.perf_counter() - self.started
+        self.lines += data.count(b"\n")
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+def _load_sql(sql, file_path, stdin=False):
+    if sum([bool(sql), bool(file_path), stdin]) != 1:
+        raise AppError("Provide SQL via argument or --file.")
+    if stdin:
+        return click.get_text_stream("stdin").read()
+    if file_path:
+        return Path(file_path).read_text()
+    return sql
+
+
+def _validate(iterations, warmup, concurrency):
+    if iterations < 1:
+        raise AppError("--iterations must be >= 1")
+    if warmup < 0:
+        raise AppError("--warmup must be >= 0")
+    if concurrency < 1:
+        raise AppError("--concurrency must be >= 1")
+
+
+def _resolve(sql_text, params):
+    sql_text = trino.apply_params(sql_text, trino.parse_params(params))
+    trino.ensure_read_only(sql_text)
+    return sql_text
+
+
+def _run_in_cluster(sql_text, iterations, warmup, concurrency, max_rows):
+    def _on_run(number, run):
+        click.echo(bench_service.format_run(number, iterations, run))
+
+    return bench_service.run_benchmark(
+        sql_text,
+        iterations=iterations,
+        warmup=warmup,
+        concurrency=concurrency,
+        max_rows=max_rows,
+        on_run=_on_run,
+    )
+
+
+def _proxy_runs(sql_text, params, max_rows, runs):
+    """Time full ``dami query`` round trips through kubectl exec."""
+    args = ["dami", "__remote", "query", "--stdin", "--format", "csv", "--max-rows", str(max_rows)]
+    for item in params:
+        args += ["--param", item]
+    results = []
+    started = time.perf_counter()
+    for number in range(1, runs + 1):
+        run_started = time.perf_counter()
+        sink = _TimingSink(run_started)
+        try:
+            proxy_to_remote(args, stdin_data=sql_text, stream_to=sink)
+        except AppError as exc:
+            run = {"error": str(exc), "total_seconds": time.perf_counter() - run_started}
+        else:
+            total = time.perf_counter() - run_started
+            run = {
+                "first_row_seconds": total if sink.first_byte is None else sink.first_byte,
+                "total_seconds": total,
+                "rows": max(sink.lines - 1, 0),
+                "bytes": 0,
+            }
+        results.append(run)
+        click.echo(bench_service.format_run(number, runs, run, label="proxy run"))
+    wall = time.perf_counter() - started
+    return bench_service.build_report(results, wall, iterations=runs, warmup=0, concurrency=1)
+
+
+def _overhead(in_cluster, proxy):
+    return {key: proxy[key]["p50"] - in_cluster[key]["p50"] for key in ("first_row", "total")}
+
+
+def _print_summary(result):
+    click.echo(bench_service.format_report(result["in_cluster"]))
+    if result.get("proxy"):
+        click.echo(bench_service.format_report(result["proxy"], title="proxy"))
+        overhead = result["proxy_overhead"]
+        click.echo(
+            f"proxy overhead (p50): first row {overhead['first_row'] * 1000:.1f} ms, "
+            f"total {overhead['total'] * 1000:.1f} ms"
+        )
+
+
+@click.group(name="bench")
+def bench_cmd():
+    pass
+
+
+@bench_cmd.command(name="query")
+@click.option("-f", "--file", "file_path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--param", "params", multiple=True)
+@click.option("-n", "--iterations", type=int, default=10)
+@click.option("--warmup", type=int, default=1)
+@click.option("--concurrency", type=int, default=1)
+@click.option("--max-rows", type=int, default=0)
+@click.option("--proxy-runs", type=int, default=3)
+@click.option("--json", "json_path", type=click.Path(dir_okay=False))
+@click.argument("sql", required=False)
+@click.pass_context
+def bench_query_cmd(
+    ctx, file_path, params, iterations, warmup, concurrency, max_rows, proxy_runs, json_path, sql
+):
+    _validate(iterations, warmup, concurrency)
+    sql_text = _load_sql(sql, file_path)
+    result = {"sql": sql_text, "params": list(params)}
+
+    if ctx.obj.get("in_cluster"):
+        resolved = _resolve(sql_text, params)
+        result["in_cluster"] = _run_in_cluster(resolved, iterations, warmup, concurrency, max_rows)
+    else:
+        _resolve(sql_text, params)
+        args = ["dami", "__remote", "bench", "query", "--stdin"]
+        args += ["--iterations", str(iterations), "--warmup", str(warmup)]
+        args += ["--concurrency", str(concurrency), "--max-rows", str(max_rows)]
+        for item in params:
+            args += ["--param", item]
+        controls = control.ControlCollector()
+        proxy_to_remote(
+            args,
+            stdin_data=sql_text,
+            stream_to=click.get_binary_stream("stdout"),
+            on_control=controls,
+        )
+        report = controls.get("bench")
+        if report is None:
+            raise AppError("The pod did not report benchmark results.")
+        result["in_cluster"] = report
+        if proxy_runs > 0:
+            result["proxy"] = _proxy_runs(sql_text, params, max_rows, proxy_runs)
+            result["proxy_overhead"] = _overhead(report, result["proxy"])
+
+    _print_summary(result)
+    if json_path:
+        Path(json_path).write_text(json.dumps(result, indent=2) + "\n")
+        click.echo(f"Wrote results to {json_path}")
+
+
+@click.group(name="bench")
+def bench_remote_cmd():
+    pass
+
+
+@bench_remote_cmd.command(name="query")
+@click.option("-f", "--file", "file_path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--param", "params", multiple=True)
+@click.option("-n", "--iterations", type=int, default=10)
+@click.option("--warmup", type=int, default=1)
+@click.option("--concurrency", type=int, default=1)
+@click.option("--max-rows", type=int, default=0)
+@click.option("--stdin", is_flag=True, hidden=True)
+@click.argument("sql", required=False)
+def bench_query_remote_cmd(
+    file_path, params, iterations, warmup, concurrency, max_rows, stdin, sql
+):
+    _validate(iterations, warmup, concurrency)
+    sql_text = _resolve(_load_sql(sql, file_path, stdin=stdin), params)
+    report = _run_in_cluster(sql_text, iterations, warmup, concurrency, max_rows)
+    control.emit("bench", report)
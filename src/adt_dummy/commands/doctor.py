@@ -5,7 +5,7 @@ import click
 from adt_dummy.core import env
 from adt_dummy.core.errors import AppError
 from adt_dummy.core.proc import which_or_error
-from adt_dummy.k8s import can_exec, find_pod, get_current_context
+from adt_dummy.k8s import api_client, can_exec, find_pod, get_current_context
 
 
 def _check_trino_env():
@@ -27,10 +27,14 @@ def _doctor_local():
     explicit_pod = env.get_env("ADT_DUMMY_POD", default=None)
     exec_timeout = env.get_int_env("ADT_DUMMY_EXEC_TIMEOUT_SECONDS", default=60)
 
-    kubectl = env.get_env("ADT_DUMMY_KUBECTL_BIN", default="kubectl")
-    kubectl_path = which_or_error(kubectl)
+    client = api_client()
     click.echo("Mode: local")
-    click.echo(f"kubectl: {kubectl_path}")
+    if client is not None:
+        click.echo(f"Kubernetes API: {client.server}")
+    else:
+        kubectl = env.get_env("ADT_DUMMY_KUBECTL_BIN", default="kubectl")
+        kubectl_path = which_or_error(kubectl)
+        click.echo(f"kubectl: {kubectl_path}")
 
     context = get_current_context()
     click.echo(f"Context: {context}")
@@ -44,7 +48,7 @@ def _doctor_local():
 
     auth = can_exec(namespace)
     if auth:
-        click.echo(f"kubectl auth can-i create pods/exec: {auth}")
+        click.echo(f"can-i create pods/exec: {auth}")
 
 
 def _doctor_remote():
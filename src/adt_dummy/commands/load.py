@@ -0,0 +1,12 @@
+"""Pod load probe command."""
+
+import json
+
+import click
+
+from adt_dummy.services import load
+
+
+@click.command(name="load")
+def load_remote_cmd():
+    click.echo(json.dumps(load.snapshot()))
@@ -0,0 +1,166 @@
+"""Metadata discovery commands backed by a local cache."""
+
+import json
+import sqlite3
+
+import click
+
+from adt_dummy.core.errors import AppError
+from adt_dummy.core.output import format_output
+from adt_dummy.local import proxy_to_remote
+from adt_dummy.services import meta
+
+FORMATS = ["table", "csv", "json", "jsonl"]
+
+
+def _load(ctx, cache, levels, catalog=None, schemas=()):
+    """Fetch ``levels`` from Trino (through the pod when local) into ``cache``."""
+    sink = meta.RecordSink(cache)
+    if ctx.obj.get("in_cluster"):
+        for record in meta.load(levels, catalog, schemas):
+            sink.add(record)
+        return sink.counts
+    args = ["dami", "__remote", "meta", "load"]
+    for level in levels:
+        args += ["--level", level]
+    if catalog:
+        args += ["--catalog", catalog]
+    for schema in schemas:
+        args += ["--schema", schema]
+    proxy_to_remote(args, stream_to=sink)
+    return sink.counts
+
+
+def _show(columns, rows, fmt):
+    click.echo(format_output(columns, rows, fmt))
+
+
+def _complete(method):
+    """Shell completion from the cache only; never calls the pod."""
+
+    def complete(ctx, param, incomplete):
+        try:
+            with meta.metadata_cache() as cache:
+                return getattr(cache, method)(incomplete.lower())
+        except (AppError, OSError, sqlite3.Error):
+            return []
+
+    return complete
+
+
+_format_option = click.option("--format", "fmt", type=click.Choice(FORMATS), default="table")
+_refresh_option = click.option("--refresh", is_flag=True, default=False)
+
+
+@click.group(name="meta")
+def meta_cmd():
+    pass
+
+
+@meta_cmd.command(name="catalogs")
+@_format_option
+@_refresh_option
+@click.pass_context
+def meta_catalogs_cmd(ctx, fmt, refresh):
+    with meta.metadata_cache() as cache:
+        if refresh or not cache.is_fresh("catalogs"):
+            _load(ctx, cache, ["catalogs"])
+        _show(["catalog"], cache.catalogs(), fmt)
+
+
+@meta_cmd.command(name="schemas")
+@_format_option
+@_refresh_option
+@click.argument("catalog", shell_complete=_complete("complete_catalogs"))
+@click.pass_context
+def meta_schemas_cmd(ctx, fmt, refresh, catalog):
+    (catalog,) = meta.split_name(catalog, 1)
+    with meta.metadata_cache() as cache:
+        if refresh or not cache.is_fresh("schemas", catalog):
+            _load(ctx, cache, ["schemas"], catalog)
+        _show(["schema"], cache.schemas(catalog), fmt)
+
+
+@meta_cmd.command(name="tables")
+@_format_option
+@_refresh_option
+@click.argument("schema", metavar="CATALOG.SCHEMA", shell_complete=_complete("complete_schemas"))
+@click.pass_context
+def meta_tables_cmd(ctx, fmt, refresh, schema):
+    catalog, schema = meta.split_name(schema, 2)
+    with meta.metadata_cache() as cache:
+        if refresh or not cache.is_fresh("tables", catalog, schema):
+            _load(ctx, cache, ["tables"], catalog, [schema])
+        _show(["table", "type"], cache.tables(catalog, schema), fmt)
+
+
+@meta_cmd.command(name="columns")
+@_format_option
+@_refresh_option
+@click.argument(
+    "table", metavar="CATALOG.SCHEMA.TABLE", shell_complete=_complete("complete_tables")
+)
+@click.pass_context
+def meta_columns_cmd(ctx, fmt, refresh, table):
+    catalog, schema, name = meta.split_name(table, 3)
+    with meta.metadata_cache() as cache:
+        if refresh or not cache.is_fresh("columns", catalog, schema):
+            _load(ctx, cache, ["columns"], catalog, [schema])
+        rows = cache.columns(catalog, schema, name)
+        if not rows:
+            raise AppError(f"Table not found: {catalog}.{schema}.{name}")
+        _show(["column", "type"], rows, fmt)
+
+
+@meta_cmd.command(name="search")
+@_format_option
+@click.option("--catalog", shell_complete=_complete("complete_catalogs"))
+@click.option("--limit", type=int, default=100)
+@click.argument("text")
+def meta_search_cmd(fmt, catalog, limit, text):
+    if limit < 0:
+        raise AppError("--limit must be >= 0")
+    with meta.metadata_cache() as cache:
+        rows = cache.search(text, catalog=catalog.lower() if catalog else None, limit=limit)
+    if not rows:
+        click.echo(
+            f"No cached column matches {text!r}. Load a catalog with: dami meta refresh CATALOG",
+            err=True,
+        )
+        return
+    _show(["catalog", "schema", "table", "column", "type"], rows, fmt)
+    if limit and len(rows) == limit:
+        click.echo(f"Showing the first {limit} matches. Use --limit 0 for all.", err=True)
+
+
+@meta_cmd.command(name="refresh")
+@click.option("--schema", "schemas", multiple=True)
+@click.argument("catalog", required=False, shell_complete=_complete("complete_catalogs"))
+@click.pass_context
+def meta_refresh_cmd(ctx, schemas, catalog):
+    with meta.metadata_cache() as cache:
+        if not catalog:
+            if schemas:
+                raise AppError("--schema needs a CATALOG.")
+            _load(ctx, cache, ["catalogs"])
+            click.echo(f"Loaded {len(cache.catalogs())} catalogs.")
+            return
+        (catalog,) = meta.split_name(catalog, 1)
+        schemas = [schema.lower() for schema in schemas]
+        levels = ["tables", "columns"] if schemas else ["schemas", "tables", "columns"]
+        counts = _load(ctx, cache, levels, catalog, schemas)
+    click.echo(f"Loaded tables and columns of {counts['columns']} schemas in {catalog}.")
+
+
+@click.group(name="meta")
+def meta_remote_cmd():
+    pass
+
+
+@meta_remote_cmd.command(name="load")
+@click.option("--level", "levels", type=click.Choice(meta.LEVELS), multiple=True, required=True)
+@click.option("--catalog")
+@click.option("--schema", "schemas", multiple=True)
+def meta_load_remote_cmd(levels, catalog, schemas):
+    for record in meta.load(levels, catalog, schemas):
+        click.echo(json.dumps(record, default=str))
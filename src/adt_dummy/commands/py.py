@@ -96,7 +96,11 @@ def py_cmd(ctx, mode, path, args):
         remote_args.append("--")
         remote_args += list(args)
 
-    proxy_to_remote(["dami", "__remote"] + remote_args, stdin_data=code)
+    proxy_to_remote(
+        ["dami", "__remote"] + remote_args,
+        stdin_data=code,
+        stream_to=click.get_binary_stream("stdout"),
+    )
 
 
 @click.command(name="py")
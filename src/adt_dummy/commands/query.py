@@ -1,13 +1,131 @@
 """Query command."""
 
+import json
+import shutil
+import sys
+from contextlib import nullcontext
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional, Tuple
 
 import click
 
+from adt_dummy.core import control, env, export, wire
+from adt_dummy.core.cache import TeeSink, cache_key, cache_namespace, query_cache
 from adt_dummy.core.errors import AppError
-from adt_dummy.core.output import format_output
+from adt_dummy.core.output import (
+    BINARY_FORMATS,
+    DEFAULT_TABLE_MEMORY,
+    STREAM_FORMATS,
+    format_output,
+    replace_on_success,
+    write_stream,
+)
 from adt_dummy.local import proxy_to_remote
-from adt_dummy.services import trino
+from adt_dummy.services import profile, server, trino
+from adt_dummy.services.progress import QueryMonitor
+
+FORMATS = ["table", "csv", "json", "jsonl", "parquet", "arrow"]
+PARAM_MODES = ["text", "prepare"]
+CANCEL_GRACE_SECONDS = 30
+
+
+@dataclass
+class QueryOptions:
+    fmt: str = "table"
+    output_path: Optional[str] = None
+    max_rows: int = 200
+    params: Tuple[str, ...] = ()
+    param_mode: str = "text"
+    allow_write: bool = False
+    script: bool = False
+    parallel: int = 1
+    concurrency: int = 4
+    fetch_size: int = trino.DEFAULT_BATCH_SIZE
+    prefetch: int = trino.DEFAULT_PREFETCH
+    max_memory: int = DEFAULT_TABLE_MEMORY // (1024 * 1024)
+    sample_rows: Optional[int] = None
+    timeout: Optional[int] = None
+    progress: Optional[bool] = None
+    stats_json: Optional[str] = None
+    profile: bool = False
+    profile_json: Optional[str] = None
+    wire: bool = False
+    output_dir: Optional[str] = None
+    part_rows: int = export.DEFAULT_PART_ROWS
+    part_size: int = export.DEFAULT_PART_SIZE_MB
+    compression: Optional[str] = None
+    workers: int = export.DEFAULT_WORKERS
+
+    def remote_args(self, batch=False):
+        args = ["query", "--stdin", "--format", self.fmt, "--max-rows", str(self.max_rows)]
+        if batch:
+            args += ["--batch-stdin", "--concurrency", str(self.concurrency)]
+        if self.allow_write:
+            args.append("--allow-write")
+        if self.script:
+            args += ["--script", "--parallel", str(self.parallel)]
+        if self.fetch_size != trino.DEFAULT_BATCH_SIZE:
+            args += ["--fetch-size", str(self.fetch_size)]
+        if self.prefetch != trino.DEFAULT_PREFETCH:
+            args += ["--prefetch", str(self.prefetch)]
+        if self.max_memory != QueryOptions.max_memory:
+            args += ["--max-memory", str(self.max_memory)]
+        if self.sample_rows is not None:
+            args += ["--sample-rows", str(self.sample_rows)]
+        if self.timeout is not None:
+            args += ["--timeout", str(self.timeout)]
+        if self.progress:
+            args.append("--progress")
+        if self.stats_json:
+            args.append("--emit-stats")
+        if self.profile:
+            args.append("--profile")
+        if self.profile_json:
+            args.append("--emit-profile")
+        if self.param_mode != "text":
+            args += ["--param-mode", self.param_mode]
+        if self.wire:
+            args.append("--wire")
+        for item in self.params:
+            args += ["--param", item]
+        return args
+
+
+QUERY_OPTIONS = [
+    click.option("-f", "--file", "file_path", type=click.Path(exists=True, dir_okay=False)),
+    click.option("--format", "fmt", type=click.Choice(FORMATS), default="table"),
+    click.option("--output", "output_path", type=click.Path(dir_okay=False)),
+    click.option("--max-rows", type=int, default=200),
+    click.option("--param", "params", multiple=True),
+    click.option("--param-mode", type=click.Choice(PARAM_MODES), default="text"),
+    click.option("--allow-write", is_flag=True, default=False),
+    click.option("--script", is_flag=True, default=False),
+    click.option("--parallel", type=int, default=1),
+    click.option("--concurrency", type=int, default=4),
+    click.option("--fetch-size", type=int, default=trino.DEFAULT_BATCH_SIZE),
+    click.option("--prefetch", type=int, default=trino.DEFAULT_PREFETCH),
+    click.option(
+        "--max-memory", type=int, default=DEFAULT_TABLE_MEMORY // (1024 * 1024), metavar="MB"
+    ),
+    click.option("--sample-rows", type=int),
+    click.option("--timeout", type=int, metavar="SECONDS"),
+    click.option("--progress/--no-progress", default=None),
+    click.option("--stats-json", type=click.Path(dir_okay=False)),
+    click.option("--profile", is_flag=True, default=False),
+    click.option("--profile-json", type=click.Path(dir_okay=False)),
+    click.option("--output-dir", type=click.Path(file_okay=False)),
+    click.option("--part-rows", type=int, default=export.DEFAULT_PART_ROWS),
+    click.option("--part-size", type=int, default=export.DEFAULT_PART_SIZE_MB, metavar="MB"),
+    click.option("--compression", metavar="none|gzip|zstd[:LEVEL]"),
+    click.option("--workers", type=int, default=export.DEFAULT_WORKERS),
+]
+
+
+def _query_options(func):
+    for option in reversed(QUERY_OPTIONS):
+        func = option(func)
+    return func
 
 
 def _load_sql(sql, file_path, stdin):
@@ -29,70 +147,470 @@ def _validate_max_rows(max_rows):
         raise AppError("--max-rows must be >= 0")
 
 
-def _run_query(sql_text, params, allow_write, fmt, output_path, max_rows):
-    _validate_max_rows(max_rows)
-    parsed_params = trino.parse_params(params)
-    sql_text = trino.apply_params(sql_text, parsed_params)
-    if not allow_write:
-        trino.ensure_read_only(sql_text)
+def _validate_parallel(parallel):
+    if parallel < 1:
+        raise AppError("--parallel must be >= 1")
+
+
+def _validate_concurrency(concurrency):
+    if concurrency < 1:
+        raise AppError("--concurrency must be >= 1")
+
+
+def _load_batch(batch_path, script):
+    if script:
+        raise AppError("--batch cannot be combined with --script.")
+    return trino.parse_param_sets(Path(batch_path).read_text(), source=batch_path)
+
+
+def _validate_fetch(options):
+    if options.fetch_size < 1:
+        raise AppError("--fetch-size must be >= 1")
+    if options.prefetch < 0:
+        raise AppError("--prefetch must be >= 0")
+    if options.max_memory < 1:
+        raise AppError("--max-memory must be >= 1")
+    if options.sample_rows is not None and options.sample_rows < 1:
+        raise AppError("--sample-rows must be >= 1")
+
+
+def _validate_export(options):
+    if not options.output_dir:
+        return
+    if options.output_path:
+        raise AppError("Use either --output or --output-dir.")
+    if options.script:
+        raise AppError("--output-dir is not supported with --script.")
+    if options.fmt not in export.EXPORT_FORMATS:
+        raise AppError(
+            f"--output-dir supports --format {', '.join(export.EXPORT_FORMATS)}, not {options.fmt}."
+        )
+    if options.part_rows < 0 or options.part_size < 0:
+        raise AppError("--part-rows and --part-size must be >= 0")
+    if options.workers < 1:
+        raise AppError("--workers must be >= 1")
+    export.parse_compression(options.compression, options.fmt)
+
+
+def _query_scope(options):
+    timeout = options.timeout
+    if timeout is None:
+        timeout = env.get_int_env("ADT_DUMMY_QUERY_TIMEOUT_SECONDS", default=0)
+    if timeout < 0:
+        raise AppError("--timeout must be >= 0")
+    return trino.QueryScope(timeout=timeout or None)
+
+
+def _bind_query(sql_text, params, options):
+    """Substitute or bind ``params`` and check the result for writes."""
+    if options.param_mode == "prepare":
+        query = trino.prepare_params(sql_text, params)
+        if not options.allow_write:
+            trino.ensure_read_only_template(query.sql)
+        return query
+    query = trino.apply_params(sql_text, params)
+    if not options.allow_write:
+        trino.ensure_read_only(query)
+    return query
+
+
+def _check_binary_target(fmt, output_path):
+    if fmt in BINARY_FORMATS and not output_path and sys.stdout.isatty():
+        raise AppError(f"--format {fmt} writes binary data. Use --output or redirect stdout.")
 
-    columns, rows, truncated = trino.execute_query(sql_text, max_rows=max_rows)
-    rendered = format_output(columns, rows, fmt)
 
+def _write_json(path, data):
+    Path(path).write_text(json.dumps(data, indent=2, default=str) + "\n")
+
+
+def _write_result(batches, options):
+    """Render ``batches``, read from Trino or decoded from the pod, in ``options.fmt``."""
+    if options.output_dir:
+        manifest = export.write_parts(
+            batches,
+            options.output_dir,
+            options.fmt,
+            part_rows=options.part_rows,
+            part_bytes=options.part_size * 1024 * 1024,
+            compression=options.compression,
+            workers=options.workers,
+        )
+        click.echo(
+            f"Wrote {manifest['rows']} rows in {len(manifest['parts'])} parts to "
+            f"{options.output_dir}"
+        )
+        return
+    if options.fmt in STREAM_FORMATS:
+        table_options = {}
+        if options.fmt == "table":
+            table_options = {
+                "sample_rows": options.sample_rows,
+                "max_memory": options.max_memory * 1024 * 1024,
+            }
+        target = (
+            replace_on_success(options.output_path)
+            if options.output_path
+            else nullcontext(click.get_binary_stream("stdout"))
+        )
+        with target as sink:
+            write_stream(
+                batches.columns, batches, options.fmt, sink, types=batches.types, **table_options
+            )
+    else:
+        from adt_dummy.core.columnar import ColumnarResult
+
+        rows = ColumnarResult.from_batches(batches.columns, batches.types, batches)
+        rendered = format_output(batches.columns, rows, options.fmt)
+        if options.output_path:
+            Path(options.output_path).write_text(rendered)
+        else:
+            click.echo(rendered)
+    if options.output_path:
+        click.echo(f"Wrote {batches.row_count} rows to {options.output_path}")
+
+
+def _stream_query(query, options, monitor):
+    with trino.stream_query(
+        query,
+        max_rows=options.max_rows,
+        batch_size=options.fetch_size,
+        monitor=monitor,
+        prefetch=options.prefetch,
+    ) as batches:
+        if options.wire:
+            wire.write_result(batches, click.get_binary_stream("stdout"))
+        else:
+            _write_result(batches, options)
+        return batches.truncated
+
+
+def _section_title(index, text):
+    first_line = text.strip().splitlines()[0]
+    if len(first_line) > 80:
+        first_line = first_line[:77] + "..."
+    return f"-- [{index}] {first_line}"
+
+
+def _run_script(sql_text, options):
+    if options.fmt in BINARY_FORMATS:
+        raise AppError(f"--script does not support --format {options.fmt}.")
+    statements = trino.split_sql_statements(sql_text)
+    if not statements:
+        raise AppError("Script contains no statements.")
+
+    sections = 0
+    output_path = options.output_path
+    with replace_on_success(output_path, "w") if output_path else nullcontext() as handle:
+        results = trino.run_script(statements, max_rows=options.max_rows, parallel=options.parallel)
+        for index, statement, columns, rows, truncated in results:
+            if not columns:
+                continue
+            rendered = format_output(columns, rows, options.fmt).rstrip("\n")
+            section = f"{_section_title(index, statement)}\n{rendered}\n\n"
+            if handle:
+                handle.write(section)
+            else:
+                click.echo(section, nl=False)
+            sections += 1
+            if truncated:
+                click.echo(
+                    f"Statement {index}: output truncated. Use --max-rows 0 to disable the limit.",
+                    err=True,
+                )
     if output_path:
-        Path(output_path).write_text(rendered)
-        click.echo(f"Wrote {len(rows)} rows to {output_path}")
+        click.echo(f"Wrote {sections} result sections to {output_path}")
+
+
+def _batch_label(params):
+    return ", ".join(f"{key}={value}" for key, value in params.items()) or "(no params)"
+
+
+def _run_batch(template, param_sets, options):
+    _validate_max_rows(options.max_rows)
+    _validate_concurrency(options.concurrency)
+    if options.fmt in BINARY_FORMATS:
+        raise AppError(f"--batch does not support --format {options.fmt}.")
+    if not param_sets:
+        raise AppError("Batch contains no parameter sets.")
+    if _wants_profile(options):
+        raise AppError("--profile is not supported with --batch.")
+    shared = trino.parse_params(options.params)
+    queries = [_bind_query(template, dict(shared, **params), options) for params in param_sets]
+
+    summary = []
+    failed = 0
+    output_path = options.output_path
+    scope = _query_scope(options)
+    target = replace_on_success(output_path, "w") if output_path else nullcontext()
+    with scope, target as handle:
+        results = trino.run_batch(
+            queries, max_rows=options.max_rows, concurrency=options.concurrency
+        )
+        for result in results:
+            label = _batch_label(param_sets[result.index - 1])
+            if result.error:
+                failed += 1
+                status = "error"
+                click.echo(f"Item {result.index} ({label}) failed: {result.error}", err=True)
+            else:
+                status = "truncated" if result.truncated else "ok"
+                rendered = format_output(result.columns, result.rows, options.fmt).rstrip("\n")
+                section = f"{_section_title(result.index, label)}\n{rendered}\n\n"
+                if handle:
+                    handle.write(section)
+                else:
+                    click.echo(section, nl=False)
+            summary.append(
+                [result.index, label, status, len(result.rows), f"{result.duration:.2f}"]
+            )
+
+    click.echo(
+        format_output(["item", "params", "status", "rows", "seconds"], summary, "table"),
+        err=True,
+    )
+    if output_path:
+        click.echo(f"Wrote {len(summary) - failed} result sections to {output_path}")
+    scope.check_cancelled()
+    if failed:
+        raise AppError(f"{failed} of {len(summary)} batch items failed.")
+
+
+def _report_profile(query_id, options, emit):
+    summary = profile.summarize(profile.fetch_query_info(query_id))
+    if options.profile:
+        click.echo(profile.format_profile(summary), err=True)
+    if "profile" in emit:
+        control.emit("profile", summary)
+    if options.profile_json:
+        _write_json(options.profile_json, summary)
+
+
+def _wants_profile(options, emit=()):
+    return options.profile or options.profile_json or "profile" in emit
+
+
+def _run_single(query, options, emit):
+    monitor = QueryMonitor(progress=bool(options.progress))
+    if options.wire or options.output_dir or options.fmt in STREAM_FORMATS:
+        truncated = _stream_query(query, options, monitor)
     else:
-        click.echo(rendered)
+        columns, rows, truncated = trino.execute_query(
+            query, max_rows=options.max_rows, monitor=monitor
+        )
+        rendered = format_output(columns, rows, options.fmt)
+
+        if options.output_path:
+            Path(options.output_path).write_text(rendered)
+            click.echo(f"Wrote {len(rows)} rows to {options.output_path}")
+        else:
+            click.echo(rendered)
 
     if truncated:
         click.echo(
             "Output truncated. Use --max-rows 0 to disable the limit.", err=True
         )
+    if monitor.final is not None:
+        if "stats" in emit:
+            control.emit("stats", monitor.final)
+        if options.stats_json:
+            _write_json(options.stats_json, monitor.final)
+        if _wants_profile(options, emit):
+            _report_profile(monitor.final["query_id"], options, emit)
+
+
+def _run_query(sql_text, options, emit=()):
+    _validate_max_rows(options.max_rows)
+    _validate_parallel(options.parallel)
+    _validate_fetch(options)
+    _validate_export(options)
+    _check_binary_target(options.fmt, options.output_path or options.output_dir)
+    parsed_params = trino.parse_params(options.params)
+
+    if options.script:
+        if _wants_profile(options, emit):
+            raise AppError("--profile is not supported with --script.")
+        if options.param_mode == "prepare":
+            raise AppError("--script does not support --param-mode prepare.")
+        sql_text = _bind_query(sql_text, parsed_params, options)
+        with _query_scope(options):
+            _run_script(sql_text, options)
+        return
+
+    query = _bind_query(sql_text, parsed_params, options)
+    with _query_scope(options):
+        _run_single(query, options, emit)
+
+
+def _exec_timeout(options):
+    """Keep kubectl exec alive long enough for the pod to enforce --timeout itself."""
+    if not options.timeout:
+        return None
+    exec_timeout = env.get_int_env("ADT_DUMMY_EXEC_TIMEOUT_SECONDS", default=60)
+    return max(exec_timeout, options.timeout + CANCEL_GRACE_SECONDS)
+
+
+def _batch_local(template, param_sets, options):
+    _validate_concurrency(options.concurrency)
+    envelope = json.dumps({"sql": template, "params": param_sets})
+    command_args = ["dami", "__remote"] + options.remote_args(batch=True)
+    target = (
+        replace_on_success(options.output_path)
+        if options.output_path
+        else nullcontext(click.get_binary_stream("stdout"))
+    )
+    with target as sink:
+        proxy_to_remote(
+            command_args, stdin_data=envelope, timeout=_exec_timeout(options), stream_to=sink
+        )
+    if options.output_path:
+        click.echo(f"Wrote output to {options.output_path}")
+
+
+def _use_wire(options):
+    """Whether the pod can send typed rows for local rendering instead of text."""
+    if options.script:
+        return False
+    if options.fmt in BINARY_FORMATS:
+        from adt_dummy.core import arrow
+
+        return arrow.available()
+    return True
+
+
+def _query_local(sql_text, options, use_cache, refresh, cache_ttl):
+    _validate_parallel(options.parallel)
+    _validate_export(options)
+    _check_binary_target(options.fmt, options.output_path or options.output_dir)
+    options.wire = _use_wire(options)
+    if options.output_dir and not options.wire:
+        raise AppError(f"--output-dir with --format {options.fmt} needs pyarrow installed locally.")
+    result_format = "wire" if options.wire else options.fmt
+    command_args = ["dami", "__remote"] + options.remote_args()
+    controls = control.ControlCollector()
+
+    key = None
+    cache = query_cache()
+    if use_cache and not options.allow_write:
+        parsed_params = trino.parse_params(options.params)
+        if options.param_mode == "prepare":
+            resolved_sql = trino.prepare_params(sql_text, parsed_params)
+        else:
+            resolved_sql = trino.apply_params(sql_text, parsed_params)
+        key = cache_key(
+            resolved_sql, result_format, options.max_rows, options.script, cache_namespace()
+        )
+
+    def _target():
+        if options.wire:
+            return wire.ResultReceiver(lambda batches: _write_result(batches, options))
+        if options.output_path:
+            return replace_on_success(options.output_path)
+        return nullcontext(click.get_binary_stream("stdout"))
+
+    def _proxy(sink):
+        proxy_to_remote(
+            command_args,
+            stdin_data=sql_text,
+            timeout=_exec_timeout(options),
+            stream_to=sink,
+            on_control=controls,
+        )
+
+    hit = cache.get(key) if key and not refresh else None
+    if hit:
+        data_path, meta = hit
+        with _target() as sink, open(data_path, "rb") as cached:
+            shutil.copyfileobj(cached, sink)
+            sink.flush()
+        click.echo(f"Served from cache (age {int(meta['age'])}s).", err=True)
+    else:
+        with _target() as sink:
+            if key:
+                with cache.writer(key, cache_ttl, info={"format": result_format}) as entry:
+                    _proxy(TeeSink(sink, entry))
+            else:
+                _proxy(sink)
+
+    if options.output_path and not options.wire:
+        click.echo(f"Wrote output to {options.output_path}")
+    for kind, path, flag in (
+        ("stats", options.stats_json, "--stats-json"),
+        ("profile", options.profile_json, "--profile-json"),
+    ):
+        if not path:
+            continue
+        data = controls.get(kind)
+        if data is None:
+            click.echo(f"No query {kind} was reported; {flag} not written.", err=True)
+        else:
+            _write_json(path, data)
+
+
+def _default_progress(options):
+    """Progress goes to a terminal on stderr, but not one that also shows the rows."""
+    if not sys.stderr.isatty():
+        return False
+    return bool(options.output_path or options.output_dir) or not sys.stdout.isatty()
 
 
 @click.command(name="query")
-@click.option("-f", "--file", "file_path", type=click.Path(exists=True, dir_okay=False))
-@click.option("--format", "fmt", type=click.Choice(["table", "csv", "json"]), default="table")
-@click.option("--output", "output_path", type=click.Path(dir_okay=False))
-@click.option("--max-rows", type=int, default=200)
-@click.option("--param", "params", multiple=True)
-@click.option("--allow-write", is_flag=True, default=False)
+@_query_options
+@click.option("--batch", "batch_path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--cache/--no-cache", "use_cache", default=None)
+@click.option("--refresh", is_flag=True, default=False)
+@click.option("--cache-ttl", type=int)
 @click.argument("sql", required=False)
 @click.pass_context
-def query_cmd(ctx, file_path, fmt, output_path, max_rows, params, allow_write, sql):
-    if ctx.obj.get("in_cluster"):
-        sql_text = _load_sql(sql, file_path, stdin=False)
-        _run_query(sql_text, params, allow_write, fmt, output_path, max_rows)
+def query_cmd(ctx, file_path, sql, batch_path, use_cache, refresh, cache_ttl, **kwargs):
+    options = QueryOptions(**kwargs)
+    if options.progress is None:
+        options.progress = _default_progress(options)
+    sql_text = _load_sql(sql, file_path, stdin=False)
+
+    if batch_path:
+        if options.output_dir:
+            raise AppError("--output-dir is not supported with --batch.")
+        param_sets = _load_batch(batch_path, options.script)
+        if ctx.obj.get("in_cluster"):
+            _run_batch(sql_text, param_sets, options)
+        else:
+            _batch_local(sql_text, param_sets, options)
         return
 
-    sql_text = _load_sql(sql, file_path, stdin=False)
-    remote_args = ["query", "--stdin", "--format", fmt, "--max-rows", str(max_rows)]
-    if allow_write:
-        remote_args.append("--allow-write")
-    for item in params:
-        remote_args += ["--param", item]
-
-    output_text = proxy_to_remote(
-        ["dami", "__remote"] + remote_args,
-        stdin_data=sql_text,
-        capture_output=bool(output_path),
-    )
+    if ctx.obj.get("in_cluster"):
+        _run_query(sql_text, options)
+        return
 
-    if output_path:
-        Path(output_path).write_text(output_text or "")
-        click.echo(f"Wrote output to {output_path}")
+    if use_cache is None:
+        use_cache = refresh or env.get_bool_env("ADT_DUMMY_QUERY_CACHE", default=False)
+    if cache_ttl is None:
+        cache_ttl = env.get_int_env("ADT_DUMMY_QUERY_CACHE_TTL_SECONDS", default=3600)
+    _query_local(sql_text, options, use_cache, refresh, cache_ttl)
 
 
 @click.command(name="query")
-@click.option("-f", "--file", "file_path", type=click.Path(exists=True, dir_okay=False))
-@click.option("--format", "fmt", type=click.Choice(["table", "csv", "json"]), default="table")
-@click.option("--output", "output_path", type=click.Path(dir_okay=False))
-@click.option("--max-rows", type=int, default=200)
-@click.option("--param", "params", multiple=True)
-@click.option("--allow-write", is_flag=True, default=False)
+@_query_options
+@click.option("--emit-stats", is_flag=True, hidden=True)
+@click.option("--emit-profile", is_flag=True, hidden=True)
+@click.option("--batch-stdin", is_flag=True, hidden=True)
 @click.option("--stdin", is_flag=True, hidden=True)
+@click.option("--wire", "wire_result", is_flag=True, hidden=True)
 @click.argument("sql", required=False)
-def query_remote_cmd(file_path, fmt, output_path, max_rows, params, allow_write, stdin, sql):
+def query_remote_cmd(
+    file_path, sql, emit_stats, emit_profile, batch_stdin, stdin, wire_result, **kwargs
+):
+    args = server.remote_args()
+    if args is not None:
+        exit_code = server.forward(args, read_stdin=stdin)
+        if exit_code is not None:
+            if exit_code:
+                raise SystemExit(exit_code)
+            return
+
     sql_text = _load_sql(sql, file_path, stdin=stdin)
-    _run_query(sql_text, params, allow_write, fmt, output_path, max_rows)
+    if batch_stdin:
+        envelope = json.loads(sql_text)
+        _run_batch(envelope["sql"], envelope["params"], QueryOptions(**kwargs))
+        return
+    emit = [kind for kind, flag in (("stats", emit_stats), ("profile", emit_profile)) if flag]
+    _run_query(sql_text, QueryOptions(wire=wire_result, **kwargs), emit=emit)
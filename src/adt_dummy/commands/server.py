@@ -0,0 +1,13 @@
+"""Query server command."""
+
+import click
+
+from adt_dummy.services import server
+
+
+@click.command(name="server")
+@click.option("--socket", "socket_path", type=click.Path(dir_okay=False))
+@click.option("--pool-size", type=int)
+@click.pass_context
+def server_remote_cmd(ctx, socket_path, pool_size):
+    server.serve(ctx.parent.command, path=socket_path, pool_size=pool_size)
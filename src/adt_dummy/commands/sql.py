@@ -0,0 +1,168 @@
+"""Interactive SQL command."""
+
+import sys
+from pathlib import Path
+
+import click
+
+from adt_dummy.core import env
+from adt_dummy.core.cache import cache_root
+from adt_dummy.core.errors import AppError
+from adt_dummy.local import remote_exec_cmd
+from adt_dummy.services import session as session_service
+from adt_dummy.services import trino
+
+FORMATS = ["table", "csv", "json", "jsonl"]
+HISTORY_LENGTH = 1000
+PROMPT = "dami> "
+CONTINUATION = "   -> "
+
+HELP = """Statements end with ';' and may span several lines.
+  \\format [table|csv|json|jsonl]   show or set the output format
+  \\max-rows [N]                    show or set the row limit (0 = no limit)
+  \\help                            show this help
+  \\quit                            leave (or Ctrl-D)
+Ctrl-C cancels the running statement."""
+
+
+def _history_path():
+    configured = env.get_env("ADT_DUMMY_SQL_HISTORY", default=None)
+    return Path(configured).expanduser() if configured else cache_root() / "sql_history"
+
+
+def _load_history(path):
+    """Enable line editing and history when readline is available."""
+    try:
+        import readline
+    except ImportError:
+        return None
+    readline.set_history_length(HISTORY_LENGTH)
+    try:
+        readline.read_history_file(str(path))
+    except OSError:
+        pass
+    return readline
+
+
+def _save_history(readline, path):
+    if readline is None:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        readline.write_history_file(str(path))
+    except OSError:
+        pass
+
+
+def _is_complete(text):
+    """True once ``text`` ends with a ';' outside strings and comments."""
+    return trino.strip_comments_and_strings(text).rstrip().endswith(";")
+
+
+class _Settings:
+    def __init__(self, fmt, max_rows):
+        self.fmt = fmt
+        self.max_rows = max_rows
+
+    def command(self, line):
+        """Handle a backslash command; returns False when the REPL should stop."""
+        name, _, arg = line[1:].strip().partition(" ")
+        arg = arg.strip()
+        if name in ("q", "quit", "exit"):
+            return False
+        if name in ("?", "h", "help"):
+            click.echo(HELP, err=True)
+        elif name == "format":
+            if arg:
+                if arg not in FORMATS:
+                    raise AppError(f"Unknown format: {arg}. Use one of {', '.join(FORMATS)}.")
+                self.fmt = arg
+            click.echo(f"format: {self.fmt}", err=True)
+        elif name == "max-rows":
+            if arg:
+                if not arg.isdigit():
+                    raise AppError("\\max-rows needs a number >= 0.")
+                self.max_rows = int(arg)
+            click.echo(f"max-rows: {self.max_rows}", err=True)
+        else:
+            raise AppError(f"Unknown command: \\{name}. Type \\help.")
+        return True
+
+
+def _report(result):
+    if result["output"]:
+        click.echo(result["output"].rstrip("\n"))
+    rows = result["rows"]
+    footer = f"({rows} row{'' if rows == 1 else 's'}, {result['seconds']:.2f}s)"
+    if result["truncated"]:
+        footer += " truncated; raise it with \\max-rows"
+    click.echo(footer, err=True)
+
+
+def _repl(session, settings, interactive):
+    buffer = []
+    while True:
+        prompt = (CONTINUATION if buffer else PROMPT) if interactive else ""
+        try:
+            line = input(prompt)
+        except EOFError:
+            if interactive:
+                click.echo(err=True)
+            line = ";" if buffer else None
+        except KeyboardInterrupt:
+            click.echo(err=True)
+            buffer = []
+            continue
+        if line is None:
+            return
+        if not buffer and line.strip().startswith("\\"):
+            try:
+                if not settings.command(line):
+                    return
+            except AppError as exc:
+                click.echo(f"Error: {exc}", err=True)
+            continue
+        buffer.append(line)
+        text = "\n".join(buffer)
+        if not _is_complete(text):
+            continue
+        buffer = []
+        for statement in trino.split_sql_statements(text):
+            try:
+                _report(session.run(statement, settings.fmt, settings.max_rows))
+            except AppError as exc:
+                click.echo(f"Error: {exc}", err=True)
+                break
+
+
+@click.command(name="sql")
+@click.option("--format", "fmt", type=click.Choice(FORMATS), default="table")
+@click.option("--max-rows", type=int, default=200)
+@click.option("--allow-write", is_flag=True, default=False)
+@click.pass_context
+def sql_cmd(ctx, fmt, max_rows, allow_write):
+    if max_rows < 0:
+        raise AppError("--max-rows must be >= 0")
+    interactive = sys.stdin.isatty()
+    if ctx.obj.get("in_cluster"):
+        session = session_service.Session(allow_write=allow_write)
+    else:
+        args = ["dami", "__remote", "session"]
+        if allow_write:
+            args.append("--allow-write")
+        session = session_service.RemoteSession(remote_exec_cmd(args))
+    history = _history_path()
+    readline = _load_history(history) if interactive else None
+    if interactive:
+        click.echo("Type \\help for commands, \\quit or Ctrl-D to leave.", err=True)
+    try:
+        _repl(session, _Settings(fmt, max_rows), interactive)
+    finally:
+        session.close()
+        _save_history(readline, history)
+
+
+@click.command(name="session")
+@click.option("--allow-write", is_flag=True, default=False)
+def session_remote_cmd(allow_write):
+    session_service.serve(sys.stdin.buffer, sys.stdout.buffer, allow_write=allow_write)
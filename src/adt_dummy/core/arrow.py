@@ -0,0 +1,125 @@
+"""Columnar Parquet and Arrow IPC writers built on pyarrow."""
+
+import json
+import re
+
+from adt_dummy.core.errors import AppError
+
+ROW_GROUP_SIZE = 65536
+
+DECIMAL_RE = re.compile(r"decimal\((\d+),\s*(\d+)\)")
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as exc:
+        raise AppError(
+            "pyarrow is required for parquet/arrow output. Install adt-dummy[arrow]."
+        ) from exc
+    return pyarrow
+
+
+def available():
+    try:
+        _pyarrow()
+    except AppError:
+        return False
+    return True
+
+
+def _string_value(value):
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (list, dict, tuple)):
+        return json.dumps(value, default=str)
+    return str(value)
+
+
+def arrow_field_type(type_code):
+    pa = _pyarrow()
+    type_code = (type_code or "").lower()
+    base = type_code.split("(", 1)[0].strip()
+    simple = {
+        "boolean": pa.bool_(),
+        "tinyint": pa.int8(),
+        "smallint": pa.int16(),
+        "integer": pa.int32(),
+        "bigint": pa.int64(),
+        "real": pa.float32(),
+        "double": pa.float64(),
+        "varbinary": pa.binary(),
+        "date": pa.date32(),
+    }
+    if base in simple:
+        return simple[base]
+    if base == "decimal":
+        match = DECIMAL_RE.match(type_code)
+        if match:
+            return pa.decimal128(int(match.group(1)), int(match.group(2)))
+    if base == "timestamp":
+        if "with time zone" in type_code:
+            return pa.timestamp("us", tz="UTC")
+        return pa.timestamp("us")
+    if base == "time" and "with time zone" not in type_code:
+        return pa.time64("us")
+    return pa.string()
+
+
+def arrow_schema(columns, types):
+    pa = _pyarrow()
+    return pa.schema(
+        [pa.field(name, arrow_field_type(type_code)) for name, type_code in zip(columns, types)]
+    )
+
+
+def record_batch(schema, rows):
+    pa = _pyarrow()
+    arrays = []
+    for index, field in enumerate(schema):
+        values = [row[index] for row in rows]
+        if pa.types.is_string(field.type):
+            values = [_string_value(value) for value in values]
+        try:
+            arrays.append(pa.array(values, type=field.type))
+        except (pa.ArrowException, TypeError, ValueError) as exc:
+            raise AppError(f"Failed to convert column {field.name} to {field.type}: {exc}") from exc
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _row_groups(batches, size):
+    group = []
+    for batch in batches:
+        group.extend(batch)
+        if len(group) >= size:
+            yield group
+            group = []
+    if group:
+        yield group
+
+
+def write_parquet_stream(columns, types, batches, sink, row_group_size=ROW_GROUP_SIZE):
+    pa = _pyarrow()
+    schema = arrow_schema(columns, types)
+    writer = pa.parquet.ParquetWriter(sink, schema)
+    try:
+        for rows in _row_groups(batches, row_group_size):
+            writer.write_batch(record_batch(schema, rows), row_group_size=len(rows))
+            sink.flush()
+    finally:
+        writer.close()
+    sink.flush()
+
+
+def write_arrow_stream(columns, types, batches, sink, row_group_size=ROW_GROUP_SIZE):
+    pa = _pyarrow()
+    schema = arrow_schema(columns, types)
+    writer = pa.ipc.new_file(sink, schema)
+    try:
+        for rows in _row_groups(batches, row_group_size):
+            writer.write_batch(record_batch(schema, rows))
+            sink.flush()
+    finally:
+        writer.close()
+    sink.flush()
@@ -0,0 +1,154 @@
+"""Local on-disk cache for query results with TTL and LRU eviction."""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from adt_dummy.core import env
+
+
+def cache_root():
+    configured = env.get_env("ADT_DUMMY_CACHE_DIR", default=None)
+    if configured:
+        return Path(configured).expanduser()
+    base = os.getenv("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "adt-dummy"
+
+
+def _kube_context():
+    if env.is_in_cluster():
+        return None
+    from adt_dummy.k8s import get_current_context
+
+    return get_current_context()
+
+
+def cache_namespace():
+    """Settings that decide which Trino and toolbox pod a cached result came from.
+
+    Locally this includes the resolved kube context, so results from one
+    cluster are not served after ``kubectl config use-context`` to another.
+    """
+    user = env.get_env("ADT_DUMMY_TRINO_USER", default="")
+    host = env.get_env("ADT_DUMMY_TRINO_HOST", default="")
+    return {
+        "trino": f"{user}@{host}",
+        "context": _kube_context(),
+        "namespace": env.get_env("ADT_DUMMY_NAMESPACE", default="adt-dynamic"),
+        "selector": env.get_env(
+            "ADT_DUMMY_POD_SELECTOR", default="app.kubernetes.io/name=adt-dummy"
+        ),
+        "pod": env.get_env("ADT_DUMMY_POD", default=None),
+    }
+
+
+def cache_key(*parts):
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TeeSink:
+    """Binary sink that forwards every write to several sinks."""
+
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def write(self, data):
+        for sink in self.sinks:
+            sink.write(data)
+        return len(data)
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
+
+
+class ResultCache:
+    """Stores result bytes as ``<key>.data`` files next to ``<key>.json`` metadata.
+
+    Entries expire after their own TTL. When the total size exceeds
+    ``max_bytes`` the least recently used entries (by data file mtime, which
+    is bumped on every hit) are removed first.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def _paths(self, key):
+        return self.directory / f"{key}.data", self.directory / f"{key}.json"
+
+    def _read_meta(self, meta_path):
+        try:
+            return json.loads(meta_path.read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _remove(self, key):
+        for path in self._paths(key):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def get(self, key):
+        data_path, meta_path = self._paths(key)
+        meta = self._read_meta(meta_path)
+        if meta is None or not data_path.exists():
+            return None
+        now = time.time()
+        if now - meta.get("created", 0) > meta.get("ttl", 0):
+            self._remove(key)
+            return None
+        os.utime(data_path, (now, now))
+        meta["age"] = now - meta["created"]
+        return data_path, meta
+
+    @contextmanager
+    def writer(self, key, ttl, info=None):
+        """Yield a binary file; it becomes the entry for ``key`` only on success."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                yield handle
+            data_path, meta_path = self._paths(key)
+            meta = dict(info or {}, created=time.time(), ttl=ttl)
+            meta["size"] = os.path.getsize(tmp_name)
+            os.replace(tmp_name, data_path)
+            meta_path.write_text(json.dumps(meta))
+        finally:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+        self.evict()
+
+    def evict(self):
+        now = time.time()
+        entries = []
+        for data_path in self.directory.glob("*.data"):
+            key = data_path.stem
+            meta = self._read_meta(data_path.with_suffix(".json"))
+            if meta is None or now - meta.get("created", 0) > meta.get("ttl", 0):
+                self._remove(key)
+                continue
+            try:
+                stat = data_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, key))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+
+
+def query_cache():
+    max_mb = env.get_int_env("ADT_DUMMY_QUERY_CACHE_MAX_MB", default=512)
+    return ResultCache(cache_root() / "query", max_bytes=max_mb * 1024 * 1024)
@@ -0,0 +1,385 @@
+"""Column-oriented result container.
+
+Rows from the Trino client are lists of boxed Python objects; a large
+result spends most of its memory on object headers. :class:`ColumnarResult`
+keeps every batch as one array per column instead: integers, floats,
+booleans, dates, naive timestamps, times and short decimals in numpy arrays
+with a validity mask, strings dictionary-encoded, and everything else
+(arrays, maps, rows, varbinary, ...) as plain lists. Values are boxed again
+one batch at a time while a writer iterates, so rendering never rebuilds the
+whole result as rows.
+"""
+
+import re
+import sys
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+import numpy as np
+
+DECIMAL_RE = re.compile(r"decimal\((\d+),\s*(\d+)\)")
+BASE_TYPE_RE = re.compile(r"\s*([a-z]+)")
+
+MAX_SCALED_DECIMAL_DIGITS = 18
+
+INTEGER_DTYPES = {
+    "tinyint": np.int8,
+    "smallint": np.int16,
+    "integer": np.int32,
+    "bigint": np.int64,
+}
+FLOAT_TYPES = {"double", "real"}
+STRING_TYPES = {"varchar", "char", "json"}
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+_UTC_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECONDS = 1_000_000
+
+
+class _Mismatch(Exception):
+    """A value does not fit the compact column; the column falls back to a list."""
+
+
+def _base_type(type_code):
+    match = BASE_TYPE_RE.match((type_code or "").lower())
+    return match.group(1) if match else ""
+
+
+def _check_types(values, cls):
+    for value in values:
+        if value is not None and type(value) is not cls:
+            raise _Mismatch()
+
+
+def _mask(values):
+    return np.fromiter((value is not None for value in values), dtype=bool, count=len(values))
+
+
+def _restore_nulls(values, valid):
+    for position in np.flatnonzero(~valid).tolist():
+        values[position] = None
+    return values
+
+
+class _ObjectColumn:
+    def __init__(self, chunks=None):
+        self.chunks = chunks or []
+
+    def append(self, values):
+        self.chunks.append(list(values))
+
+    def values(self, chunk):
+        return self.chunks[chunk]
+
+    @property
+    def nbytes(self):
+        return sum(
+            sys.getsizeof(values) + sum(sys.getsizeof(value) for value in values)
+            for values in self.chunks
+        )
+
+
+class _ArrayColumn:
+    """Values converted into one numpy array per batch, plus a validity mask."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def append(self, values):
+        valid = _mask(values)
+        self.chunks.append((self._encode(values), valid))
+
+    def values(self, chunk):
+        data, valid = self.chunks[chunk]
+        return _restore_nulls(self._decode(data), valid)
+
+    @property
+    def nbytes(self):
+        return sum(data.nbytes + valid.nbytes for data, valid in self.chunks)
+
+
+class _NumberColumn(_ArrayColumn):
+    def __init__(self, dtype, cls):
+        super().__init__()
+        self.dtype = dtype
+        self.cls = cls
+
+    def _encode(self, values):
+        _check_types(values, self.cls)
+        try:
+            return np.array([0 if value is None else value for value in values], dtype=self.dtype)
+        except OverflowError as exc:
+            raise _Mismatch() from exc
+
+    def _decode(self, data):
+        return data.tolist()
+
+
+class _DateColumn(_ArrayColumn):
+    def _encode(self, values):
+        _check_types(values, date)
+        days = np.fromiter(
+            (_EPOCH_ORDINAL if value is None else value.toordinal() for value in values),
+            dtype=np.int64,
+            count=len(values),
+        )
+        return (days - _EPOCH_ORDINAL).astype("datetime64[D]")
+
+    def _decode(self, data):
+        return data.tolist()
+
+
+class _TimestampColumn(_ArrayColumn):
+    """Microseconds since the epoch; time zones are dictionary-encoded."""
+
+    def __init__(self):
+        super().__init__()
+        self.zones = []
+        self._zone_codes = {}
+
+    def _zone(self, tzinfo):
+        code = self._zone_codes.get(tzinfo)
+        if code is None:
+            code = self._zone_codes[tzinfo] = len(self.zones)
+            self.zones.append(tzinfo)
+        return code
+
+    def _encode(self, values):
+        _check_types(values, datetime)
+        if all(value is None or value.tzinfo is None for value in values):
+            micros = np.fromiter(
+                (
+                    (
+                        0
+                        if value is None
+                        else (
+                            (value.toordinal() - _EPOCH_ORDINAL) * 86400
+                            + value.hour * 3600
+                            + value.minute * 60
+                            + value.second
+                        )
+                        * _MICROSECONDS
+                        + value.microsecond
+                    )
+                    for value in values
+                ),
+                dtype=np.int64,
+                count=len(values),
+            )
+            return micros, None
+        micros = np.zeros(len(values), dtype=np.int64)
+        zones = np.full(len(values), -1, dtype=np.int16)
+        for position, value in enumerate(values):
+            if value is None:
+                continue
+            if value.tzinfo is None:
+                delta = value - _EPOCH
+            else:
+                delta = value - _UTC_EPOCH
+                zones[position] = self._zone(value.tzinfo)
+            micros[position] = (delta.days * 86400 + delta.seconds) * _MICROSECONDS + (
+                delta.microseconds
+            )
+        return micros, zones
+
+    def _decode(self, data):
+        micros, zones = data
+        if zones is None:
+            return micros.view("datetime64[us]").tolist()
+        values = []
+        for value, zone in zip(micros.tolist(), zones.tolist()):
+            delta = timedelta(microseconds=value)
+            if zone < 0:
+                values.append(_EPOCH + delta)
+            else:
+                values.append((_UTC_EPOCH + delta).astimezone(self.zones[zone]))
+        return values
+
+    @property
+    def nbytes(self):
+        return sum(
+            micros.nbytes + (0 if zones is None else zones.nbytes) + valid.nbytes
+            for (micros, zones), valid in self.chunks
+        )
+
+
+class _TimeColumn(_ArrayColumn):
+    def _encode(self, values):
+        _check_types(values, time)
+        if any(value is not None and value.tzinfo is not None for value in values):
+            raise _Mismatch()
+        return np.array(
+            [
+                (
+                    0
+                    if value is None
+                    else ((value.hour * 60 + value.minute) * 60 + value.second) * _MICROSECONDS
+                    + value.microsecond
+                )
+                for value in values
+            ],
+            dtype=np.int64,
+        )
+
+    def _decode(self, data):
+        values = []
+        for value in data.tolist():
+            seconds, micros = divmod(value, _MICROSECONDS)
+            minutes, second = divmod(seconds, 60)
+            values.append(time(minutes // 60, minutes % 60, second, micros))
+        return values
+
+
+class _DecimalColumn(_ArrayColumn):
+    """Decimals with at most 18 digits, stored as integers scaled by ``10**scale``."""
+
+    def __init__(self, scale):
+        super().__init__()
+        self.scale = scale
+
+    def _encode(self, values):
+        _check_types(values, Decimal)
+        scaled = []
+        for value in values:
+            if value is None:
+                scaled.append(0)
+                continue
+            if value.as_tuple().exponent != -self.scale or (value.is_zero() and value.is_signed()):
+                raise _Mismatch()
+            scaled.append(int(value.scaleb(self.scale)))
+        return np.array(scaled, dtype=np.int64)
+
+    def _decode(self, data):
+        return [Decimal(value).scaleb(-self.scale) for value in data.tolist()]
+
+
+class _StringColumn:
+    """Dictionary-encoded strings: one ``int32`` code per row, -1 for null."""
+
+    def __init__(self):
+        self.dictionary = []
+        self._codes = {}
+        self.chunks = []
+
+    def _code(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.dictionary)
+            self.dictionary.append(value)
+        return code
+
+    def append(self, values):
+        _check_types(values, str)
+        self.chunks.append(
+            np.array([-1 if value is None else self._code(value) for value in values], np.int32)
+        )
+
+    def values(self, chunk):
+        dictionary = self.dictionary
+        return [None if code < 0 else dictionary[code] for code in self.chunks[chunk].tolist()]
+
+    @property
+    def nbytes(self):
+        strings = sum(sys.getsizeof(value) for value in self.dictionary)
+        return strings + sum(codes.nbytes for codes in self.chunks)
+
+
+def _column_for(type_code):
+    base = _base_type(type_code)
+    if base in INTEGER_DTYPES:
+        return _NumberColumn(INTEGER_DTYPES[base], int)
+    if base in FLOAT_TYPES:
+        return _NumberColumn(np.float64, float)
+    if base == "boolean":
+        return _NumberColumn(np.bool_, bool)
+    if base == "date":
+        return _DateColumn()
+    if base == "timestamp":
+        return _TimestampColumn()
+    if base == "time":
+        return _TimeColumn()
+    if base == "decimal":
+        match = DECIMAL_RE.match((type_code or "").lower().strip())
+        if match and int(match.group(1)) <= MAX_SCALED_DECIMAL_DIGITS:
+            return _DecimalColumn(int(match.group(2)))
+    if base in STRING_TYPES:
+        return _StringColumn()
+    return _ObjectColumn()
+
+
+class ColumnarResult:
+    """A query result stored column by column, filled one batch at a time.
+
+    Iterating yields rows as lists, like the list-of-lists results it
+    replaces; :meth:`batches` yields them one stored batch at a time for the
+    streaming writers in :mod:`adt_dummy.core.output`.
+    """
+
+    def __init__(self, columns, types=None):
+        self.columns = list(columns)
+        self.types = list(types or ["varchar"] * len(self.columns))
+        self._store = [_column_for(type_code) for type_code in self.types]
+        self._sizes = []
+
+    @classmethod
+    def from_batches(cls, columns, types, batches):
+        result = cls(columns, types)
+        for batch in batches:
+            result.append(batch)
+        return result
+
+    def append(self, batch):
+        if not batch:
+            return
+        for position, column in enumerate(self._store):
+            values = [row[position] for row in batch]
+            try:
+                column.append(values)
+            except _Mismatch:
+                fallback = _ObjectColumn(
+                    [column.values(chunk) for chunk in range(len(self._sizes))]
+                )
+                fallback.append(values)
+                self._store[position] = fallback
+        self._sizes.append(len(batch))
+
+    def __len__(self):
+        return sum(self._sizes)
+
+    def __eq__(self, other):
+        if isinstance(other, ColumnarResult):
+            return self.columns == other.columns and list(self) == list(other)
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __bool__(self):
+        return bool(self._sizes)
+
+    def batch(self, chunk):
+        columns = [column.values(chunk) for column in self._store]
+        return [list(row) for row in zip(*columns)]
+
+    def batches(self):
+        for chunk in range(len(self._sizes)):
+            yield self.batch(chunk)
+
+    def __iter__(self):
+        for batch in self.batches():
+            yield from batch
+
+    def column_values(self, position):
+        """Every value of one column, without building rows."""
+        column = self._store[position]
+        values = []
+        for chunk in range(len(self._sizes)):
+            values.extend(column.values(chunk))
+        return values
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by the stored columns."""
+        return sum(column.nbytes for column in self._store)
@@ -0,0 +1,40 @@
+"""Control messages sent from the pod to the local CLI on stderr.
+
+Structured results that are not part of the command output (query stats,
+profiles) travel as single stderr lines that start with ``CONTROL_PREFIX``.
+The local proxy strips them from the terminal output and hands them to the
+command.
+"""
+
+import json
+
+import click
+
+CONTROL_PREFIX = b"\x1eadt-dummy:"
+
+
+def emit(kind, data):
+    payload = json.dumps({"kind": kind, "data": data}, default=str)
+    click.echo(CONTROL_PREFIX.decode("ascii") + payload, err=True)
+
+
+def parse(payload):
+    message = json.loads(payload.decode("utf-8"))
+    return message["kind"], message["data"]
+
+
+class ControlCollector:
+    """Callback for ``proxy_to_remote(on_control=...)`` that keeps the latest message per kind."""
+
+    def __init__(self):
+        self.messages = {}
+
+    def __call__(self, payload):
+        try:
+            kind, data = parse(payload)
+        except (ValueError, KeyError):
+            return
+        self.messages[kind] = data
+
+    def get(self, kind):
+        return self.messages.get(kind)
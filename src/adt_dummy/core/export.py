@@ -0,0 +1,245 @@
+"""Partitioned export of a result into a directory of part files.
+
+Rows are encoded on the thread that reads the result and cut into parts by
+row count or uncompressed size; parquet and arrow parts use an estimate of
+the size of their rows. Each finished part is handed to a pool of
+worker threads that compress it, write it under a temporary name and rename
+it into place, so compression and disk writes overlap with fetching. Once
+every part is written, ``manifest.json`` lists the parts with their row
+counts, sizes and SHA-256 checksums; a directory without a manifest is an
+incomplete export.
+"""
+
+import csv
+import hashlib
+import io
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from adt_dummy.core import transport
+from adt_dummy.core.errors import AppError
+from adt_dummy.core.output import BINARY_FORMATS, write_stream
+
+TEXT_FORMATS = ("csv", "jsonl")
+EXPORT_FORMATS = TEXT_FORMATS + BINARY_FORMATS
+CODECS = ("none", "gzip", "zstd")
+EXTENSIONS = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+MANIFEST = "manifest.json"
+
+DEFAULT_PART_ROWS = 1_000_000
+DEFAULT_PART_SIZE_MB = 128
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+BLOCK_SIZE = 1024 * 1024
+
+
+def parse_compression(spec, fmt):
+    """``(codec, level)`` from ``none``, ``gzip[:LEVEL]`` or ``zstd[:LEVEL]``.
+
+    Text parts default to gzip. Parquet and Arrow parts are never compressed
+    again; parquet already compresses its pages.
+    """
+    if spec is None:
+        spec = "none" if fmt in BINARY_FORMATS else "gzip"
+    codec = spec.partition(":")[0].strip().lower()
+    if codec == "none":
+        return "none", None
+    if codec not in CODECS:
+        raise AppError(f"Unknown compression: {codec}. Use one of: {', '.join(CODECS)}")
+    if fmt in BINARY_FORMATS:
+        raise AppError(f"--compression {codec} is not supported for {fmt} parts.")
+    if not transport.available(codec):
+        raise AppError(f"{codec} parts need the zstandard package. Install adt-dummy[compress].")
+    return transport.parse_spec(spec)
+
+
+def _part_name(index, fmt, codec):
+    return f"part-{index:05d}.{fmt}{EXTENSIONS[codec]}"
+
+
+def _write_text_part(path, blocks, codec, level):
+    digest = hashlib.sha256()
+    compressor = transport.compressor(codec, level) if codec != "none" else None
+    with open(path, "wb") as handle:
+        for block in blocks:
+            data = compressor.compress_block(block) if compressor else block
+            handle.write(data)
+            digest.update(data)
+        if compressor:
+            data = compressor.finish()
+            handle.write(data)
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _estimated_size(row):
+    """Rough encoded size of a row buffered for a parquet or arrow part."""
+    return sum(len(value) if isinstance(value, (str, bytes)) else 8 for value in row)
+
+
+class _Part:
+    def __init__(self, index):
+        self.index = index
+        self.rows = 0
+        self.size = 0
+        self.blocks = []
+        self.pending = []
+
+
+class PartWriter:
+    """Cuts a result into parts and writes them on ``workers`` threads.
+
+    ``part_rows`` and ``part_bytes`` (uncompressed, estimated for parquet and
+    arrow) limit each part; ``0`` disables a limit. At most ``workers + 1`` finished parts wait in memory.
+    """
+
+    def __init__(
+        self,
+        directory,
+        columns,
+        types,
+        fmt,
+        part_rows=DEFAULT_PART_ROWS,
+        part_bytes=DEFAULT_PART_SIZE_MB * 1024 * 1024,
+        compression=None,
+        workers=DEFAULT_WORKERS,
+    ):
+        if fmt not in EXPORT_FORMATS:
+            raise AppError(f"--output-dir supports {', '.join(EXPORT_FORMATS)}, not {fmt}.")
+        self.directory = Path(directory)
+        self.columns = columns
+        self.types = types
+        self.fmt = fmt
+        self.part_rows = part_rows or None
+        self.part_bytes = part_bytes or None
+        self.codec, self.level = parse_compression(compression, fmt)
+        self.workers = workers
+        self.rows = 0
+        self._parts = []
+        self._slots = threading.BoundedSemaphore(workers + 1)
+        self._pool = None
+        self._buffer = io.StringIO()
+        self._csv = csv.writer(self._buffer)
+        self._current = None
+
+    def _prepare_directory(self):
+        if self.directory.exists() and any(self.directory.iterdir()):
+            raise AppError(f"Output directory is not empty: {self.directory}")
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _start_part(self):
+        self._current = _Part(len(self._parts))
+        if self.fmt == "csv":
+            self._csv.writerow(self.columns)
+
+    def _cut_block(self, part):
+        text = self._buffer.getvalue()
+        if text:
+            block = text.encode("utf-8")
+            part.blocks.append(block)
+            part.size += len(block)
+        self._buffer.seek(0)
+        self._buffer.truncate(0)
+
+    def _add_row(self, row):
+        if self._current is None:
+            self._start_part()
+        part = self._current
+        if self.fmt == "csv":
+            self._csv.writerow(row)
+        elif self.fmt == "jsonl":
+            self._buffer.write(json.dumps(dict(zip(self.columns, row)), default=str) + "\n")
+        else:
+            part.pending.append(row)
+            part.size += _estimated_size(row)
+        part.rows += 1
+        self.rows += 1
+        pending = 0
+        if self.fmt in TEXT_FORMATS:
+            pending = self._buffer.tell()
+            if pending >= BLOCK_SIZE:
+                self._cut_block(part)
+                pending = 0
+        if self.part_bytes and part.size + pending >= self.part_bytes:
+            self._finish_part()
+            return
+        if self.part_rows and part.rows >= self.part_rows:
+            self._finish_part()
+
+    def _finish_part(self):
+        part, self._current = self._current, None
+        if part is None:
+            return
+        if self.fmt in TEXT_FORMATS:
+            self._cut_block(part)
+        self._check_failed()
+        self._slots.acquire()
+        future = self._pool.submit(self._write_part, part)
+        future.add_done_callback(lambda _: self._slots.release())
+        self._parts.append(future)
+
+    def _check_failed(self):
+        for future in self._parts:
+            if future.done() and future.exception() is not None:
+                raise future.exception()
+
+    def _write_part(self, part):
+        name = _part_name(part.index, self.fmt, self.codec)
+        path = self.directory / name
+        tmp_path = self.directory / f".{name}.tmp"
+        try:
+            if self.fmt in TEXT_FORMATS:
+                sha256 = _write_text_part(tmp_path, part.blocks, self.codec, self.level)
+            else:
+                with open(tmp_path, "wb") as handle:
+                    write_stream(self.columns, [part.pending], self.fmt, handle, types=self.types)
+                sha256 = _file_digest(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        info = {"file": name, "rows": part.rows, "bytes": path.stat().st_size, "sha256": sha256}
+        if self.fmt in TEXT_FORMATS:
+            info["uncompressed_bytes"] = part.size
+        part.blocks = part.pending = None
+        return info
+
+    def write(self, batches):
+        """Write every row of ``batches``, then the manifest; returns the manifest."""
+        self._prepare_directory()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="export")
+        try:
+            for batch in batches:
+                for row in batch:
+                    self._add_row(row)
+            self._finish_part()
+            parts = [future.result() for future in self._parts]
+        finally:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+        manifest = {
+            "format": self.fmt,
+            "compression": self.codec,
+            "columns": self.columns,
+            "types": self.types,
+            "rows": self.rows,
+            "truncated": bool(getattr(batches, "truncated", False)),
+            "parts": parts,
+        }
+        (self.directory / MANIFEST).write_text(json.dumps(manifest, indent=2) + "\n")
+        return manifest
+
+
+def write_parts(batches, directory, fmt, **options):
+    """Export ``batches`` (``RowBatches`` or ``RemoteBatches``) into ``directory``."""
+    writer = PartWriter(directory, batches.columns, batches.types, fmt, **options)
+    return writer.write(batches)
@@ -0,0 +1,126 @@
+"""Length-prefixed frames used between local and in-pod processes."""
+
+import io
+import json
+import struct
+import threading
+
+from adt_dummy.core.errors import AppError
+
+HEADER = struct.Struct(">cI")
+CHANNEL = struct.Struct(">I")
+
+STDIN = b"i"
+STDOUT = b"o"
+STDERR = b"e"
+REQUEST = b"r"
+EXIT = b"x"
+CANCEL = b"c"
+
+
+def _read_exact(stream, size):
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = stream.read(remaining)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def write_frame(stream, kind, payload=b""):
+    stream.write(HEADER.pack(kind, len(payload)) + payload)
+
+
+def read_frame(stream):
+    """Return ``(kind, payload)`` or ``None`` on a clean end of stream."""
+    header = _read_exact(stream, HEADER.size)
+    if not header:
+        return None
+    if len(header) < HEADER.size:
+        raise AppError("Truncated frame header")
+    kind, length = HEADER.unpack(header)
+    payload = _read_exact(stream, length)
+    if len(payload) < length:
+        raise AppError("Truncated frame payload")
+    return kind, payload
+
+
+class FrameDecoder:
+    """Incremental decoder for frames that arrive in arbitrary chunks."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    @property
+    def pending(self):
+        return len(self._buffer)
+
+    def feed(self, data):
+        """Buffer ``data`` and return the ``(kind, payload)`` frames it completed."""
+        self._buffer += data
+        frames = []
+        offset = 0
+        while len(self._buffer) - offset >= HEADER.size:
+            kind, length = HEADER.unpack_from(self._buffer, offset)
+            end = offset + HEADER.size + length
+            if end > len(self._buffer):
+                break
+            frames.append((kind, bytes(self._buffer[offset + HEADER.size : end])))
+            offset = end
+        del self._buffer[:offset]
+        return frames
+
+
+def write_json_frame(stream, kind, value):
+    write_frame(stream, kind, json.dumps(value).encode("utf-8"))
+
+
+def write_channel_frame(stream, channel, kind, payload=b""):
+    """Frame whose payload starts with ``channel``, for several requests on one stream."""
+    write_frame(stream, kind, CHANNEL.pack(channel) + payload)
+
+
+def split_channel(payload):
+    """``(channel, payload)`` of a frame written by :func:`write_channel_frame`."""
+    if len(payload) < CHANNEL.size:
+        raise AppError("Truncated channel frame")
+    return CHANNEL.unpack_from(payload)[0], payload[CHANNEL.size :]
+
+
+def read_json(payload):
+    return json.loads(payload.decode("utf-8"))
+
+
+class FrameSink(io.RawIOBase):
+    """Binary sink that wraps every write into a frame of ``kind``.
+
+    Several sinks may share one stream; ``lock`` keeps their frames whole.
+    With ``channel`` the frames are channel frames.
+    """
+
+    def __init__(self, stream, kind, lock=None, channel=None):
+        super().__init__()
+        self.stream = stream
+        self.kind = kind
+        self.lock = lock or threading.Lock()
+        self.channel = channel
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        if data:
+            with self.lock:
+                if self.channel is None:
+                    write_frame(self.stream, self.kind, data)
+                else:
+                    write_channel_frame(self.stream, self.channel, self.kind, data)
+        return len(data)
+
+    def flush(self):
+        with self.lock:
+            self.stream.flush()
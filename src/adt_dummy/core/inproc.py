@@ -0,0 +1,88 @@
+"""In-process execution of CLI commands with per-thread stdio.
+
+Long-lived processes run ``__remote`` commands in worker threads. The
+standard streams are replaced once with proxies that write to whatever the
+current thread registered, so ``click.echo`` and ``sys.stdout`` keep working
+unchanged inside the commands.
+"""
+
+import io
+import sys
+import threading
+from contextlib import contextmanager
+
+import click
+
+from adt_dummy.core.errors import AppError
+
+_local = threading.local()
+
+
+class _ThreadLocalStream:
+    def __init__(self, name, fallback):
+        self._name = name
+        self._fallback = fallback
+
+    def _target(self):
+        return getattr(_local, self._name, None) or self._fallback
+
+    def __getattr__(self, attr):
+        return getattr(self._target(), attr)
+
+    def __iter__(self):
+        return iter(self._target())
+
+
+def _install():
+    for name in ("stdin", "stdout", "stderr"):
+        current = getattr(sys, name)
+        if not isinstance(current, _ThreadLocalStream):
+            setattr(sys, name, _ThreadLocalStream(name, current))
+
+
+def bound_stream(name):
+    """The stream ``name`` of the current thread, safe to use from helper threads."""
+    return getattr(_local, name, None) or getattr(sys, name)
+
+
+def is_active():
+    """True while the current thread runs a command through :func:`run_command`."""
+    return getattr(_local, "stdout", None) is not None
+
+
+@contextmanager
+def redirect_stdio(stdin_data, out, err):
+    _install()
+    _local.stdin = io.TextIOWrapper(io.BytesIO(stdin_data or b""), encoding="utf-8")
+    _local.stdout = io.TextIOWrapper(out, encoding="utf-8", write_through=True)
+    _local.stderr = io.TextIOWrapper(err, encoding="utf-8", write_through=True)
+    try:
+        yield
+    finally:
+        for name in ("stdout", "stderr"):
+            try:
+                getattr(_local, name).flush()
+            except (OSError, ValueError):
+                pass
+        _local.stdin = _local.stdout = _local.stderr = None
+
+
+def run_command(command, args, stdin_data, out, err):
+    """Run a click command in this thread and return its exit code."""
+    with redirect_stdio(stdin_data, out, err):
+        try:
+            command.main(args=list(args), prog_name="dami __remote", standalone_mode=False)
+            return 0
+        except AppError as exc:
+            click.echo(f"Error: {exc}", err=True)
+            return exc.exit_code
+        except click.ClickException as exc:
+            exc.show()
+            return exc.exit_code
+        except click.exceptions.Abort:
+            click.echo("Aborted!", err=True)
+            return 1
+        except SystemExit as exc:
+            if exc.code is None:
+                return 0
+            return exc.code if isinstance(exc.code, int) else 1
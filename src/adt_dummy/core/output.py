@@ -3,9 +3,22 @@
 import csv
 import io
 import json
+import os
+import tempfile
+from contextlib import contextmanager
+from decimal import Decimal
+from pathlib import Path
 
 from tabulate import tabulate
 
+BINARY_FORMATS = ("parquet", "arrow")
+STREAM_FORMATS = ("table", "csv", "jsonl") + BINARY_FORMATS
+
+DEFAULT_TABLE_MEMORY = 256 * 1024 * 1024
+TABLE_CELL_WIDTH = 80
+TABLE_HEADER_PADDING = 2
+_CELL_OVERHEAD = 64
+
 
 def format_table(columns, rows):
     return tabulate(rows, headers=columns, tablefmt="github")
@@ -21,8 +34,18 @@ def format_csv(columns, rows):
 
 
 def format_json(columns, rows):
-    data = [dict(zip(columns, row)) for row in rows]
-    return json.dumps(data, indent=2, default=str)
+    # Same text as json.dumps(list_of_dicts, indent=2), one row at a time.
+    items = [
+        "  " + json.dumps(dict(zip(columns, row)), indent=2, default=str).replace("\n", "\n  ")
+        for row in rows
+    ]
+    if not items:
+        return "[]"
+    return "[\n" + ",\n".join(items) + "\n]"
+
+
+def format_jsonl(columns, rows):
+    return "".join(json.dumps(dict(zip(columns, row)), default=str) + "\n" for row in rows)
 
 
 def format_output(columns, rows, fmt):
@@ -32,4 +55,210 @@ def format_output(columns, rows, fmt):
         return format_csv(columns, rows)
     if fmt == "json":
         return format_json(columns, rows)
+    if fmt == "jsonl":
+        return format_jsonl(columns, rows)
     raise ValueError(f"Unsupported format: {fmt}")
+
+
+@contextmanager
+def replace_on_success(path, mode="wb"):
+    """Write to a temporary file next to ``path`` and move it into place only on success.
+
+    A failed or interrupted command leaves an existing ``path`` untouched.
+    """
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        try:
+            os.chmod(tmp_name, path.stat().st_mode & 0o777)
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp_name, 0o666 & ~umask)
+        with os.fdopen(fd, mode) as handle:
+            yield handle
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _flush_buffer(buffer, sink):
+    data = buffer.getvalue()
+    if data:
+        sink.write(data.encode("utf-8"))
+        sink.flush()
+    buffer.seek(0)
+    buffer.truncate(0)
+
+
+def write_csv_stream(columns, batches, sink):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    _flush_buffer(buffer, sink)
+    for batch in batches:
+        writer.writerows(batch)
+        _flush_buffer(buffer, sink)
+
+
+def write_jsonl_stream(columns, batches, sink):
+    buffer = io.StringIO()
+    for batch in batches:
+        for row in batch:
+            buffer.write(json.dumps(dict(zip(columns, row)), default=str))
+            buffer.write("\n")
+        _flush_buffer(buffer, sink)
+
+
+def _table_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:g}"
+    return str(value).replace("\r", " ").replace("\n", " ")
+
+
+def _is_number(value):
+    return isinstance(value, (int, float, Decimal)) and not isinstance(value, bool)
+
+
+class _TableLayout:
+    """Column widths and alignment for the streaming table renderer."""
+
+    def __init__(self, columns):
+        self.columns = [str(column) for column in columns]
+        self.widths = [len(column) + TABLE_HEADER_PADDING for column in self.columns]
+        self.numeric = [True] * len(columns)
+
+    def observe(self, row, cells, cap=None):
+        for index, (value, cell) in enumerate(zip(row, cells)):
+            width = len(cell) if cap is None else min(len(cell), cap)
+            if width > self.widths[index]:
+                self.widths[index] = width
+            if value is not None and not _is_number(value):
+                self.numeric[index] = False
+
+    def _fit(self, cell, index):
+        width = self.widths[index]
+        if len(cell) > width:
+            cell = cell[: max(width - 3, 0)] + "..."[:width]
+        if self.numeric[index]:
+            return cell.rjust(width)
+        return cell.ljust(width)
+
+    def header(self):
+        names = "| " + " | ".join(self._fit(name, index) for index, name in enumerate(self.columns))
+        rule = "|" + "|".join("-" * (width + 2) for width in self.widths) + "|"
+        return f"{names} |\n{rule}\n"
+
+    def line(self, cells):
+        return "| " + " | ".join(self._fit(cell, i) for i, cell in enumerate(cells)) + " |\n"
+
+
+def write_table_stream(columns, batches, sink, sample_rows=None, max_memory=DEFAULT_TABLE_MEMORY):
+    """Render a github-style table without holding the whole result.
+
+    By default rows are buffered while they fit in ``max_memory`` bytes
+    (estimated) and rendered with tabulate, exactly like :func:`format_table`.
+    Bigger results spill to a temporary file and are rendered in a second pass
+    with exact column widths. With ``sample_rows`` the widths come from the
+    first rows only (capped at ``TABLE_CELL_WIDTH``); later rows are written
+    as they arrive and wider cells are truncated.
+    """
+    if sample_rows is not None:
+        return _write_sampled_table(columns, batches, sink, sample_rows)
+
+    rows = []
+    used = 0
+    batches = iter(batches)
+    for batch in batches:
+        rows.extend(batch)
+        used += sum(
+            sum(len(_table_cell(value)) for value in row) + _CELL_OVERHEAD * len(row)
+            for row in batch
+        )
+        if used > max_memory:
+            return _write_spilled_table(columns, rows, batches, sink)
+    sink.write((format_table(columns, rows) + "\n").encode("utf-8"))
+    sink.flush()
+
+
+def _write_spilled_table(columns, rows, batches, sink):
+    layout = _TableLayout(columns)
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as spill:
+
+        def _spill(batch):
+            for row in batch:
+                cells = [_table_cell(value) for value in row]
+                layout.observe(row, cells)
+                spill.write(json.dumps(cells) + "\n")
+
+        _spill(rows)
+        del rows[:]
+        for batch in batches:
+            _spill(batch)
+
+        spill.seek(0)
+        buffer = io.StringIO()
+        buffer.write(layout.header())
+        for count, line in enumerate(spill, start=1):
+            buffer.write(layout.line(json.loads(line)))
+            if count % 1000 == 0:
+                _flush_buffer(buffer, sink)
+        _flush_buffer(buffer, sink)
+
+
+def _write_sampled_table(columns, batches, sink, sample_rows):
+    layout = _TableLayout(columns)
+    buffer = io.StringIO()
+    sample = []
+    started = False
+
+    def _start():
+        for row, cells in sample:
+            layout.observe(row, cells, cap=TABLE_CELL_WIDTH)
+        buffer.write(layout.header())
+        for _, cells in sample:
+            buffer.write(layout.line(cells))
+        sample.clear()
+
+    for batch in batches:
+        for row in batch:
+            cells = [_table_cell(value) for value in row]
+            if started:
+                buffer.write(layout.line(cells))
+                continue
+            sample.append((row, cells))
+            if len(sample) >= sample_rows:
+                _start()
+                started = True
+        _flush_buffer(buffer, sink)
+    if not started:
+        _start()
+    _flush_buffer(buffer, sink)
+
+
+def write_stream(columns, batches, fmt, sink, types=None, **table_options):
+    """Encode row batches into the binary ``sink``, flushing after each batch.
+
+    Columnar formats need the Trino type of every column in ``types``;
+    ``table_options`` are passed to :func:`write_table_stream`.
+    """
+    if fmt == "table":
+        return write_table_stream(columns, batches, sink, **table_options)
+    if fmt == "csv":
+        return write_csv_stream(columns, batches, sink)
+    if fmt == "jsonl":
+        return write_jsonl_stream(columns, batches, sink)
+    if fmt in BINARY_FORMATS:
+        from adt_dummy.core import arrow
+
+        types = types or ["varchar"] * len(columns)
+        if fmt == "parquet":
+            return arrow.write_parquet_stream(columns, types, batches, sink)
+        return arrow.write_arrow_stream(columns, types, batches, sink)
+    raise ValueError(f"Unsupported streaming format: {fmt}")
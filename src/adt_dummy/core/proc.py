@@ -1,10 +1,20 @@
 """Process execution helpers."""
 
+import os
+import re
 import shutil
 import subprocess
+import sys
+import threading
+import time
 
+from adt_dummy.core.control import CONTROL_PREFIX
 from adt_dummy.core.errors import AppError
 
+STREAM_CHUNK_SIZE = 64 * 1024
+
+LINE_RE = re.compile(rb"[^\r\n]*[\r\n]")
+
 
 def which_or_error(binary):
     path = shutil.which(binary)
@@ -38,3 +48,129 @@ def run_interactive(args):
         return subprocess.call(args)
     except FileNotFoundError as exc:
         raise AppError(f"Executable not found: {args[0]}") from exc
+
+
+def _feed_stdin(process, data):
+    try:
+        if data:
+            process.stdin.write(data)
+        process.stdin.close()
+    except OSError:
+        pass
+
+
+def _kill_when_idle(process, timeout, activity, done):
+    while not done.wait(1.0):
+        if time.monotonic() - activity["last"] >= timeout:
+            activity["timed_out"] = True
+            process.kill()
+            return
+
+
+class StderrFilter:
+    """Writes stderr chunks through live, passing control lines to ``on_control`` instead."""
+
+    def __init__(self, on_control, target=None):
+        self.on_control = on_control
+        self.target = target or sys.stderr.buffer
+        self._pending = b""
+
+    def write(self, chunk):
+        target = self.target
+        pending = self._pending + chunk
+        position = 0
+        for match in LINE_RE.finditer(pending):
+            line = match.group()
+            if line.startswith(CONTROL_PREFIX) and line.endswith(b"\n"):
+                self.on_control(line[len(CONTROL_PREFIX) : -1])
+            else:
+                target.write(line)
+            position = match.end()
+        pending = pending[position:]
+        if not (CONTROL_PREFIX.startswith(pending) or pending.startswith(CONTROL_PREFIX)):
+            target.write(pending)
+            pending = b""
+        self._pending = pending
+        target.flush()
+        return len(chunk)
+
+    def flush(self):
+        self.target.flush()
+
+    def close(self):
+        if self._pending:
+            self.target.write(self._pending)
+            self.target.flush()
+            self._pending = b""
+
+
+def _pump_stderr(pipe, on_control):
+    stderr = StderrFilter(on_control)
+    fd = pipe.fileno()
+    while True:
+        chunk = os.read(fd, STREAM_CHUNK_SIZE)
+        if not chunk:
+            break
+        stderr.write(chunk)
+    stderr.close()
+    pipe.close()
+
+
+def stream_command(args, sink, input_data=None, timeout=None, on_control=None):
+    """Run ``args`` and copy its stdout into the binary ``sink`` as bytes arrive.
+
+    stderr is inherited so it reaches the terminal live; with ``on_control``
+    it is piped instead and control lines are handed to the callback.
+    ``timeout`` is an inactivity timeout: the process is killed once no output
+    arrived for that many seconds. Returns the exit code.
+    """
+    if isinstance(input_data, str):
+        input_data = input_data.encode("utf-8")
+    try:
+        process = subprocess.Popen(
+            args,
+            stdin=subprocess.PIPE if input_data is not None else None,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE if on_control is not None else None,
+        )
+    except FileNotFoundError as exc:
+        raise AppError(f"Executable not found: {args[0]}") from exc
+
+    done = threading.Event()
+    activity = {"last": time.monotonic(), "timed_out": False}
+    if input_data is not None:
+        threading.Thread(target=_feed_stdin, args=(process, input_data), daemon=True).start()
+    if timeout:
+        threading.Thread(
+            target=_kill_when_idle, args=(process, timeout, activity, done), daemon=True
+        ).start()
+    stderr_thread = None
+    if on_control is not None:
+        stderr_thread = threading.Thread(
+            target=_pump_stderr, args=(process.stderr, on_control), daemon=True
+        )
+        stderr_thread.start()
+
+    try:
+        fd = process.stdout.fileno()
+        while True:
+            chunk = os.read(fd, STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            activity["last"] = time.monotonic()
+            sink.write(chunk)
+            sink.flush()
+        returncode = process.wait()
+        if stderr_thread is not None:
+            stderr_thread.join()
+    except BaseException:
+        process.kill()
+        process.wait()
+        raise
+    finally:
+        done.set()
+        process.stdout.close()
+
+    if activity["timed_out"]:
+        raise AppError(f"Command produced no output for {timeout}s: {' '.join(args)}")
+    return returncode
@@ -0,0 +1,332 @@
+"""Compression of the stdin/stdout channel between the local CLI and ``__remote``.
+
+The local side picks a codec, compresses the payload it sends on stdin and
+passes ``--compress CODEC:LEVEL`` to ``dami __remote``. In the pod the
+standard streams are swapped for wrappers that decompress stdin and compress
+stdout, so commands keep reading and writing plain data. Locally stdout is
+decompressed as it arrives. stderr is never compressed, so messages, progress
+and control lines stay live.
+"""
+
+import io
+import sys
+import threading
+import zlib
+
+from adt_dummy.core import env
+from adt_dummy.core.errors import AppError
+
+FLAG = "--compress"
+CODECS = ("zstd", "lz4", "gzip")
+AUTO_CODECS = ("zstd", "lz4")
+DEFAULT_LEVELS = {"zstd": 3, "lz4": 0, "gzip": 6}
+LEVEL_RANGES = {"zstd": (-7, 22), "lz4": (0, 16), "gzip": (0, 9)}
+DISABLED = {"none", "off", "0", "false", "no"}
+
+BLOCK_SIZE = 256 * 1024
+READ_SIZE = 64 * 1024
+FLUSH_INTERVAL_SECONDS = 0.2
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise AppError(
+            "zstandard is required for zstd transport compression. Install adt-dummy[compress]."
+        ) from exc
+    return zstandard
+
+
+def _lz4_frame():
+    try:
+        import lz4.frame
+    except ImportError as exc:
+        raise AppError(
+            "lz4 is required for lz4 transport compression. Install adt-dummy[compress]."
+        ) from exc
+    return lz4.frame
+
+
+def _require(codec):
+    if codec == "zstd":
+        _zstandard()
+    elif codec == "lz4":
+        _lz4_frame()
+
+
+def available(codec):
+    try:
+        _require(codec)
+    except AppError:
+        return False
+    return True
+
+
+class _ZstdCompressor:
+    def __init__(self, level):
+        zstd = _zstandard()
+        self._flush_block = zstd.COMPRESSOBJ_FLUSH_BLOCK
+        self._compressor = zstd.ZstdCompressor(level=level).compressobj()
+
+    def compress_block(self, data):
+        return self._compressor.compress(data) + self._compressor.flush(self._flush_block)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class _Lz4Compressor:
+    def __init__(self, level):
+        self._compressor = _lz4_frame().LZ4FrameCompressor(compression_level=level, auto_flush=True)
+        self._started = False
+
+    def _begin(self):
+        if self._started:
+            return b""
+        self._started = True
+        return self._compressor.begin()
+
+    def compress_block(self, data):
+        return self._begin() + self._compressor.compress(data)
+
+    def finish(self):
+        return self._begin() + self._compressor.flush()
+
+
+class _GzipCompressor:
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress_block(self, data):
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+def compressor(codec, level):
+    """Streaming compressor whose blocks are decodable as soon as they are written."""
+    if codec == "zstd":
+        return _ZstdCompressor(level)
+    if codec == "lz4":
+        return _Lz4Compressor(level)
+    return _GzipCompressor(level)
+
+
+def decompressor(codec):
+    """Streaming decompressor with ``decompress(data)`` and an ``eof`` flag."""
+    if codec == "zstd":
+        return _zstandard().ZstdDecompressor().decompressobj()
+    if codec == "lz4":
+        return _lz4_frame().LZ4FrameDecompressor()
+    return zlib.decompressobj(31)
+
+
+def compress_all(codec, level, data):
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    stream = compressor(codec, level)
+    return stream.compress_block(data) + stream.finish()
+
+
+def parse_spec(spec):
+    """``(codec, level)`` from a ``CODEC[:LEVEL]`` string."""
+    codec, _, level = spec.partition(":")
+    codec = codec.strip().lower()
+    if codec not in CODECS:
+        raise AppError(f"Unknown transport compression: {codec}. Use one of: {', '.join(CODECS)}")
+    if not level:
+        return codec, DEFAULT_LEVELS[codec]
+    try:
+        value = int(level)
+    except ValueError as exc:
+        raise AppError(f"Invalid compression level for {codec}: {level}") from exc
+    low, high = LEVEL_RANGES[codec]
+    if not low <= value <= high:
+        raise AppError(f"Compression level for {codec} must be between {low} and {high}")
+    return codec, value
+
+
+def local_spec():
+    """The ``CODEC:LEVEL`` to request from the pod, or ``None`` to send plain data."""
+    codec = env.get_env("ADT_DUMMY_TRANSPORT_COMPRESSION", default="auto").strip().lower()
+    if codec in DISABLED:
+        return None
+    if codec == "auto":
+        codec = next((name for name in AUTO_CODECS if available(name)), None)
+        if codec is None:
+            return None
+    level = env.get_int_env(
+        "ADT_DUMMY_TRANSPORT_COMPRESSION_LEVEL", default=DEFAULT_LEVELS.get(codec, 0)
+    )
+    codec, level = parse_spec(f"{codec}:{level}")
+    _require(codec)
+    return f"{codec}:{level}"
+
+
+def with_flag(command_args, spec):
+    """``command_args`` with ``--compress spec`` placed right after ``__remote``."""
+    args = list(command_args)
+    position = args.index("__remote") + 1
+    return args[:position] + [FLAG, spec] + args[position:]
+
+
+def strip_flag(args):
+    """Drop a leading ``--compress spec`` from the arguments after ``__remote``."""
+    args = list(args)
+    if args[:1] == [FLAG]:
+        return args[2:]
+    if args and args[0].startswith(FLAG + "="):
+        return args[1:]
+    return args
+
+
+class CompressingWriter(io.RawIOBase):
+    """Binary writer that compresses into ``raw``.
+
+    Writes are buffered up to ``BLOCK_SIZE`` and a background thread emits
+    whatever is pending every ``interval`` seconds, so slow result streams
+    still reach the laptop promptly while bulk exports get large blocks.
+    ``flush()`` is deliberately cheap because ``click.echo`` calls it per line.
+    """
+
+    def __init__(self, raw, codec, level, interval=FLUSH_INTERVAL_SECONDS):
+        super().__init__()
+        self._raw = raw
+        self._compressor = compressor(codec, level)
+        self._pending = bytearray()
+        self._lock = threading.Lock()
+        self._error = None
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._flush_periodically, args=(interval,))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def writable(self):
+        return True
+
+    def _emit(self):
+        if not self._pending:
+            return
+        data = self._compressor.compress_block(bytes(self._pending))
+        self._pending.clear()
+        self._raw.write(data)
+        self._raw.flush()
+
+    def _flush_periodically(self, interval):
+        while not self._done.wait(interval):
+            with self._lock:
+                try:
+                    self._emit()
+                except (OSError, ValueError) as exc:
+                    self._error = exc
+                    return
+
+    def write(self, data):
+        if self.closed:
+            raise ValueError("write to closed compressed stream")
+        with self._lock:
+            if self._error is not None:
+                raise self._error
+            self._pending += data
+            if len(self._pending) >= BLOCK_SIZE:
+                self._emit()
+        return len(data)
+
+    def flush(self):
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        if self.closed:
+            return
+        self._done.set()
+        self._thread.join()
+        try:
+            with self._lock:
+                if self._error is None:
+                    self._emit()
+                    self._raw.write(self._compressor.finish())
+                    self._raw.flush()
+        finally:
+            super().close()
+
+
+class DecompressingReader(io.RawIOBase):
+    """Binary reader that decompresses ``raw`` on demand."""
+
+    def __init__(self, raw, codec):
+        super().__init__()
+        self._raw = raw
+        self._decompressor = decompressor(codec)
+        self._buffer = b""
+
+    def readable(self):
+        return True
+
+    def _read_raw(self):
+        read1 = getattr(self._raw, "read1", None)
+        return read1(READ_SIZE) if read1 is not None else self._raw.read(READ_SIZE)
+
+    def readinto(self, target):
+        while not self._buffer:
+            if self._decompressor.eof:
+                return 0
+            chunk = self._read_raw()
+            if not chunk:
+                return 0
+            self._buffer = self._decompressor.decompress(chunk)
+        size = min(len(target), len(self._buffer))
+        target[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+class DecompressingSink:
+    """Binary sink for ``stream_command`` that decompresses into ``sink``."""
+
+    def __init__(self, sink, codec):
+        self._sink = sink
+        self._decompressor = decompressor(codec)
+        self._received = False
+
+    def write(self, data):
+        self._received = True
+        try:
+            output = self._decompressor.decompress(data)
+        except Exception as exc:
+            raise AppError(f"Failed to decompress output from the pod: {exc}") from exc
+        if output:
+            self._sink.write(output)
+        return len(data)
+
+    def flush(self):
+        self._sink.flush()
+
+    def check_complete(self):
+        if self._received and not self._decompressor.eof:
+            raise AppError("Compressed output from the pod ended early.")
+
+
+def install(spec):
+    """Swap ``sys.stdin``/``sys.stdout`` for compressed ones; returns a finisher.
+
+    The finisher flushes stdout and ends the compressed stream. It must run
+    before the process exits, or the local side reports truncated output.
+    """
+    codec, level = parse_spec(spec)
+    _require(codec)
+    writer = CompressingWriter(sys.stdout.buffer, codec, level)
+    reader = DecompressingReader(sys.stdin.buffer, codec)
+    sys.stdin = io.TextIOWrapper(io.BufferedReader(reader), encoding="utf-8")
+    sys.stdout = io.TextIOWrapper(writer, encoding="utf-8", write_through=True)
+    stdout = sys.stdout
+
+    def finish():
+        try:
+            stdout.flush()
+        finally:
+            writer.close()
+
+    return finish
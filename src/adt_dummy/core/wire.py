@@ -0,0 +1,316 @@
+"""Typed result stream between ``__remote query --wire`` and the local CLI.
+
+The pod sends a schema frame (column names and Trino types), one frame per
+row batch and an end frame (row count, truncation) using the framing from
+:mod:`adt_dummy.core.framing`. Rows are compact JSON. Scalar columns JSON has
+no type for (date, timestamp, decimal, ...) are sent as strings and converted
+back using the column type; values inside arrays, maps and rows are tagged
+(``{"$": "date", "v": "2024-01-01"}``). The laptop therefore decodes the same
+Python objects the Trino client returned and renders any format from them.
+"""
+
+import base64
+import json
+import queue
+import re
+import threading
+import uuid
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from adt_dummy.core import framing
+from adt_dummy.core.errors import AppError
+
+SCHEMA = b"s"
+ROWS = b"w"
+END = b"z"
+
+DEFAULT_QUEUE_SIZE = 8
+
+_PLAIN = {str, int, float, bool, type(None)}
+_ABORT = object()
+
+PLAIN_TYPES = {
+    "varchar",
+    "char",
+    "json",
+    "bigint",
+    "integer",
+    "smallint",
+    "tinyint",
+    "double",
+    "real",
+    "boolean",
+    "unknown",
+}
+
+BASE_TYPE_RE = re.compile(r"\s*([a-z]+)")
+
+
+def _row_tuple():
+    from trino.client import NamedRowTuple
+
+    return NamedRowTuple
+
+
+def encode_value(value):
+    """JSON-compatible form of a value returned by the Trino client."""
+    if type(value) in _PLAIN:
+        return value
+    if isinstance(value, list):
+        return [encode_value(item) for item in value]
+    if isinstance(value, datetime):
+        return {"$": "datetime", "v": value.isoformat()}
+    if isinstance(value, date):
+        return {"$": "date", "v": value.isoformat()}
+    if isinstance(value, time):
+        return {"$": "time", "v": value.isoformat()}
+    if isinstance(value, timedelta):
+        return {"$": "timedelta", "v": [value.days, value.seconds, value.microseconds]}
+    if isinstance(value, Decimal):
+        return {"$": "decimal", "v": str(value)}
+    if isinstance(value, (bytes, bytearray)):
+        return {"$": "bytes", "v": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, uuid.UUID):
+        return {"$": "uuid", "v": str(value)}
+    if isinstance(value, dict):
+        return {"$": "map", "v": [[encode_value(k), encode_value(v)] for k, v in value.items()]}
+    if isinstance(value, tuple):
+        items = [encode_value(item) for item in value]
+        annotations = getattr(value, "__annotations__", None)
+        if isinstance(value, _row_tuple()) and annotations:
+            return {"$": "row", "v": items, "n": annotations["names"], "t": annotations["types"]}
+        return {"$": "tuple", "v": items}
+    if isinstance(value, (str, int, float)):
+        return value
+    return {"$": "str", "v": str(value)}
+
+
+class _Text(str):
+    """A string in a column that is normally converted from its string form."""
+
+
+_DECODERS = {
+    "datetime": lambda obj: datetime.fromisoformat(obj["v"]),
+    "date": lambda obj: date.fromisoformat(obj["v"]),
+    "time": lambda obj: time.fromisoformat(obj["v"]),
+    "timedelta": lambda obj: timedelta(*obj["v"]),
+    "decimal": lambda obj: Decimal(obj["v"]),
+    "bytes": lambda obj: base64.b64decode(obj["v"]),
+    "uuid": lambda obj: uuid.UUID(obj["v"]),
+    "map": lambda obj: {_hashable(k): v for k, v in obj["v"]},
+    "tuple": lambda obj: tuple(obj["v"]),
+    "row": lambda obj: _row_tuple()(obj["v"], obj["n"], obj["t"]),
+    "str": lambda obj: obj["v"],
+    "text": lambda obj: _Text(obj["v"]),
+}
+
+
+def _b64encode(value):
+    return base64.b64encode(value).decode("ascii")
+
+
+# Trino base type -> (Python type, to string, from string).
+COLUMN_CODECS = {
+    "date": (date, date.isoformat, date.fromisoformat),
+    "timestamp": (datetime, datetime.isoformat, datetime.fromisoformat),
+    "time": (time, time.isoformat, time.fromisoformat),
+    "decimal": (Decimal, str, Decimal),
+    "varbinary": (bytes, _b64encode, base64.b64decode),
+    "uuid": (uuid.UUID, str, uuid.UUID),
+}
+
+
+def _base_type(type_code):
+    match = BASE_TYPE_RE.match((type_code or "").lower())
+    return match.group(1) if match else ""
+
+
+def _column_plan(types):
+    """``(index, base type)`` for every column that is not plain JSON."""
+    plan = []
+    for index, type_code in enumerate(types):
+        base = _base_type(type_code)
+        if base not in PLAIN_TYPES:
+            plan.append((index, base))
+    return plan
+
+
+def _hashable(value):
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _decode_object(obj):
+    decoder = _DECODERS.get(obj.get("$"))
+    if decoder is None:
+        raise AppError(f"Unknown value tag in result stream: {obj.get('$')!r}")
+    return decoder(obj)
+
+
+def encode_rows(rows, types):
+    """Compact JSON for a batch of rows whose columns have the Trino ``types``."""
+    plan = _column_plan(types)
+    if plan:
+        encoders = []
+        for index, base in plan:
+            codec = COLUMN_CODECS.get(base)
+            encoders.append((index, codec[0], codec[1]) if codec else (index, None, None))
+        encoded = []
+        for row in rows:
+            row = list(row)
+            for index, cls, to_string in encoders:
+                value = row[index]
+                if type(value) is cls:
+                    row[index] = to_string(value)
+                elif type(value) is str and cls is not None:
+                    row[index] = {"$": "text", "v": value}
+                elif type(value) not in _PLAIN:
+                    row[index] = encode_value(value)
+            encoded.append(row)
+        rows = encoded
+    text = json.dumps(rows, separators=(",", ":"), ensure_ascii=False, default=encode_value)
+    return text.encode("utf-8")
+
+
+def decode_rows(payload, types):
+    rows = json.loads(payload.decode("utf-8"), object_hook=_decode_object)
+    decoders = [
+        (index, COLUMN_CODECS[base][2])
+        for index, base in _column_plan(types)
+        if base in COLUMN_CODECS
+    ]
+    if decoders:
+        for row in rows:
+            for index, from_string in decoders:
+                value = row[index]
+                if type(value) is str:
+                    row[index] = from_string(value)
+                elif type(value) is _Text:
+                    row[index] = str(value)
+    return rows
+
+
+def write_result(batches, sink):
+    """Write ``batches`` (a :class:`~adt_dummy.services.trino.RowBatches`) as frames."""
+    framing.write_json_frame(sink, SCHEMA, {"columns": batches.columns, "types": batches.types})
+    sink.flush()
+    for batch in batches:
+        framing.write_frame(sink, ROWS, encode_rows(batch, batches.types))
+        sink.flush()
+    framing.write_json_frame(sink, END, {"rows": batches.row_count, "truncated": batches.truncated})
+    sink.flush()
+
+
+class RemoteBatches:
+    """Row batches decoded from a result stream, shaped like ``RowBatches``."""
+
+    def __init__(self, columns, types, items):
+        self.columns = columns
+        self.types = types
+        self.row_count = 0
+        self.truncated = False
+        self._items = items
+
+    def __iter__(self):
+        while True:
+            kind, payload = self._items.get()
+            if kind == ROWS:
+                rows = decode_rows(payload, self.types)
+                self.row_count += len(rows)
+                yield rows
+            elif kind == END:
+                self.truncated = framing.read_json(payload)["truncated"]
+                return
+            else:
+                raise AppError("Result stream from the pod ended early.")
+
+
+class ResultReceiver:
+    """Binary sink that decodes a result stream and renders it in a worker thread.
+
+    ``render(batches)`` starts once the schema frame arrives and consumes a
+    :class:`RemoteBatches`. Decoding and rendering overlap with the transfer;
+    ``write`` blocks once ``queue_size`` batches are waiting, and re-raises a
+    rendering error so the caller stops the transfer. Use it as a context
+    manager: leaving the block waits for the renderer.
+    """
+
+    def __init__(self, render, queue_size=DEFAULT_QUEUE_SIZE):
+        self._render = render
+        self._decoder = framing.FrameDecoder()
+        self._items = queue.Queue(queue_size)
+        self._thread = None
+        self._error = None
+        self.batches = None
+        self.complete = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def write(self, data):
+        for kind, payload in self._decoder.feed(data):
+            self._handle(kind, payload)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def _handle(self, kind, payload):
+        if kind == SCHEMA and self.batches is None:
+            schema = framing.read_json(payload)
+            self.batches = RemoteBatches(schema["columns"], schema["types"], self._items)
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        elif kind in (ROWS, END) and self.batches is not None and not self.complete:
+            self.complete = kind == END
+            self._put((kind, payload))
+        else:
+            raise AppError(f"Unexpected frame in result stream: {kind!r}")
+
+    def _run(self):
+        try:
+            self._render(self.batches)
+        except BaseException as exc:
+            self._error = exc
+
+    def _put(self, item):
+        while True:
+            if self._error is not None:
+                raise self._error
+            if not self._thread.is_alive():
+                return
+            try:
+                self._items.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def close(self):
+        """Wait for the renderer and raise its error, if any."""
+        if self._thread is None:
+            raise AppError("The pod did not send a result.")
+        if not self.complete:
+            self._put((_ABORT, None))
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        if not self.complete or self._decoder.pending:
+            raise AppError("Result stream from the pod ended early.")
+
+    def abort(self):
+        """Stop the renderer after a failed transfer, discarding its error."""
+        if self._thread is None:
+            return
+        if not self.complete:
+            try:
+                self._put((_ABORT, None))
+            except BaseException:
+                pass
+        self._thread.join()
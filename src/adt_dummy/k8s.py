@@ -1,11 +1,40 @@
-"""Kubernetes helpers for locating toolbox pods and running kubectl."""
+"""Kubernetes helpers for locating toolbox pods and running kubectl.
 
+Lookups that cost a kubectl call are kept in a small JSON file in the cache
+directory: the resolved kubectl path, the current context (until a
+kubeconfig file changes) and the selected pod per context, namespace and
+selector (for ``ADT_DUMMY_POD_CACHE_TTL_SECONDS``). A cached pod is not
+checked before use; callers drop it with :func:`forget_pod` once an exec
+shows that it is gone.
+
+When several toolbox pods run, ``ADT_DUMMY_POD_STRATEGY`` picks between
+them (first, round-robin, random or least-loaded) and pods that failed in
+the last ``ADT_DUMMY_POD_COOLDOWN_SECONDS`` are passed over.
+
+With ``ADT_DUMMY_K8S_BACKEND=api`` (or ``auto``) these lookups go to the API
+server through :mod:`adt_dummy.k8s_api` instead of kubectl.
+"""
+
+import io
 import json
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
 from adt_dummy.core import env
+from adt_dummy.core.cache import cache_root
 from adt_dummy.core.errors import AppError
 from adt_dummy.core.proc import run_command, which_or_error
 
+BACKENDS = ("kubectl", "api", "auto")
+STRATEGIES = ("first", "round-robin", "random", "least-loaded")
+LOAD_COMMAND = ["dami", "__remote", "load"]
+PROBE_TIMEOUT_SECONDS = 10
+PROBE_WORKERS = 8
+
 
 def kubectl_bin():
     return env.get_env("ADT_DUMMY_KUBECTL_BIN", default="kubectl")
@@ -15,25 +44,157 @@ def kubectl_context():
     return env.get_env("ADT_DUMMY_KUBECTL_CONTEXT", default=None)
 
 
-def kubectl_base_cmd():
+def k8s_backend():
+    backend = env.get_env("ADT_DUMMY_K8S_BACKEND", default="kubectl").strip().lower()
+    if backend not in BACKENDS:
+        raise AppError(
+            f"Unknown ADT_DUMMY_K8S_BACKEND: {backend}. Use one of: {', '.join(BACKENDS)}"
+        )
+    return backend
+
+
+def api_client():
+    """The Kubernetes API client, or ``None`` when kubectl should be used.
+
+    With ``auto``, an API backend that cannot be set up (missing extra,
+    unsupported kubeconfig auth) falls back to kubectl.
+    """
+    backend = k8s_backend()
+    if backend == "kubectl":
+        return None
+    from adt_dummy import k8s_api
+
+    try:
+        if backend == "auto":
+            k8s_api._websocket()
+        return k8s_api.client(kubectl_context())
+    except AppError:
+        if backend == "api":
+            raise
+        return None
+
+
+def pod_cache_ttl():
+    return env.get_int_env("ADT_DUMMY_POD_CACHE_TTL_SECONDS", default=600)
+
+
+def pod_strategy():
+    strategy = env.get_env("ADT_DUMMY_POD_STRATEGY", default="first").strip().lower()
+    if strategy not in STRATEGIES:
+        raise AppError(
+            f"Unknown ADT_DUMMY_POD_STRATEGY: {strategy}. Use one of: {', '.join(STRATEGIES)}"
+        )
+    return strategy
+
+
+def pod_cooldown():
+    return env.get_int_env("ADT_DUMMY_POD_COOLDOWN_SECONDS", default=60)
+
+
+def _cache_path():
+    return cache_root() / "k8s.json"
+
+
+def _read_cache():
+    try:
+        data = json.loads(_cache_path().read_text())
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write_cache(data):
+    path = _cache_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as handle:
+            json.dump(data, handle)
+        os.replace(tmp_name, path)
+    except OSError:
+        pass
+
+
+def cache_get(key, match=None, ttl=None):
+    entry = _read_cache().get(key)
+    if not isinstance(entry, dict) or entry.get("match") != match:
+        return None
+    if ttl is not None and time.time() - entry.get("stored", 0) > ttl:
+        return None
+    return entry.get("value")
+
+
+def cache_put(key, value, match=None):
+    data = _read_cache()
+    data[key] = {"value": value, "match": match, "stored": time.time()}
+    _write_cache(data)
+
+
+def cache_drop(key):
+    data = _read_cache()
+    if data.pop(key, None) is not None:
+        _write_cache(data)
+
+
+def kubectl_path():
+    """Absolute path of the kubectl binary, remembered per binary name and PATH."""
     binary = kubectl_bin()
-    which_or_error(binary)
-    cmd = [binary]
+    match = [binary, os.environ.get("PATH", "")]
+    path = cache_get("kubectl", match=match)
+    if path and os.path.isfile(path):
+        return path
+    path = which_or_error(binary)
+    cache_put("kubectl", path, match=match)
+    return path
+
+
+def kubectl_base_cmd():
+    cmd = [kubectl_path()]
     context = kubectl_context()
     if context:
         cmd += ["--context", context]
     return cmd
 
 
+def _kubeconfig_signature():
+    """Paths and modification times of the kubeconfig files kubectl reads."""
+    configured = os.environ.get("KUBECONFIG") or str(Path.home() / ".kube" / "config")
+    signature = []
+    for path in configured.split(os.pathsep):
+        if not path:
+            continue
+        try:
+            signature.append([path, os.stat(path).st_mtime_ns])
+        except OSError:
+            signature.append([path, None])
+    return signature
+
+
 def get_current_context():
     context = kubectl_context()
     if context:
         return context
-    result = run_command(kubectl_base_cmd() + ["config", "current-context"])
-    return result.stdout.strip()
+    client = api_client()
+    if client is not None:
+        return client.context
+    signature = _kubeconfig_signature()
+    context = cache_get("context", match=signature)
+    if context is None:
+        result = run_command(kubectl_base_cmd() + ["config", "current-context"])
+        context = result.stdout.strip()
+        cache_put("context", context, match=signature)
+    return context
 
 
 def get_pods_json(namespace, selector, timeout=None):
+    client = api_client()
+    if client is not None:
+        return client.request(
+            "GET",
+            f"/api/v1/namespaces/{namespace}/pods",
+            params={"labelSelector": selector},
+            timeout=timeout,
+        )
     cmd = kubectl_base_cmd() + [
         "get",
         "pods",
@@ -52,6 +213,13 @@ def get_pods_json(namespace, selector, timeout=None):
 
 
 def get_pod_json(namespace, pod_name, timeout=None):
+    client = api_client()
+    if client is not None:
+        path = f"/api/v1/namespaces/{namespace}/pods/{pod_name}"
+        data = client.request("GET", path, timeout=timeout, missing_ok=True)
+        if data is None:
+            raise AppError(f"Pod not found: {pod_name}")
+        return data
     cmd = kubectl_base_cmd() + ["get", "pod", pod_name, "-n", namespace, "-o", "json"]
     result = run_command(cmd, timeout=timeout)
     try:
@@ -60,7 +228,13 @@ def get_pod_json(namespace, pod_name, timeout=None):
         raise AppError("Failed to parse kubectl JSON output") from exc
 
 
-def select_pod_from_json(data, explicit_pod=None):
+def select_pod_from_json(data, explicit_pod=None, strategy="first", avoid=(), turn=0, load=None):
+    """Name of the pod to use from a pod list.
+
+    Running pods that are not being deleted are the candidates, minus those
+    in ``avoid`` unless that leaves none. ``turn`` drives ``round-robin``;
+    ``load`` maps candidate names to load scores for ``least-loaded``.
+    """
     items = data.get("items") or []
     if not items:
         raise AppError("No pods found for selector")
@@ -72,15 +246,110 @@ def select_pod_from_json(data, explicit_pod=None):
         raise AppError(f"Pod not found: {explicit_pod}")
 
     running = [
-        item
+        item.get("metadata", {}).get("name")
         for item in items
         if item.get("status", {}).get("phase") == "Running"
+        and not item.get("metadata", {}).get("deletionTimestamp")
     ]
-    selected = running[0] if running else items[0]
-    name = selected.get("metadata", {}).get("name")
-    if not name:
-        raise AppError("Pod selection failed: missing pod name")
-    return name
+    running = [name for name in running if name]
+    if not running:
+        name = items[0].get("metadata", {}).get("name")
+        if not name:
+            raise AppError("Pod selection failed: missing pod name")
+        return name
+
+    candidates = [name for name in running if name not in avoid] or running
+    if len(candidates) == 1 or strategy == "first":
+        return candidates[0]
+    if strategy == "round-robin":
+        return sorted(candidates)[turn % len(candidates)]
+    if strategy == "least-loaded" and load is not None:
+        scores = load(candidates)
+        if scores:
+            # Ties are broken at random so idle pods share new work.
+            return min(scores, key=lambda name: (scores[name], random.random()))
+    return random.choice(candidates)
+
+
+def _failed_key(namespace):
+    return "failed:" + json.dumps([get_current_context(), namespace])
+
+
+def cooling_pods(namespace):
+    """Pods of ``namespace`` that failed within the cooldown period."""
+    cooldown = pod_cooldown()
+    if cooldown <= 0:
+        return set()
+    failed = cache_get(_failed_key(namespace)) or {}
+    now = time.time()
+    return {pod for pod, failed_at in failed.items() if now - failed_at < cooldown}
+
+
+def mark_pod_failed(namespace, pod):
+    if pod_cooldown() <= 0:
+        return
+    key = _failed_key(namespace)
+    cooling = cooling_pods(namespace)
+    failed = {name: at for name, at in (cache_get(key) or {}).items() if name in cooling}
+    failed[pod] = time.time()
+    cache_put(key, failed)
+
+
+def _next_turn(namespace, selector):
+    """Advance this user's round-robin position; a new one starts at random."""
+    key = "turn:" + json.dumps([get_current_context(), namespace, selector])
+    turn = cache_get(key)
+    turn = random.randrange(1 << 16) if turn is None else turn + 1
+    cache_put(key, turn)
+    return turn
+
+
+def _pod_load(namespace, pod, timeout):
+    from adt_dummy import k8s_api
+    from adt_dummy.services import load
+
+    client = api_client()
+    output = None
+    if client is not None:
+        stdout = io.BytesIO()
+        returncode = client.exec(
+            namespace, pod, LOAD_COMMAND, stdout, io.BytesIO(), timeout=timeout
+        )
+        if returncode == 0:
+            output = stdout.getvalue()
+        elif returncode is not k8s_api.UNSUPPORTED:
+            return None
+    if output is None:
+        cmd = build_exec_cmd(namespace, pod, LOAD_COMMAND)
+        result = run_command(cmd, timeout=timeout, check=False)
+        if result.returncode != 0:
+            return None
+        output = result.stdout
+    try:
+        return load.score(json.loads(output))
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def probe_load(namespace, pods, timeout=None):
+    """Load scores of ``pods``, probed in parallel.
+
+    Pods that do not answer in time are marked failed; pods without the
+    probe command (older images) are left out.
+    """
+    timeout = min(timeout or PROBE_TIMEOUT_SECONDS, PROBE_TIMEOUT_SECONDS)
+    with ThreadPoolExecutor(max_workers=min(len(pods), PROBE_WORKERS)) as pool:
+        futures = {pod: pool.submit(_pod_load, namespace, pod, timeout) for pod in pods}
+    scores = {}
+    for pod, future in futures.items():
+        try:
+            score = future.result()
+        except AppError:
+            mark_pod_failed(namespace, pod)
+            continue
+        if score is not None:
+            scores[pod] = score
+    return scores
 
 
 def find_pod(namespace, selector, explicit_pod=None, timeout=None):
@@ -88,10 +357,77 @@ def find_pod(namespace, selector, explicit_pod=None, timeout=None):
         get_pod_json(namespace, explicit_pod, timeout=timeout)
         return explicit_pod
     data = get_pods_json(namespace, selector, timeout=timeout)
-    return select_pod_from_json(data, explicit_pod=explicit_pod)
+    strategy = pod_strategy()
+    return select_pod_from_json(
+        data,
+        strategy=strategy,
+        avoid=cooling_pods(namespace),
+        turn=_next_turn(namespace, selector) if strategy == "round-robin" else 0,
+        load=lambda pods: probe_load(namespace, pods, timeout=timeout),
+    )
+
+
+def _pod_key(namespace, selector, explicit_pod):
+    return "pod:" + json.dumps([get_current_context(), namespace, selector, explicit_pod])
+
+
+def cached_pod(namespace, selector, explicit_pod=None, timeout=None):
+    """Like :func:`find_pod`, reusing a recent selection; returns ``(pod, from_cache)``."""
+    ttl = pod_cache_ttl()
+    key = _pod_key(namespace, selector, explicit_pod) if ttl > 0 else None
+    pod = cache_get(key, ttl=ttl) if key else None
+    if pod:
+        return pod, True
+    pod = find_pod(namespace, selector, explicit_pod=explicit_pod, timeout=timeout)
+    if key:
+        cache_put(key, pod)
+    return pod, False
+
+
+def forget_pod(namespace, selector, explicit_pod=None):
+    cache_drop(_pod_key(namespace, selector, explicit_pod))
+
+
+def pod_is_gone(namespace, pod, timeout=None):
+    """True when ``pod`` no longer exists, is being deleted or is not running."""
+    client = api_client()
+    if client is not None:
+        path = f"/api/v1/namespaces/{namespace}/pods/{pod}"
+        data = client.request("GET", path, timeout=timeout, missing_ok=True)
+        if data is None:
+            return True
+    else:
+        cmd = kubectl_base_cmd() + ["get", "pod", pod, "-n", namespace, "-o", "json"]
+        result = run_command(cmd, timeout=timeout, check=False)
+        if result.returncode != 0:
+            return "NotFound" in result.stderr
+        try:
+            data = json.loads(result.stdout)
+        except json.JSONDecodeError:
+            return False
+    if data.get("metadata", {}).get("deletionTimestamp"):
+        return True
+    return data.get("status", {}).get("phase") != "Running"
 
 
 def can_exec(namespace):
+    client = api_client()
+    if client is not None:
+        review = {
+            "apiVersion": "authorization.k8s.io/v1",
+            "kind": "SelfSubjectAccessReview",
+            "spec": {
+                "resourceAttributes": {
+                    "namespace": namespace,
+                    "verb": "create",
+                    "resource": "pods",
+                    "subresource": "exec",
+                }
+            },
+        }
+        path = "/apis/authorization.k8s.io/v1/selfsubjectaccessreviews"
+        data = client.request("POST", path, body=review)
+        return "yes" if data.get("status", {}).get("allowed") else "no"
     cmd = kubectl_base_cmd() + ["auth", "can-i", "create", "pods/exec", "-n", namespace]
     result = run_command(cmd, check=False)
     return result.stdout.strip()
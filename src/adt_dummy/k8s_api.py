@@ -0,0 +1,353 @@
+"""Kubernetes API backend: kubeconfig, pooled HTTPS calls and exec over a websocket.
+
+Selected with ``ADT_DUMMY_K8S_BACKEND=api`` (or ``auto``). The kubeconfig is
+read once per process and API calls share one ``requests`` session, so no
+kubectl process starts and no auth plugin runs per call. Credentials from
+exec auth plugins are kept in the discovery cache until they expire.
+Commands run over the ``v5.channel.k8s.io`` exec websocket, which can
+close stdin; against API servers without it the caller falls back to
+kubectl.
+"""
+
+import atexit
+import base64
+import hashlib
+import json
+import os
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import quote, urlencode
+
+from adt_dummy import k8s
+from adt_dummy.core.errors import AppError
+
+EXEC_PROTOCOL = "v5.channel.k8s.io"
+STDIN, STDOUT, STDERR, ERROR, CLOSE = 0, 1, 2, 3, 255
+STDIN_CHUNK_SIZE = 64 * 1024
+CREDENTIAL_MARGIN_SECONDS = 60
+PLUGIN_TIMEOUT_SECONDS = 60
+
+UNSUPPORTED = object()
+
+_clients = {}
+
+
+def _yaml():
+    try:
+        import yaml
+    except ImportError as exc:
+        raise AppError(
+            "PyYAML is required for the Kubernetes API backend. Install adt-dummy[k8s]."
+        ) from exc
+    return yaml
+
+
+def _websocket():
+    try:
+        import websocket
+    except ImportError as exc:
+        raise AppError(
+            "websocket-client is required for the Kubernetes API backend. "
+            "Install adt-dummy[k8s]."
+        ) from exc
+    return websocket
+
+
+def kubeconfig_paths():
+    configured = os.environ.get("KUBECONFIG")
+    if configured:
+        return [Path(path).expanduser() for path in configured.split(os.pathsep) if path]
+    return [Path.home() / ".kube" / "config"]
+
+
+def load_kubeconfig(paths=None):
+    """Merge kubeconfig files the way kubectl does: the first definition of a name wins.
+
+    Every context, cluster and user remembers the directory of its file in
+    ``_base``, so relative file references resolve like in kubectl.
+    """
+    yaml = _yaml()
+    merged = {"current-context": None, "contexts": {}, "clusters": {}, "users": {}}
+    for path in paths or kubeconfig_paths():
+        try:
+            data = yaml.safe_load(Path(path).read_text()) or {}
+        except OSError:
+            continue
+        except yaml.YAMLError as exc:
+            raise AppError(f"Failed to parse kubeconfig {path}: {exc}") from exc
+        merged["current-context"] = merged["current-context"] or data.get("current-context")
+        for section, key in (("contexts", "context"), ("clusters", "cluster"), ("users", "user")):
+            for item in data.get(section) or []:
+                name = item.get("name")
+                if name and name not in merged[section]:
+                    merged[section][name] = dict(item.get(key) or {}, _base=str(Path(path).parent))
+    return merged
+
+
+def _timestamp(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def _plugin_credential(spec):
+    """``status`` of an exec auth plugin's ExecCredential, cached until it expires."""
+    key = "credential:" + hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+    cached = k8s.cache_get(key)
+    if cached and cached["expires"] - time.time() > CREDENTIAL_MARGIN_SECONDS:
+        return cached["status"]
+
+    command = spec.get("command")
+    if not command:
+        raise AppError("The kubeconfig exec plugin has no command.")
+    if os.sep in command and not os.path.isabs(command):
+        command = str(Path(spec["_base"]) / command)
+    plugin_env = dict(os.environ)
+    for item in spec.get("env") or []:
+        plugin_env[item["name"]] = item["value"]
+    plugin_env["KUBERNETES_EXEC_INFO"] = json.dumps(
+        {
+            "apiVersion": spec.get("apiVersion", "client.authentication.k8s.io/v1"),
+            "kind": "ExecCredential",
+            "spec": {"interactive": False},
+        }
+    )
+    try:
+        result = subprocess.run(
+            [command] + list(spec.get("args") or []),
+            env=plugin_env,
+            capture_output=True,
+            text=True,
+            timeout=PLUGIN_TIMEOUT_SECONDS,
+        )
+    except (OSError, subprocess.TimeoutExpired) as exc:
+        raise AppError(f"Failed to run the kubeconfig exec plugin {command}: {exc}") from exc
+    if result.returncode != 0:
+        raise AppError(f"The kubeconfig exec plugin {command} failed: {result.stderr.strip()}")
+    try:
+        status = json.loads(result.stdout).get("status") or {}
+    except ValueError as exc:
+        raise AppError(f"The kubeconfig exec plugin {command} returned invalid JSON") from exc
+    expires = _timestamp(status.get("expirationTimestamp"))
+    if expires:
+        k8s.cache_put(key, {"status": status, "expires": expires})
+    return status
+
+
+class _TempFiles:
+    """Files for inline certificate data, removed when the process exits."""
+
+    def __init__(self):
+        self._directory = None
+
+    def write(self, data):
+        if self._directory is None:
+            self._directory = tempfile.mkdtemp(prefix="adt-dummy-k8s-")
+            atexit.register(shutil.rmtree, self._directory, True)
+        fd, path = tempfile.mkstemp(dir=self._directory)
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        return path
+
+
+class ApiClient:
+    """Talks to the API server of one kubeconfig context."""
+
+    def __init__(self, config, context=None):
+        import requests
+
+        context = context or config["current-context"]
+        if not context:
+            raise AppError("The kubeconfig has no current context.")
+        entry = config["contexts"].get(context)
+        if entry is None:
+            raise AppError(f"Context not found in kubeconfig: {context}")
+        cluster = config["clusters"].get(entry.get("cluster"))
+        if not cluster or not cluster.get("server"):
+            raise AppError(f"Cluster of context {context} has no server in kubeconfig.")
+        if cluster.get("proxy-url"):
+            raise AppError("proxy-url in kubeconfig is not supported by the API backend.")
+        user = config["users"].get(entry.get("user")) or {}
+
+        self.context = context
+        self.server = cluster["server"].rstrip("/")
+        self._files = _TempFiles()
+        if cluster.get("insecure-skip-tls-verify"):
+            self.verify = False
+        else:
+            self.verify = self._file(cluster, "certificate-authority") or True
+        self.cert = None
+        self.headers = {}
+        self._authenticate(user)
+
+        self.session = requests.Session()
+        self.session.verify = self.verify
+        self.session.cert = self.cert
+        self.session.headers.update(self.headers)
+
+    def _file(self, section, key):
+        """Path of ``key`` (a file) or ``key-data`` (base64) from a kubeconfig section."""
+        if section.get(f"{key}-data"):
+            return self._files.write(base64.b64decode(section[f"{key}-data"]))
+        if section.get(key):
+            return str(Path(section["_base"]) / Path(section[key]).expanduser())
+        return None
+
+    def _authenticate(self, user):
+        if user.get("auth-provider"):
+            raise AppError("auth-provider in kubeconfig is not supported by the API backend.")
+        if user.get("exec"):
+            status = _plugin_credential(dict(user["exec"], _base=user["_base"]))
+            if status.get("token"):
+                self.headers["Authorization"] = f"Bearer {status['token']}"
+            if status.get("clientCertificateData"):
+                self.cert = (
+                    self._files.write(status["clientCertificateData"].encode()),
+                    self._files.write(status["clientKeyData"].encode()),
+                )
+            return
+        token = user.get("token")
+        if not token and user.get("tokenFile"):
+            token = Path(self._file(user, "tokenFile")).read_text().strip()
+        if token:
+            self.headers["Authorization"] = f"Bearer {token}"
+        elif user.get("username"):
+            basic = f"{user['username']}:{user.get('password', '')}".encode()
+            self.headers["Authorization"] = "Basic " + base64.b64encode(basic).decode()
+        certificate = self._file(user, "client-certificate")
+        if certificate:
+            self.cert = (certificate, self._file(user, "client-key"))
+
+    def request(self, method, path, body=None, params=None, timeout=None, missing_ok=False):
+        """JSON response of an API call; ``None`` for a 404 when ``missing_ok``."""
+        import requests
+
+        try:
+            response = self.session.request(
+                method, self.server + path, params=params, json=body, timeout=timeout
+            )
+        except requests.RequestException as exc:
+            raise AppError(f"Kubernetes API request failed: {exc}") from exc
+        if missing_ok and response.status_code == 404:
+            return None
+        if response.status_code >= 400:
+            try:
+                message = response.json().get("message")
+            except ValueError:
+                message = response.text.strip()
+            raise AppError(message or f"Kubernetes API returned HTTP {response.status_code}")
+        try:
+            return response.json()
+        except ValueError as exc:
+            raise AppError("Failed to parse Kubernetes API response") from exc
+
+    def _sslopt(self):
+        if self.verify is False:
+            options = {"cert_reqs": ssl.CERT_NONE, "check_hostname": False}
+        elif self.verify is True:
+            options = {}
+        else:
+            options = {"ca_certs": self.verify}
+        if self.cert:
+            options["certfile"], options["keyfile"] = self.cert
+        return options
+
+    def exec(self, namespace, pod, command_args, stdout, stderr, input_data=None, timeout=None):
+        """Run ``command_args`` in ``pod`` and return its exit code.
+
+        stdout and stderr are written to the binary sinks as they arrive;
+        ``timeout`` is an inactivity timeout. Returns :data:`UNSUPPORTED`
+        when the server does not speak ``v5.channel.k8s.io``.
+        """
+        websocket = _websocket()
+        params = [("command", arg) for arg in command_args]
+        params += [("stdin", "true" if input_data is not None else "false")]
+        params += [("stdout", "true"), ("stderr", "true")]
+        url = (
+            self.server.replace("https://", "wss://", 1).replace("http://", "ws://", 1)
+            + f"/api/v1/namespaces/{quote(namespace)}/pods/{quote(pod)}/exec?"
+            + urlencode(params)
+        )
+        try:
+            ws = websocket.create_connection(
+                url,
+                timeout=timeout or None,
+                subprotocols=[EXEC_PROTOCOL],
+                header=[f"{name}: {value}" for name, value in self.headers.items()],
+                sslopt=self._sslopt(),
+            )
+        except websocket.WebSocketBadStatusException as exc:
+            raise AppError(f"Kubernetes exec failed: HTTP {exc.status_code}") from exc
+        except (websocket.WebSocketException, OSError) as exc:
+            raise AppError(f"Kubernetes exec failed: {exc}") from exc
+        if ws.getsubprotocol() != EXEC_PROTOCOL:
+            ws.close()
+            return UNSUPPORTED
+        if input_data is not None:
+            threading.Thread(target=_feed_stdin, args=(ws, input_data), daemon=True).start()
+
+        status = None
+        try:
+            while True:
+                opcode, data = ws.recv_data()
+                if opcode == websocket.ABNF.OPCODE_CLOSE:
+                    break
+                if len(data) < 2:
+                    continue
+                channel, payload = data[0], data[1:]
+                if channel == STDOUT:
+                    stdout.write(payload)
+                    stdout.flush()
+                elif channel == STDERR:
+                    stderr.write(payload)
+                    stderr.flush()
+                elif channel == ERROR:
+                    status = json.loads(payload)
+        except websocket.WebSocketTimeoutException as exc:
+            raise AppError(
+                f"Command produced no output for {timeout}s: {' '.join(command_args)}"
+            ) from exc
+        except websocket.WebSocketConnectionClosedException:
+            pass
+        finally:
+            ws.shutdown()
+        return _exit_code(status)
+
+
+def _feed_stdin(ws, data):
+    try:
+        for start in range(0, len(data), STDIN_CHUNK_SIZE):
+            ws.send_binary(bytes([STDIN]) + data[start : start + STDIN_CHUNK_SIZE])
+        ws.send_binary(bytes([CLOSE, STDIN]))
+    except Exception:
+        pass
+
+
+def _exit_code(status):
+    """Exit code from the ``Status`` the server sends on the error channel."""
+    if status is None:
+        raise AppError("The exec stream ended without an exit status.")
+    if status.get("status") == "Success":
+        return 0
+    if status.get("reason") == "NonZeroExitCode":
+        for cause in (status.get("details") or {}).get("causes") or []:
+            if cause.get("reason") == "ExitCode":
+                return int(cause["message"])
+    raise AppError(status.get("message") or "Kubernetes exec failed")
+
+
+def client(context=None):
+    """The :class:`ApiClient` for ``context`` (default: current), created once per process."""
+    key = context or ""
+    if key not in _clients:
+        _clients[key] = ApiClient(load_kubeconfig(), context)
+    return _clients[key]
@@ -1,26 +1,173 @@
 """Local execution that proxies commands into a toolbox pod."""
 
+import io
+import subprocess
+import sys
+
 import click
 
-from adt_dummy.core import env
+from adt_dummy import k8s_api
+from adt_dummy.core import env, transport
 from adt_dummy.core.errors import AppError
-from adt_dummy.core.proc import run_command, run_interactive
-from adt_dummy.k8s import build_exec_cmd, find_pod
+from adt_dummy.core.proc import StderrFilter, run_command, run_interactive, stream_command
+from adt_dummy.k8s import (
+    api_client,
+    build_exec_cmd,
+    cached_pod,
+    find_pod,
+    forget_pod,
+    get_current_context,
+    mark_pod_failed,
+    pod_is_gone,
+)
+from adt_dummy.services import agent
 
 
-def proxy_to_remote(
-    command_args, stdin_data=None, timeout=None, tty=False, interactive=False, capture_output=False
-):
+def _pod_settings():
     namespace = env.get_env("ADT_DUMMY_NAMESPACE", default="adt-dynamic")
     selector = env.get_env(
         "ADT_DUMMY_POD_SELECTOR", default="app.kubernetes.io/name=adt-dummy"
     )
     explicit_pod = env.get_env("ADT_DUMMY_POD", default=None)
+    return namespace, selector, explicit_pod
+
+
+def agent_target():
+    """The kube context and pod settings a call needs the agent to be attached to."""
+    namespace, selector, explicit_pod = _pod_settings()
+    return {
+        "context": get_current_context(),
+        "namespace": namespace,
+        "selector": selector,
+        "pod": explicit_pod,
+    }
+
+
+def _target_pod(timeout):
+    namespace, selector, explicit_pod = _pod_settings()
+    pod = find_pod(namespace, selector, explicit_pod=explicit_pod, timeout=timeout)
+    return namespace, pod
+
+
+class _WatchedSink:
+    """Forwards to ``sink`` and remembers whether any output arrived."""
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.written = False
+
+    def write(self, data):
+        self.written = True
+        return self.sink.write(data)
+
+    def flush(self):
+        self.sink.flush()
+
+
+def remote_exec_cmd(command_args):
+    """``kubectl exec -i`` command line for a long-lived process in the toolbox pod."""
+    timeout = env.get_int_env("ADT_DUMMY_EXEC_TIMEOUT_SECONDS", default=60)
+    namespace, pod = _target_pod(timeout)
+    return build_exec_cmd(namespace, pod, command_args, interactive=True)
+
+
+def proxy_to_remote(
+    command_args,
+    stdin_data=None,
+    timeout=None,
+    tty=False,
+    interactive=False,
+    capture_output=False,
+    stream_to=None,
+    on_control=None,
+):
     exec_timeout = env.get_int_env("ADT_DUMMY_EXEC_TIMEOUT_SECONDS", default=60)
     timeout = timeout if timeout is not None else exec_timeout
 
-    pod = find_pod(namespace, selector, explicit_pod=explicit_pod, timeout=timeout)
+    if not (interactive or tty):
+        result = agent.forward(
+            command_args,
+            stdin_data=stdin_data,
+            timeout=timeout,
+            capture_output=capture_output,
+            stream_to=stream_to,
+            on_control=on_control,
+            get_target=agent_target,
+        )
+        if result is not agent.UNAVAILABLE:
+            return result
+
+    namespace, selector, explicit_pod = _pod_settings()
+    pod, from_cache = cached_pod(namespace, selector, explicit_pod=explicit_pod, timeout=timeout)
     needs_stdin = stdin_data is not None
+    spec = transport.local_spec() if stream_to is not None else None
+    if spec:
+        codec, level = transport.parse_spec(spec)
+        command_args = transport.with_flag(command_args, spec)
+        if needs_stdin:
+            stdin_data = transport.compress_all(codec, level, stdin_data)
+        stream_to = transport.DecompressingSink(stream_to, codec)
+    watched = _WatchedSink(stream_to) if stream_to is not None else None
+    options = dict(
+        tty=tty,
+        interactive=interactive,
+        needs_stdin=needs_stdin,
+        stdin_data=stdin_data,
+        timeout=timeout,
+        capture_output=capture_output,
+        stream_to=watched,
+        on_control=on_control,
+    )
+    try:
+        result = _exec_in_pod(namespace, pod, command_args, **options)
+    except AppError:
+        # Only a pod taken from the discovery cache is checked, and only when
+        # nothing came back from it: then the command never ran and can be
+        # sent again to a freshly discovered pod.
+        if not from_cache or (watched is not None and watched.written):
+            raise
+        if not pod_is_gone(namespace, pod, timeout=timeout):
+            raise
+        forget_pod(namespace, selector, explicit_pod)
+        mark_pod_failed(namespace, pod)
+        click.echo(f"Pod {pod} is gone; looking up the toolbox pod again.", err=True)
+        pod, _ = cached_pod(namespace, selector, explicit_pod=explicit_pod, timeout=timeout)
+        result = _exec_in_pod(namespace, pod, command_args, **options)
+    if spec:
+        stream_to.check_complete()
+    return result
+
+
+def _exec_in_pod(
+    namespace,
+    pod,
+    command_args,
+    tty,
+    interactive,
+    needs_stdin,
+    stdin_data,
+    timeout,
+    capture_output,
+    stream_to,
+    on_control,
+):
+    if not interactive:
+        client = api_client()
+        if client is not None:
+            result = _api_exec(
+                client,
+                namespace,
+                pod,
+                command_args,
+                stdin_data,
+                timeout,
+                capture_output,
+                stream_to,
+                on_control,
+            )
+            if result is not k8s_api.UNSUPPORTED:
+                return result
+
     cmd = build_exec_cmd(
         namespace,
         pod,
@@ -33,9 +180,55 @@ def proxy_to_remote(
         exit_code = run_interactive(cmd)
         if exit_code != 0:
             raise AppError("Remote shell exited with an error", exit_code=exit_code)
-        return
+        return None
+
+    if stream_to is not None:
+        returncode = stream_command(
+            cmd, stream_to, input_data=stdin_data, timeout=timeout, on_control=on_control
+        )
+        if returncode != 0:
+            raise AppError("Remote command failed", exit_code=returncode)
+        return None
 
     result = run_command(cmd, input_text=stdin_data, timeout=timeout, check=False)
+    return _finish_captured(result, capture_output)
+
+
+def _api_exec(
+    client, namespace, pod, command_args, stdin_data, timeout, capture_output, stream_to, on_control
+):
+    """Run the command over the API exec stream; UNSUPPORTED sends it to kubectl."""
+    if isinstance(stdin_data, str):
+        stdin_data = stdin_data.encode()
+    if stream_to is not None:
+        stderr = StderrFilter(on_control) if on_control is not None else sys.stderr.buffer
+        returncode = client.exec(
+            namespace, pod, command_args, stream_to, stderr, input_data=stdin_data, timeout=timeout
+        )
+        if returncode is k8s_api.UNSUPPORTED:
+            return returncode
+        if on_control is not None:
+            stderr.close()
+        if returncode != 0:
+            raise AppError("Remote command failed", exit_code=returncode)
+        return None
+
+    stdout, stderr = io.BytesIO(), io.BytesIO()
+    returncode = client.exec(
+        namespace, pod, command_args, stdout, stderr, input_data=stdin_data, timeout=timeout
+    )
+    if returncode is k8s_api.UNSUPPORTED:
+        return returncode
+    result = subprocess.CompletedProcess(
+        command_args,
+        returncode,
+        stdout.getvalue().decode("utf-8", errors="replace"),
+        stderr.getvalue().decode("utf-8", errors="replace"),
+    )
+    return _finish_captured(result, capture_output)
+
+
+def _finish_captured(result, capture_output):
     if result.stderr:
         click.echo(result.stderr, err=True, nl=False)
     if result.returncode != 0:
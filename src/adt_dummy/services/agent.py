@@ -0,0 +1,531 @@
+"""Local agent that keeps one ``kubectl exec`` into the toolbox pod open.
+
+``dami agent`` starts ``dami __remote agent`` in the pod once and listens on a
+local unix socket. Proxied commands hand their ``__remote`` arguments and
+stdin to the agent when the socket answers, and run their own ``kubectl
+exec`` otherwise. The agent multiplexes the requests onto the exec as channel
+frames. The pod runs each one as the regular ``__remote`` command in a worker
+thread, with warm Trino connections, and streams stdout, stderr and the exit
+code back. When the exec ends, the next request starts a new one on a freshly
+discovered pod.
+"""
+
+import io
+import json
+import os
+import queue
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from adt_dummy import __version__
+from adt_dummy.core import env, framing, inproc, transport
+from adt_dummy.core.cache import cache_root
+from adt_dummy.core.errors import AppError
+from adt_dummy.core.proc import StderrFilter
+
+AGENT_COMMANDS = {"bench", "doctor", "meta", "net", "py", "query"}
+READY_CHANNEL = 0
+RETRY_SECONDS = 5
+POLL_SECONDS = 0.1
+
+UNAVAILABLE = object()
+_LOST = object()
+
+
+def socket_path():
+    configured = env.get_env("ADT_DUMMY_AGENT_SOCKET", default=None)
+    return Path(configured).expanduser() if configured else cache_root() / "agent.sock"
+
+
+def work(command, stdin, stdout, pool_size=None):
+    """Serve channel requests from ``stdin`` until it closes (``dami __remote agent``)."""
+    from adt_dummy.services import trino
+
+    if pool_size is None:
+        pool_size = env.get_int_env("ADT_DUMMY_SERVER_POOL_SIZE", default=4)
+    pool = trino.ConnectionPool(pool_size)
+    trino.set_connection_pool(pool)
+    lock = threading.Lock()
+    pending = {}
+    running = {}
+
+    def _exit(channel, value):
+        with lock:
+            payload = json.dumps(value).encode("utf-8")
+            framing.write_channel_frame(stdout, channel, framing.EXIT, payload)
+            stdout.flush()
+
+    def _run(channel, request, stdin_data):
+        out = framing.FrameSink(stdout, framing.STDOUT, lock, channel=channel)
+        err = framing.FrameSink(stdout, framing.STDERR, lock, channel=channel)
+        writer = None
+        try:
+            args = request["args"]
+            if not args or args[0] not in AGENT_COMMANDS:
+                raise AppError(f"Command is not served by the agent: {' '.join(args[:1])}")
+            if request.get("compression"):
+                codec, level = transport.parse_spec(request["compression"])
+                writer = transport.CompressingWriter(out, codec, level)
+            exit_code = inproc.run_command(command, args, stdin_data, writer or out, err)
+        except AppError as exc:
+            err.write(f"Error: {exc}\n".encode("utf-8"))
+            exit_code = exc.exit_code
+        except Exception as exc:
+            err.write(f"Error: {exc}\n".encode("utf-8"))
+            exit_code = 1
+        finally:
+            if writer is not None:
+                writer.close()
+            running.pop(channel, None)
+        _exit(channel, {"exit_code": exit_code})
+
+    _exit(READY_CHANNEL, {"ready": True, "version": __version__})
+    try:
+        while True:
+            frame = framing.read_frame(stdin)
+            if frame is None:
+                break
+            kind, payload = frame
+            channel, payload = framing.split_channel(payload)
+            if kind == framing.REQUEST:
+                pending[channel] = framing.read_json(payload)
+            elif kind == framing.STDIN and channel in pending:
+                thread = threading.Thread(
+                    target=_run,
+                    args=(channel, pending.pop(channel), payload),
+                    name=f"agent-{channel}",
+                    daemon=True,
+                )
+                running[channel] = thread
+                thread.start()
+            elif kind == framing.CANCEL and channel in running:
+                trino.cancel_thread(running[channel])
+    finally:
+        trino.cancel_all()
+        for thread in list(running.values()):
+            thread.join(RETRY_SECONDS)
+        pool.close()
+        trino.set_connection_pool(None)
+
+
+class _Worker:
+    """One ``dami __remote agent`` in the pod, started with the exec command ``cmd``."""
+
+    def __init__(self, cmd, timeout):
+        self.pod = cmd[cmd.index("--") - 1] if "--" in cmd else None
+        try:
+            # A new session keeps Ctrl-C in the agent's terminal away from kubectl.
+            self.process = subprocess.Popen(
+                cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, start_new_session=True
+            )
+        except FileNotFoundError as exc:
+            raise AppError(f"Executable not found: {cmd[0]}") from exc
+        self.alive = True
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._channels = {READY_CHANNEL: queue.Queue()}
+        self._next_channel = READY_CHANNEL + 1
+        threading.Thread(target=self._read, name="agent-worker", daemon=True).start()
+        try:
+            frame = self._channels[READY_CHANNEL].get(timeout=timeout)
+        except queue.Empty:
+            frame = _LOST
+        self.close_channel(READY_CHANNEL)
+        if frame is _LOST:
+            self.close()
+            raise AppError(f"The agent could not start dami __remote agent in pod {self.pod}.")
+        self.info = framing.read_json(frame[1])
+
+    def _read(self):
+        try:
+            while True:
+                frame = framing.read_frame(self.process.stdout)
+                if frame is None:
+                    break
+                kind, payload = frame
+                channel, payload = framing.split_channel(payload)
+                with self._lock:
+                    frames = self._channels.get(channel)
+                if frames is not None:
+                    frames.put((kind, payload))
+        except (AppError, OSError, ValueError):
+            pass
+        with self._lock:
+            self.alive = False
+            channels = list(self._channels.values())
+        for frames in channels:
+            frames.put(_LOST)
+
+    def open(self):
+        """A new ``(channel, frames)`` pair; ``frames`` ends with a lost marker if the exec ends."""
+        with self._lock:
+            if not self.alive:
+                raise AppError("The agent's exec into the pod has ended.")
+            channel = self._next_channel
+            self._next_channel += 1
+            frames = self._channels[channel] = queue.Queue()
+        return channel, frames
+
+    def close_channel(self, channel):
+        with self._lock:
+            self._channels.pop(channel, None)
+
+    def active(self):
+        with self._lock:
+            return len(self._channels)
+
+    def send(self, channel, kind, payload=b""):
+        try:
+            with self._write_lock:
+                framing.write_channel_frame(self.process.stdin, channel, kind, payload)
+                self.process.stdin.flush()
+        except (OSError, ValueError) as exc:
+            raise AppError("The agent's exec into the pod has ended.") from exc
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+class Agent:
+    """Hands requests to a :class:`_Worker`, starting a new one when the last one ended.
+
+    ``exec_cmd`` returns the ``kubectl exec`` command line for a new worker.
+    After a failed start, requests are turned away for ``RETRY_SECONDS`` so
+    that callers fall back to their own exec without waiting. Requests for
+    another ``target`` (kube context and pod settings) are turned away too;
+    ``None`` serves every request.
+    """
+
+    def __init__(self, exec_cmd, timeout, target=None):
+        self.exec_cmd = exec_cmd
+        self.timeout = timeout
+        self.target = target
+        self.started = time.time()
+        self.requests = 0
+        self._worker = None
+        self._failed_at = None
+        self._lock = threading.Lock()
+
+    def worker(self):
+        with self._lock:
+            if self._worker is not None and self._worker.alive:
+                return self._worker
+            if self._worker is not None:
+                self._worker.close()
+                self._worker = None
+            if self._failed_at is not None and time.monotonic() - self._failed_at < RETRY_SECONDS:
+                raise AppError("The agent could not reach the pod recently.")
+            try:
+                self._worker = _Worker(self.exec_cmd(), self.timeout)
+            except AppError:
+                self._failed_at = time.monotonic()
+                raise
+            self._failed_at = None
+            return self._worker
+
+    def status(self):
+        worker = self._worker
+        connected = worker is not None and worker.alive
+        return {
+            "pid": os.getpid(),
+            "socket": str(socket_path()),
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "connected": connected,
+            "pod": worker.pod if connected else None,
+            "target": self.target,
+            "active": worker.active() if connected else 0,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._worker is not None:
+                self._worker.close()
+                self._worker = None
+
+
+def _shutdown(sock):
+    """Wake a thread blocked reading ``sock`` so its file can be closed."""
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def finish(self):
+        _shutdown(self.connection)
+        super().finish()
+
+    def handle(self):
+        frame = framing.read_frame(self.rfile)
+        if frame is None or frame[0] != framing.REQUEST:
+            return
+        request = framing.read_json(frame[1])
+        op = request.get("op", "run")
+        if op == "status":
+            self._exit(self.server.agent.status())
+        elif op == "stop":
+            self._exit({"stopped": True})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        else:
+            frame = framing.read_frame(self.rfile)
+            self._run(request, frame[1] if frame and frame[0] == framing.STDIN else b"")
+
+    def _reply(self, kind, payload):
+        framing.write_frame(self.wfile, kind, payload)
+        self.wfile.flush()
+
+    def _exit(self, value):
+        self._reply(framing.EXIT, json.dumps(value).encode("utf-8"))
+
+    def _run(self, request, stdin_data):
+        agent = self.server.agent
+        if agent.target is not None and request.get("target") != agent.target:
+            self._exit({"unavailable": "The agent is attached to another target."})
+            return
+        try:
+            worker = agent.worker()
+            channel, frames = worker.open()
+        except AppError as exc:
+            self._exit({"unavailable": str(exc)})
+            return
+        agent.requests += 1
+        sent = False
+        try:
+            worker.send(channel, framing.REQUEST, json.dumps(request).encode("utf-8"))
+            worker.send(channel, framing.STDIN, stdin_data)
+            sent = True
+            threading.Thread(target=self._watch_client, args=(worker, channel), daemon=True).start()
+            while True:
+                frame = frames.get()
+                if frame is _LOST:
+                    self._exit({"lost": True})
+                    return
+                kind, payload = frame
+                self._reply(kind, payload)
+                if kind == framing.EXIT:
+                    return
+        except AppError as exc:
+            self._exit({"lost": True} if sent else {"unavailable": str(exc)})
+        except OSError:
+            self._cancel(worker, channel)
+        finally:
+            worker.close_channel(channel)
+
+    def _watch_client(self, worker, channel):
+        """Forward the client's cancel, or cancel when it goes away mid-request."""
+        try:
+            while True:
+                frame = framing.read_frame(self.rfile)
+                if frame is None:
+                    break
+                if frame[0] == framing.CANCEL:
+                    self._cancel(worker, channel)
+        except (AppError, OSError, ValueError):
+            pass
+        self._cancel(worker, channel)
+
+    def _cancel(self, worker, channel):
+        try:
+            worker.send(channel, framing.CANCEL)
+        except AppError:
+            pass
+
+
+class AgentServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, agent):
+        self.agent = agent
+        super().__init__(str(path), _Handler)
+
+
+def serve(agent, path=None):
+    path = Path(path or socket_path())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        if request("status", path) is not None:
+            raise AppError(f"An agent is already listening on {path}")
+        path.unlink()
+
+    umask = os.umask(0o077)
+    try:
+        server = AgentServer(path, agent)
+    finally:
+        os.umask(umask)
+
+    def _stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        agent.close()
+        if path.exists():
+            path.unlink()
+
+
+def _connect(path):
+    if not os.path.exists(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def request(op, path=None):
+    """Send ``op`` (``status`` or ``stop``) to the agent; ``None`` when none answers."""
+    sock = _connect(path or socket_path())
+    if sock is None:
+        return None
+    with sock, sock.makefile("rwb") as stream:
+        framing.write_json_frame(stream, framing.REQUEST, {"op": op})
+        stream.flush()
+        try:
+            frame = framing.read_frame(stream)
+        except (AppError, OSError):
+            return None
+    return framing.read_json(frame[1]) if frame else None
+
+
+def _read_frames(stream, frames):
+    try:
+        while True:
+            frame = framing.read_frame(stream)
+            if frame is None:
+                break
+            frames.put(frame)
+    except (AppError, OSError, ValueError):
+        pass
+    frames.put(_LOST)
+
+
+def forward(
+    command_args,
+    stdin_data=None,
+    timeout=None,
+    capture_output=False,
+    stream_to=None,
+    on_control=None,
+    get_target=None,
+    path=None,
+):
+    """Run ``command_args`` (``dami __remote ...``) through the agent.
+
+    Returns :data:`UNAVAILABLE` when no agent answers, when it serves
+    another target than ``get_target()`` (called only once an agent
+    answers), or when it could not hand the request to its exec, so the
+    caller can run its own exec. Once
+    the request reached the pod a lost exec is an error, so nothing runs
+    twice. Otherwise it behaves like ``proxy_to_remote``.
+    """
+    if not env.get_bool_env("ADT_DUMMY_AGENT", default=True) or "__remote" not in command_args:
+        return UNAVAILABLE
+    args = transport.strip_flag(command_args[command_args.index("__remote") + 1 :])
+    if not args or args[0] not in AGENT_COMMANDS:
+        return UNAVAILABLE
+    sock = _connect(path or socket_path())
+    if sock is None:
+        return UNAVAILABLE
+
+    spec = transport.local_spec() if stream_to is not None else None
+    captured = io.BytesIO() if capture_output else None
+    sink = stream_to if stream_to is not None else captured or sys.stdout.buffer
+    if spec:
+        codec, _ = transport.parse_spec(spec)
+        sink = transport.DecompressingSink(sink, codec)
+    stderr = StderrFilter(on_control) if on_control is not None else None
+    if isinstance(stdin_data, str):
+        stdin_data = stdin_data.encode("utf-8")
+
+    with sock, sock.makefile("rwb") as stream:
+        target = get_target() if get_target is not None else None
+        framing.write_json_frame(
+            stream, framing.REQUEST, {"args": args, "compression": spec, "target": target}
+        )
+        framing.write_frame(stream, framing.STDIN, stdin_data or b"")
+        stream.flush()
+        frames = queue.Queue()
+        threading.Thread(target=_read_frames, args=(stream, frames), daemon=True).start()
+
+        def _cancel():
+            try:
+                framing.write_frame(stream, framing.CANCEL)
+                stream.flush()
+            except OSError:
+                pass
+
+        try:
+            cancelled = False
+            last = time.monotonic()
+            while True:
+                try:
+                    frame = frames.get(timeout=POLL_SECONDS)
+                except queue.Empty:
+                    if timeout and time.monotonic() - last >= timeout:
+                        _cancel()
+                        command = " ".join(args)
+                        raise AppError(
+                            f"Command produced no output for {timeout}s: dami __remote {command}"
+                        )
+                    continue
+                except KeyboardInterrupt:
+                    if cancelled:
+                        raise
+                    cancelled = True
+                    _cancel()
+                    continue
+                last = time.monotonic()
+                if frame is _LOST:
+                    raise AppError("The agent closed the connection unexpectedly.")
+                kind, payload = frame
+                if kind == framing.STDOUT:
+                    sink.write(payload)
+                    sink.flush()
+                elif kind == framing.STDERR:
+                    if stderr is not None:
+                        stderr.write(payload)
+                    else:
+                        sys.stderr.buffer.write(payload)
+                        sys.stderr.buffer.flush()
+                elif kind == framing.EXIT:
+                    result = framing.read_json(payload)
+                    break
+        finally:
+            _shutdown(sock)
+
+    if "unavailable" in result:
+        return UNAVAILABLE
+    if result.get("lost"):
+        raise AppError("The agent lost its exec into the pod.")
+    if stderr is not None:
+        stderr.close()
+    if spec:
+        sink.check_complete()
+    if result["exit_code"] != 0:
+        raise AppError("Remote command failed", exit_code=result["exit_code"])
+    if capture_output:
+        return captured.getvalue().decode("utf-8")
+    return None
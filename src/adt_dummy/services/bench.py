@@ -0,0 +1,133 @@
+"""Repeatable latency and throughput measurements for Trino queries."""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+from adt_dummy.core.errors import AppError
+from adt_dummy.core.output import format_table
+from adt_dummy.services import trino
+from adt_dummy.services.progress import QueryMonitor, human_bytes, human_count
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of ``values`` (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def latency_summary(values):
+    summary = {f"p{pct}": percentile(values, pct) for pct in PERCENTILES}
+    summary["min"] = min(values) if values else 0.0
+    summary["max"] = max(values) if values else 0.0
+    summary["mean"] = sum(values) / len(values) if values else 0.0
+    return summary
+
+
+def run_once(query, max_rows=0):
+    """Run ``query`` to completion and time its first row and its last."""
+    monitor = QueryMonitor()
+    started = time.perf_counter()
+    first_row = None
+    rows = 0
+    try:
+        with trino.stream_query(query, max_rows=max_rows, monitor=monitor) as batches:
+            for batch in batches:
+                if first_row is None:
+                    first_row = time.perf_counter() - started
+                rows += len(batch)
+    except AppError as exc:
+        return {"error": str(exc), "total_seconds": time.perf_counter() - started}
+    total = time.perf_counter() - started
+    final = monitor.final or {}
+    return {
+        "query_id": final.get("query_id"),
+        "first_row_seconds": total if first_row is None else first_row,
+        "total_seconds": total,
+        "rows": rows,
+        "bytes": (final.get("stats") or {}).get("processedBytes") or 0,
+    }
+
+
+def run_benchmark(query, iterations=10, warmup=1, concurrency=1, max_rows=0, on_run=None):
+    """Run ``warmup`` unrecorded passes, then ``iterations`` timed runs.
+
+    ``on_run(number, run)`` is called as each timed run completes.
+    """
+    pool = trino.ConnectionPool(concurrency)
+    trino.set_connection_pool(pool)
+    try:
+        for _ in range(warmup):
+            run_once(query, max_rows)
+        started = time.perf_counter()
+        runs = []
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(run_once, query, max_rows) for _ in range(iterations)]
+            for future in as_completed(futures):
+                runs.append(future.result())
+                if on_run is not None:
+                    on_run(len(runs), runs[-1])
+        wall = time.perf_counter() - started
+    finally:
+        trino.set_connection_pool(None)
+        pool.close()
+    return build_report(runs, wall, iterations=iterations, warmup=warmup, concurrency=concurrency)
+
+
+def format_run(number, total, run, label="run"):
+    if "error" in run:
+        return (
+            f"{label} {number}/{total}: error after {_ms(run['total_seconds'])} ms: {run['error']}"
+        )
+    return (
+        f"{label} {number}/{total}: first row {_ms(run['first_row_seconds'])} ms, "
+        f"total {_ms(run['total_seconds'])} ms, {run['rows']} rows"
+    )
+
+
+def build_report(runs, wall, **settings):
+    ok = [run for run in runs if "error" not in run]
+    rows = sum(run["rows"] for run in ok)
+    processed = sum(run["bytes"] for run in ok)
+    return dict(
+        settings,
+        started_at=datetime.now(timezone.utc).isoformat(),
+        wall_seconds=wall,
+        errors=len(runs) - len(ok),
+        first_row=latency_summary([run["first_row_seconds"] for run in ok]),
+        total=latency_summary([run["total_seconds"] for run in ok]),
+        rows=rows,
+        processed_bytes=processed,
+        rows_per_second=rows / wall if wall else 0.0,
+        bytes_per_second=processed / wall if wall else 0.0,
+        runs=runs,
+    )
+
+
+def _ms(seconds):
+    return f"{seconds * 1000:.1f}"
+
+
+def format_report(report, title="in-cluster"):
+    columns = ["", "p50 ms", "p95 ms", "p99 ms", "min ms", "max ms"]
+    rows = []
+    for label, key in (("first row", "first_row"), ("total", "total")):
+        summary = report[key]
+        rows.append(
+            [f"{title} {label}"]
+            + [_ms(summary[f"p{pct}"]) for pct in PERCENTILES]
+            + [_ms(summary["min"]), _ms(summary["max"])]
+        )
+    header = (
+        f"{title}: {report['iterations']} runs, concurrency {report['concurrency']}, "
+        f"{report['errors']} errors, {human_count(report['rows_per_second'])} rows/s, "
+        f"{human_bytes(report['bytes_per_second'])}/s processed"
+    )
+    return header + "\n" + format_table(columns, rows)
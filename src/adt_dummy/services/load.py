@@ -0,0 +1,54 @@
+"""Load probe used to pick the least busy toolbox pod."""
+
+import os
+
+from adt_dummy.core import transport
+
+PROC_ROOT = "/proc"
+REMOTE_MARKER = "__remote"
+# Long-lived ``__remote`` processes that sit idle between requests.
+RESIDENT_COMMANDS = {"server", "agent"}
+
+
+def _is_active_command(argv):
+    if REMOTE_MARKER not in argv:
+        return False
+    args = transport.strip_flag(argv[argv.index(REMOTE_MARKER) + 1 :])
+    return bool(args) and args[0] not in RESIDENT_COMMANDS
+
+
+def active_commands():
+    """Number of ``dami __remote`` commands running in this pod, not counting the caller.
+
+    The resident query server and agent workers are not counted.
+    """
+    own = os.getpid()
+    try:
+        entries = os.listdir(PROC_ROOT)
+    except OSError:
+        return 0
+    count = 0
+    for entry in entries:
+        if not entry.isdigit() or int(entry) == own:
+            continue
+        try:
+            with open(os.path.join(PROC_ROOT, entry, "cmdline"), "rb") as handle:
+                argv = handle.read().decode("utf-8", "replace").split("\0")
+        except OSError:
+            continue
+        if _is_active_command(argv):
+            count += 1
+    return count
+
+
+def snapshot():
+    try:
+        loadavg = os.getloadavg()[0]
+    except OSError:
+        loadavg = 0.0
+    return {"active": active_commands(), "loadavg": loadavg, "cpus": os.cpu_count() or 1}
+
+
+def score(data):
+    """Running commands plus the 1-minute load per CPU; lower is less busy."""
+    return data["active"] + data["loadavg"] / max(data["cpus"], 1)
@@ -0,0 +1,343 @@
+"""Catalog, schema, table and column metadata with a local SQLite cache.
+
+The pod reads metadata from Trino's ``information_schema`` and sends it as
+JSON lines, one record per catalog list, schema list or schema. The local
+CLI stores each record in its own transaction as it arrives, so a bulk load
+of a large catalog is kept schema by schema even if it is interrupted.
+"""
+
+import json
+import sqlite3
+import time
+
+from adt_dummy.core import env
+from adt_dummy.core.cache import cache_key, cache_namespace, cache_root
+from adt_dummy.core.errors import AppError
+from adt_dummy.services import trino
+
+LEVELS = ["catalogs", "schemas", "tables", "columns"]
+
+DEFAULT_TTLS = {
+    "catalogs": 86400,
+    "schemas": 86400,
+    "tables": 3600,
+    "columns": 3600,
+}
+
+SYSTEM_SCHEMA = "information_schema"
+COMPLETION_LIMIT = 200
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS loads (
+    namespace TEXT NOT NULL,
+    level TEXT NOT NULL,
+    catalog TEXT NOT NULL,
+    schema TEXT NOT NULL,
+    loaded REAL NOT NULL,
+    PRIMARY KEY (namespace, level, catalog, schema)
+);
+CREATE TABLE IF NOT EXISTS catalogs (
+    namespace TEXT NOT NULL,
+    catalog TEXT NOT NULL,
+    PRIMARY KEY (namespace, catalog)
+);
+CREATE TABLE IF NOT EXISTS schemas (
+    namespace TEXT NOT NULL,
+    catalog TEXT NOT NULL,
+    schema TEXT NOT NULL,
+    PRIMARY KEY (namespace, catalog, schema)
+);
+CREATE TABLE IF NOT EXISTS tables (
+    namespace TEXT NOT NULL,
+    catalog TEXT NOT NULL,
+    schema TEXT NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT,
+    PRIMARY KEY (namespace, catalog, schema, name)
+);
+CREATE TABLE IF NOT EXISTS columns (
+    namespace TEXT NOT NULL,
+    catalog TEXT NOT NULL,
+    schema TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT,
+    ordinal INTEGER,
+    PRIMARY KEY (namespace, catalog, schema, table_name, name)
+);
+"""
+
+
+def level_ttl(level):
+    return env.get_int_env(
+        f"ADT_DUMMY_META_{level.upper()}_TTL_SECONDS", default=DEFAULT_TTLS[level]
+    )
+
+
+def split_name(name, parts):
+    """Split ``catalog.schema[.table]`` into exactly ``parts`` lower-cased names."""
+    pieces = [piece.strip().strip('"').lower() for piece in (name or "").split(".")]
+    if len(pieces) != parts or not all(pieces):
+        expected = ".".join(["catalog", "schema", "table"][:parts])
+        raise AppError(f"Invalid name: {name!r}. Use {expected}.")
+    return pieces
+
+
+def quote_identifier(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _like_escape(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _schema_filter(schemas):
+    if schemas:
+        literals = ", ".join(trino.sql_literal(schema) for schema in schemas)
+        return f"table_schema IN ({literals})"
+    return f"table_schema <> '{SYSTEM_SCHEMA}'"
+
+
+def _grouped(sql, schemas):
+    """Stream ``sql`` (schema first, sorted by schema) as ``(schema, rows)`` groups.
+
+    Every schema in ``schemas`` gets a group, even one without rows, so an
+    empty schema is recorded as loaded.
+    """
+    seen = set()
+    with trino.stream_query(sql, max_rows=0) as batches:
+        current, rows = None, []
+        for batch in batches:
+            for row in batch:
+                if row[0] != current:
+                    if current is not None:
+                        yield current, rows
+                        seen.add(current)
+                    current, rows = row[0], []
+                rows.append(list(row[1:]))
+        if current is not None:
+            yield current, rows
+            seen.add(current)
+    for schema in schemas or ():
+        if schema not in seen:
+            yield schema, []
+
+
+def load(levels, catalog=None, schemas=()):
+    """Read metadata from Trino and yield one JSON-compatible record at a time."""
+    if "catalogs" in levels:
+        _, rows, _ = trino.execute_query("SHOW CATALOGS", max_rows=0)
+        yield {"level": "catalogs", "catalogs": sorted(row[0] for row in rows)}
+    if catalog is None:
+        return
+    source = f"{quote_identifier(catalog)}.{SYSTEM_SCHEMA}"
+    if "schemas" in levels:
+        _, rows, _ = trino.execute_query(
+            f"SELECT schema_name FROM {source}.schemata ORDER BY schema_name", max_rows=0
+        )
+        yield {"level": "schemas", "catalog": catalog, "schemas": [row[0] for row in rows]}
+    if "tables" in levels:
+        sql = (
+            f"SELECT table_schema, table_name, table_type FROM {source}.tables "
+            f"WHERE {_schema_filter(schemas)} ORDER BY table_schema, table_name"
+        )
+        for schema, rows in _grouped(sql, schemas):
+            yield {"level": "tables", "catalog": catalog, "schema": schema, "tables": rows}
+    if "columns" in levels:
+        sql = (
+            "SELECT table_schema, table_name, column_name, data_type, ordinal_position "
+            f"FROM {source}.columns WHERE {_schema_filter(schemas)} "
+            "ORDER BY table_schema, table_name, ordinal_position"
+        )
+        for schema, rows in _grouped(sql, schemas):
+            yield {"level": "columns", "catalog": catalog, "schema": schema, "columns": rows}
+
+
+class RecordSink:
+    """Binary sink that stores each complete JSON line of records as it arrives."""
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.counts = dict.fromkeys(LEVELS, 0)
+        self._buffer = b""
+
+    def add(self, record):
+        self.cache.store(record)
+        self.counts[record["level"]] += 1
+
+    def write(self, data):
+        self._buffer += data
+        *lines, self._buffer = self._buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                self.add(json.loads(line))
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+class MetadataCache:
+    """SQLite store of metadata records, with one load time per level and scope.
+
+    The scope of a load is the catalog (for schemas) or the schema (for
+    tables and columns). Rows are kept per ``namespace`` so different Trino
+    users, hosts and clusters do not mix.
+    """
+
+    def __init__(self, path, namespace):
+        self.path = path
+        self.namespace = namespace
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(path), timeout=10)
+        self.db.executescript(SCHEMA_SQL)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def age(self, level, catalog="", schema=""):
+        """Seconds since ``level`` was loaded for the scope, or ``None``."""
+        row = self.db.execute(
+            "SELECT loaded FROM loads WHERE namespace = ? AND level = ? AND catalog = ? "
+            "AND schema = ?",
+            (self.namespace, level, catalog, schema),
+        ).fetchone()
+        return None if row is None else time.time() - row[0]
+
+    def is_fresh(self, level, catalog="", schema=""):
+        age = self.age(level, catalog, schema)
+        return age is not None and age <= level_ttl(level)
+
+    def _mark(self, level, catalog="", schema=""):
+        self.db.execute(
+            "INSERT OR REPLACE INTO loads VALUES (?, ?, ?, ?, ?)",
+            (self.namespace, level, catalog, schema, time.time()),
+        )
+
+    def _delete(self, table, where, args):
+        self.db.execute(
+            f"DELETE FROM {table} WHERE namespace = ? AND {where}", (self.namespace,) + args
+        )
+
+    def store(self, record):
+        level = record["level"]
+        with self.db:
+            if level == "catalogs":
+                self.db.execute("DELETE FROM catalogs WHERE namespace = ?", (self.namespace,))
+                self.db.executemany(
+                    "INSERT INTO catalogs VALUES (?, ?)",
+                    [(self.namespace, catalog) for catalog in record["catalogs"]],
+                )
+                self._mark(level)
+            elif level == "schemas":
+                catalog = record["catalog"]
+                self._delete("schemas", "catalog = ?", (catalog,))
+                self.db.executemany(
+                    "INSERT INTO schemas VALUES (?, ?, ?)",
+                    [(self.namespace, catalog, schema) for schema in record["schemas"]],
+                )
+                self._mark(level, catalog)
+            elif level == "tables":
+                catalog, schema = record["catalog"], record["schema"]
+                self._delete("tables", "catalog = ? AND schema = ?", (catalog, schema))
+                self.db.executemany(
+                    "INSERT INTO tables VALUES (?, ?, ?, ?, ?)",
+                    [(self.namespace, catalog, schema, *table) for table in record["tables"]],
+                )
+                self._mark(level, catalog, schema)
+            elif level == "columns":
+                catalog, schema = record["catalog"], record["schema"]
+                self._delete("columns", "catalog = ? AND schema = ?", (catalog, schema))
+                self.db.executemany(
+                    "INSERT INTO columns VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(self.namespace, catalog, schema, *column) for column in record["columns"]],
+                )
+                self._mark(level, catalog, schema)
+            else:
+                raise AppError(f"Unknown metadata record: {level!r}")
+
+    def _rows(self, sql, args=()):
+        return [list(row) for row in self.db.execute(sql, (self.namespace,) + tuple(args))]
+
+    def catalogs(self):
+        return self._rows("SELECT catalog FROM catalogs WHERE namespace = ? ORDER BY catalog")
+
+    def schemas(self, catalog):
+        return self._rows(
+            "SELECT schema FROM schemas WHERE namespace = ? AND catalog = ? ORDER BY schema",
+            (catalog,),
+        )
+
+    def tables(self, catalog, schema):
+        return self._rows(
+            "SELECT name, type FROM tables WHERE namespace = ? AND catalog = ? AND schema = ? "
+            "ORDER BY name",
+            (catalog, schema),
+        )
+
+    def columns(self, catalog, schema, table):
+        return self._rows(
+            "SELECT name, type FROM columns WHERE namespace = ? AND catalog = ? AND schema = ? "
+            "AND table_name = ? ORDER BY ordinal",
+            (catalog, schema, table),
+        )
+
+    def search(self, text, catalog=None, limit=None):
+        """Cached columns whose name contains ``text``, ignoring case."""
+        pattern = "%" + _like_escape(text) + "%"
+        sql = (
+            "SELECT catalog, schema, table_name, name, type FROM columns "
+            "WHERE namespace = ? AND name LIKE ? ESCAPE '\\'"
+        )
+        args = [pattern]
+        if catalog:
+            sql += " AND catalog = ?"
+            args.append(catalog)
+        sql += " ORDER BY catalog, schema, table_name, ordinal"
+        if limit:
+            sql += " LIMIT ?"
+            args.append(limit)
+        return self._rows(sql, args)
+
+    def complete_tables(self, prefix):
+        """Qualified table names starting with ``prefix``, from tables and columns."""
+        return [
+            row[0]
+            for row in self.db.execute(
+                "SELECT name FROM ("
+                "SELECT catalog || '.' || schema || '.' || name AS name FROM tables "
+                "WHERE namespace = ? UNION "
+                "SELECT catalog || '.' || schema || '.' || table_name FROM columns "
+                "WHERE namespace = ?) WHERE name LIKE ? ESCAPE '\\' ORDER BY name LIMIT ?",
+                (
+                    self.namespace,
+                    self.namespace,
+                    _like_escape(prefix) + "%",
+                    COMPLETION_LIMIT,
+                ),
+            )
+        ]
+
+    def complete_schemas(self, prefix):
+        return [
+            f"{catalog}.{schema}"
+            for catalog, schema in self.db.execute(
+                "SELECT catalog, schema FROM schemas WHERE namespace = ? ORDER BY 1, 2",
+                (self.namespace,),
+            )
+            if f"{catalog}.{schema}".startswith(prefix)
+        ][:COMPLETION_LIMIT]
+
+    def complete_catalogs(self, prefix):
+        return [row[0] for row in self.catalogs() if row[0].startswith(prefix)]
+
+
+def metadata_cache():
+    return MetadataCache(cache_root() / "meta.sqlite3", cache_key(cache_namespace()))
@@ -0,0 +1,212 @@
+"""Operator-level profile of a finished Trino query from the coordinator's query info."""
+
+import re
+import time
+
+import requests
+
+from adt_dummy.core.errors import AppError
+from adt_dummy.core.output import format_table
+from adt_dummy.services import trino
+from adt_dummy.services.progress import human_bytes, human_count
+
+TOP_OPERATORS = 10
+INFO_WAIT_SECONDS = 5.0
+
+DURATION_RE = re.compile(r"^\s*([\d.]+)\s*(ns|us|ms|s|m|h|d)\s*$")
+DATA_SIZE_RE = re.compile(r"^\s*([\d.]+)\s*(B|kB|KB|MB|GB|TB|PB)\s*$")
+
+DURATION_UNITS = {
+    "ns": 1e-9,
+    "us": 1e-6,
+    "ms": 1e-3,
+    "s": 1.0,
+    "m": 60.0,
+    "h": 3600.0,
+    "d": 86400.0,
+}
+DATA_SIZE_UNITS = {
+    "B": 1,
+    "kB": 1024,
+    "KB": 1024,
+    "MB": 1024**2,
+    "GB": 1024**3,
+    "TB": 1024**4,
+    "PB": 1024**5,
+}
+
+
+def parse_duration(value):
+    """Seconds from an airlift duration such as ``"12.5ms"``; numbers pass through."""
+    if value is None:
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = DURATION_RE.match(value)
+    if not match:
+        return 0.0
+    return float(match.group(1)) * DURATION_UNITS[match.group(2)]
+
+
+def parse_data_size(value):
+    """Bytes from an airlift data size such as ``"1.5MB"``; numbers pass through."""
+    if value is None:
+        return 0
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = DATA_SIZE_RE.match(value)
+    if not match:
+        return 0
+    return int(float(match.group(1)) * DATA_SIZE_UNITS[match.group(2)])
+
+
+def fetch_query_info(query_id, wait=INFO_WAIT_SECONDS):
+    """GET ``/v1/query/{id}``, waiting briefly for the final query info."""
+    settings = trino.connection_settings()
+    url = f"{settings['scheme']}://{settings['host']}:{settings['port']}/v1/query/{query_id}"
+    deadline = time.monotonic() + wait
+    while True:
+        try:
+            response = requests.get(
+                url,
+                auth=(settings["user"], settings["password"]),
+                headers={"X-Trino-User": settings["user"]},
+                verify=settings["verify"],
+                timeout=30,
+            )
+            response.raise_for_status()
+            info = response.json()
+        except (requests.RequestException, ValueError) as exc:
+            raise AppError(f"Failed to fetch query info for {query_id}: {exc}") from exc
+        if info.get("finalQueryInfo") or time.monotonic() >= deadline:
+            return info
+        time.sleep(0.2)
+
+
+def _stages(stage):
+    if not stage:
+        return
+    yield stage
+    for child in stage.get("subStages") or []:
+        yield from _stages(child)
+
+
+def _operator(summary):
+    wall = sum(
+        parse_duration(summary.get(key)) for key in ("addInputWall", "getOutputWall", "finishWall")
+    )
+    cpu = sum(
+        parse_duration(summary.get(key)) for key in ("addInputCpu", "getOutputCpu", "finishCpu")
+    )
+    return {
+        "stage": summary.get("stageId"),
+        "pipeline": summary.get("pipelineId"),
+        "operator_id": summary.get("operatorId"),
+        "plan_node": summary.get("planNodeId"),
+        "operator": summary.get("operatorType"),
+        "wall_seconds": wall,
+        "cpu_seconds": cpu,
+        "blocked_seconds": parse_duration(summary.get("blockedWall")),
+        "input_rows": summary.get("inputPositions") or 0,
+        "input_bytes": parse_data_size(summary.get("inputDataSize")),
+        "output_rows": summary.get("outputPositions") or 0,
+        "output_bytes": parse_data_size(summary.get("outputDataSize")),
+        "spilled_bytes": parse_data_size(summary.get("spilledDataSize")),
+    }
+
+
+def summarize(info):
+    """Reduce a query info document to query, stage and operator figures."""
+    stats = info.get("queryStats") or {}
+    stages = []
+    operators = []
+    for stage in _stages(info.get("outputStage")):
+        stage_stats = stage.get("stageStats") or {}
+        stages.append(
+            {
+                "stage": stage.get("stageId"),
+                "state": stage.get("state"),
+                "scheduled_seconds": parse_duration(stage_stats.get("totalScheduledTime")),
+                "cpu_seconds": parse_duration(stage_stats.get("totalCpuTime")),
+                "blocked_seconds": parse_duration(stage_stats.get("totalBlockedTime")),
+                "input_rows": stage_stats.get("rawInputPositions") or 0,
+                "input_bytes": parse_data_size(stage_stats.get("rawInputDataSize")),
+                "output_rows": stage_stats.get("outputPositions") or 0,
+                "spilled_bytes": parse_data_size(stage_stats.get("spilledDataSize")),
+            }
+        )
+        for summary in stage_stats.get("operatorSummaries") or []:
+            operators.append(_operator(summary))
+    if not operators:
+        operators = [_operator(summary) for summary in stats.get("operatorSummaries") or []]
+    operators.sort(key=lambda operator: operator["wall_seconds"], reverse=True)
+    return {
+        "query_id": info.get("queryId"),
+        "state": info.get("state"),
+        "elapsed_seconds": parse_duration(stats.get("elapsedTime")),
+        "queued_seconds": parse_duration(stats.get("queuedTime")),
+        "planning_seconds": parse_duration(stats.get("planningTime")),
+        "cpu_seconds": parse_duration(stats.get("totalCpuTime")),
+        "scheduled_seconds": parse_duration(stats.get("totalScheduledTime")),
+        "peak_memory_bytes": parse_data_size(stats.get("peakUserMemoryReservation")),
+        "input_rows": stats.get("rawInputPositions") or 0,
+        "input_bytes": parse_data_size(stats.get("rawInputDataSize")),
+        "spilled_bytes": parse_data_size(stats.get("spilledDataSize")),
+        "stages": stages,
+        "operators": operators,
+    }
+
+
+def _secs(value):
+    return f"{value:.2f}s"
+
+
+def format_profile(summary, top=TOP_OPERATORS):
+    lines = [
+        f"Query {summary['query_id']} {summary['state']}: "
+        f"elapsed {_secs(summary['elapsed_seconds'])}, "
+        f"queued {_secs(summary['queued_seconds'])}, "
+        f"planning {_secs(summary['planning_seconds'])}, "
+        f"cpu {_secs(summary['cpu_seconds'])}, "
+        f"peak memory {human_bytes(summary['peak_memory_bytes'])}, "
+        f"input {human_count(summary['input_rows'])} rows / "
+        f"{human_bytes(summary['input_bytes'])}, "
+        f"spilled {human_bytes(summary['spilled_bytes'])}",
+    ]
+    if summary["stages"]:
+        rows = [
+            [
+                stage["stage"],
+                stage["state"],
+                _secs(stage["scheduled_seconds"]),
+                _secs(stage["cpu_seconds"]),
+                _secs(stage["blocked_seconds"]),
+                human_count(stage["input_rows"]),
+                human_bytes(stage["input_bytes"]),
+                human_bytes(stage["spilled_bytes"]),
+            ]
+            for stage in summary["stages"]
+        ]
+        columns = ["stage", "state", "wall", "cpu", "blocked", "in rows", "in bytes", "spilled"]
+        lines += ["", "Stages:", format_table(columns, rows)]
+    if summary["operators"]:
+        rows = [
+            [
+                f"{op['stage']}.{op['pipeline']}.{op['operator_id']}",
+                op["operator"],
+                op["plan_node"],
+                _secs(op["wall_seconds"]),
+                _secs(op["cpu_seconds"]),
+                human_count(op["input_rows"]),
+                human_bytes(op["input_bytes"]),
+                human_bytes(op["spilled_bytes"]),
+            ]
+            for op in summary["operators"][:top]
+        ]
+        columns = ["id", "operator", "node", "wall", "cpu", "in rows", "in bytes", "spilled"]
+        lines += [
+            "",
+            f"Slowest operators (top {min(top, len(rows))}):",
+            format_table(columns, rows),
+        ]
+    return "\n".join(lines)
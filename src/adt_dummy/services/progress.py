@@ -0,0 +1,112 @@
+"""Live progress and final statistics for running Trino queries."""
+
+import threading
+
+from adt_dummy.core import inproc
+
+PROGRESS_INTERVAL = 0.5
+
+
+def human_count(value):
+    value = float(value or 0)
+    for unit in ("", "K", "M", "B"):
+        if abs(value) < 1000 or unit == "B":
+            return f"{value:.0f}{unit}" if unit == "" else f"{value:.1f}{unit}"
+        value /= 1000
+    return f"{value:.1f}B"
+
+
+def human_bytes(value):
+    value = float(value or 0)
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if abs(value) < 1024 or unit == "TB":
+            return f"{value:.0f}{unit}" if unit == "B" else f"{value:.1f}{unit}"
+        value /= 1024
+    return f"{value:.1f}TB"
+
+
+def _seconds(millis):
+    return f"{(millis or 0) / 1000:.1f}s"
+
+
+def format_progress(stats):
+    stats = stats or {}
+    parts = [
+        f"{stats.get('state') or 'STARTING':<9}",
+        f"elapsed {_seconds(stats.get('elapsedTimeMillis'))}",
+        f"queued {_seconds(stats.get('queuedTimeMillis'))}",
+        f"cpu {_seconds(stats.get('cpuTimeMillis'))}",
+        f"rows {human_count(stats.get('processedRows'))}",
+        f"bytes {human_bytes(stats.get('processedBytes'))}",
+    ]
+    total = stats.get("totalSplits") or 0
+    if total:
+        done = stats.get("completedSplits") or 0
+        parts.append(f"splits {done}/{total} ({done * 100 // total}%)")
+    return "  ".join(parts)
+
+
+def _snapshot_stats(cursor):
+    for _ in range(3):
+        try:
+            return dict(cursor.stats or {})
+        except RuntimeError:
+            continue
+    return {}
+
+
+class QueryMonitor:
+    """Watches a cursor while it runs.
+
+    With ``progress=True`` a background thread redraws one status line on
+    stderr. After :meth:`finish`, :attr:`final` holds the query id and the
+    last stats reported by the coordinator.
+    """
+
+    def __init__(self, progress=False, interval=PROGRESS_INTERVAL):
+        self.progress = progress
+        self.interval = interval
+        self.cursor = None
+        self.final = None
+        self._stream = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._width = 0
+
+    def start(self, cursor):
+        self.cursor = cursor
+        if self.progress:
+            self._stream = inproc.bound_stream("stderr")
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _draw(self, line):
+        self._width = max(self._width, len(line))
+        self._stream.write("\r" + line.ljust(self._width))
+        self._stream.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._draw(format_progress(_snapshot_stats(self.cursor)))
+
+    def snapshot(self):
+        return {
+            "query_id": self.cursor.query_id,
+            "info_uri": self.cursor.info_uri,
+            "stats": _snapshot_stats(self.cursor),
+        }
+
+    def finish(self):
+        if self.cursor is None:
+            return
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            if self._width:
+                self._stream.write("\r" + " " * self._width + "\r")
+                self._stream.flush()
+        try:
+            self.final = self.snapshot()
+        except Exception:
+            self.final = None
@@ -0,0 +1,209 @@
+"""In-pod query server that keeps modules loaded and Trino connections warm.
+
+``dami __remote server`` listens on a unix socket. ``dami __remote query``
+hands its argv and stdin to the server when the socket answers, and runs the
+query itself otherwise. Each request runs the regular ``__remote`` command in
+a server thread, so both paths share the same code. Ctrl-C in the client, or
+the client going away, cancels the request's queries.
+"""
+
+import os
+import queue
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from pathlib import Path
+
+from adt_dummy.core import env, framing, inproc, transport
+from adt_dummy.core.errors import AppError
+from adt_dummy.services import trino
+
+FORWARDED_COMMANDS = {"query"}
+
+
+def socket_path():
+    return env.get_env("ADT_DUMMY_SERVER_SOCKET", default="/tmp/adt-dummy/server.sock")
+
+
+def _shutdown(sock):
+    """Wake a thread blocked reading ``sock`` so its file can be closed."""
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def finish(self):
+        _shutdown(self.connection)
+        super().finish()
+
+    def handle(self):
+        lock = threading.Lock()
+        out = framing.FrameSink(self.wfile, framing.STDOUT, lock)
+        err = framing.FrameSink(self.wfile, framing.STDERR, lock)
+        try:
+            args, stdin_data = self._read_request()
+            if not args or args[0] not in FORWARDED_COMMANDS:
+                raise AppError(f"Command is not served: {' '.join(args[:1])}")
+            thread = threading.current_thread()
+            threading.Thread(target=self._watch_client, args=(thread,), daemon=True).start()
+            exit_code = inproc.run_command(self.server.command, args, stdin_data, out, err)
+        except AppError as exc:
+            err.write(f"Error: {exc}\n".encode("utf-8"))
+            exit_code = exc.exit_code
+        except Exception as exc:
+            err.write(f"Error: {exc}\n".encode("utf-8"))
+            exit_code = 1
+        with lock:
+            framing.write_json_frame(self.wfile, framing.EXIT, {"exit_code": exit_code})
+            self.wfile.flush()
+
+    def _read_request(self):
+        args, stdin_data = None, b""
+        while True:
+            frame = framing.read_frame(self.rfile)
+            if frame is None:
+                raise AppError("Incomplete request")
+            kind, payload = frame
+            if kind == framing.REQUEST:
+                args = framing.read_json(payload)["args"]
+            elif kind == framing.STDIN:
+                stdin_data = payload
+                return args, stdin_data
+
+    def _watch_client(self, thread):
+        """Cancel the request's queries on a CANCEL frame or when the client goes away."""
+        try:
+            while True:
+                frame = framing.read_frame(self.rfile)
+                if frame is None or frame[0] == framing.CANCEL:
+                    break
+        except (AppError, OSError, ValueError):
+            pass
+        trino.cancel_thread(thread)
+
+
+class QueryServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, command):
+        self.command = command
+        super().__init__(path, _Handler)
+
+
+def serve(command, path=None, pool_size=None):
+    path = path or socket_path()
+    if pool_size is None:
+        pool_size = env.get_int_env("ADT_DUMMY_SERVER_POOL_SIZE", default=4)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    if os.path.exists(path):
+        os.unlink(path)
+
+    pool = trino.ConnectionPool(pool_size)
+    trino.set_connection_pool(pool)
+    umask = os.umask(0o077)
+    try:
+        server = QueryServer(path, command)
+    finally:
+        os.umask(umask)
+
+    def _stop(signum, frame):
+        trino.cancel_all()
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        pool.close()
+        trino.set_connection_pool(None)
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def _connect(path):
+    if not os.path.exists(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def forward(args, read_stdin, path=None):
+    """Run ``args`` on the server and return the exit code.
+
+    Returns ``None`` without consuming stdin when no server is listening.
+    """
+    if inproc.is_active() or not env.get_bool_env("ADT_DUMMY_SERVER", default=True):
+        return None
+    sock = _connect(path or socket_path())
+    if sock is None:
+        return None
+
+    stdin_data = sys.stdin.buffer.read() if read_stdin else b""
+    stdout = sys.stdout.buffer
+    stderr = sys.stderr.buffer
+    with sock, sock.makefile("rwb") as stream:
+        framing.write_json_frame(stream, framing.REQUEST, {"args": list(args)})
+        framing.write_frame(stream, framing.STDIN, stdin_data)
+        stream.flush()
+        frames = queue.Queue()
+        threading.Thread(target=_read_frames, args=(stream, frames), daemon=True).start()
+        cancelled = False
+        try:
+            while True:
+                try:
+                    frame = frames.get()
+                except KeyboardInterrupt:
+                    if cancelled:
+                        raise
+                    cancelled = True
+                    try:
+                        framing.write_frame(stream, framing.CANCEL)
+                        stream.flush()
+                    except OSError:
+                        pass
+                    continue
+                if frame is None:
+                    raise AppError("Query server closed the connection unexpectedly")
+                kind, payload = frame
+                if kind == framing.STDOUT:
+                    stdout.write(payload)
+                    stdout.flush()
+                elif kind == framing.STDERR:
+                    stderr.write(payload)
+                    stderr.flush()
+                elif kind == framing.EXIT:
+                    return framing.read_json(payload)["exit_code"]
+        finally:
+            _shutdown(sock)
+
+
+def _read_frames(stream, frames):
+    """Queue the server's frames, then ``None`` once the connection ends."""
+    try:
+        while True:
+            frame = framing.read_frame(stream)
+            if frame is None:
+                break
+            frames.put(frame)
+    except (AppError, OSError, ValueError):
+        pass
+    frames.put(None)
+
+
+def remote_args():
+    """Arguments after ``__remote`` for the current process, or ``None``."""
+    argv = sys.argv[1:]
+    if "__remote" not in argv:
+        return None
+    return transport.strip_flag(argv[argv.index("__remote") + 1 :])
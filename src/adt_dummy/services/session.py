@@ -0,0 +1,158 @@
+"""Persistent SQL session for ``dami sql``.
+
+A :class:`Session` keeps one Trino connection, so ``USE`` and ``SET SESSION``
+carry over between statements. Locally, ``dami sql`` keeps one
+``kubectl exec`` running ``dami __remote session`` and talks to it through
+:class:`RemoteSession`: a request frame per statement, answered by the
+rendered output and an exit frame with the row count and timing. A cancel
+frame stops the running statement on the coordinator without ending the
+session.
+"""
+
+import json
+import queue
+import subprocess
+import threading
+import time
+
+from adt_dummy.core import framing
+from adt_dummy.core.errors import AppError
+from adt_dummy.core.output import format_output
+from adt_dummy.services import trino
+
+_CLOSED = object()
+
+
+class Session:
+    """Runs statements one at a time on a single Trino connection."""
+
+    def __init__(self, allow_write=False):
+        self.allow_write = allow_write
+        self._conn = trino.SessionConnection()
+
+    def run(self, sql, fmt="table", max_rows=200):
+        """Run one statement and return its rendered output, row count and timing."""
+        if not self.allow_write:
+            trino.ensure_read_only(sql)
+        started = time.monotonic()
+        with trino.QueryScope():
+            columns, rows, truncated = self._conn.execute(sql, max_rows)
+        return {
+            "output": format_output(columns, rows, fmt) if columns else "",
+            "rows": len(rows),
+            "truncated": truncated,
+            "seconds": time.monotonic() - started,
+        }
+
+    def close(self):
+        self._conn.close()
+
+
+def serve(stdin, stdout, allow_write=False):
+    """Answer request frames from ``stdin`` until it closes."""
+    requests = queue.Queue()
+
+    def _read():
+        try:
+            while True:
+                frame = framing.read_frame(stdin)
+                if frame is None:
+                    break
+                kind, payload = frame
+                if kind == framing.CANCEL:
+                    trino.cancel_all("interrupt")
+                elif kind == framing.REQUEST:
+                    requests.put(framing.read_json(payload))
+        finally:
+            requests.put(_CLOSED)
+
+    threading.Thread(target=_read, name="session-reader", daemon=True).start()
+    session = Session(allow_write=allow_write)
+    try:
+        while True:
+            request = requests.get()
+            if request is _CLOSED:
+                return
+            try:
+                result = session.run(request["sql"], request["format"], request["max_rows"])
+            except AppError as exc:
+                result = {"error": str(exc), "exit_code": exc.exit_code}
+            output = result.pop("output", "")
+            if output:
+                framing.write_frame(stdout, framing.STDOUT, output.encode("utf-8"))
+            framing.write_json_frame(stdout, framing.EXIT, result)
+            stdout.flush()
+    finally:
+        session.close()
+
+
+class RemoteSession:
+    """Client side of :func:`serve`, running ``cmd`` (a ``kubectl exec``) as a child."""
+
+    def __init__(self, cmd):
+        try:
+            # A new session keeps Ctrl-C away from kubectl; it cancels the statement instead.
+            self.process = subprocess.Popen(
+                cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, start_new_session=True
+            )
+        except FileNotFoundError as exc:
+            raise AppError(f"Executable not found: {cmd[0]}") from exc
+        self._frames = queue.Queue()
+        threading.Thread(target=self._read, name="session-frames", daemon=True).start()
+
+    def _read(self):
+        try:
+            while True:
+                frame = framing.read_frame(self.process.stdout)
+                if frame is None:
+                    break
+                self._frames.put(frame)
+        except (AppError, OSError):
+            pass
+        self._frames.put(_CLOSED)
+
+    def _send(self, kind, payload=b""):
+        try:
+            framing.write_frame(self.process.stdin, kind, payload)
+            self.process.stdin.flush()
+        except OSError as exc:
+            raise AppError("The SQL session in the pod has ended.") from exc
+
+    def _next_frame(self):
+        while True:
+            try:
+                return self._frames.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            except KeyboardInterrupt:
+                self._send(framing.CANCEL)
+
+    def run(self, sql, fmt="table", max_rows=200):
+        """Same contract as :meth:`Session.run`, executed in the pod."""
+        request = {"sql": sql, "format": fmt, "max_rows": max_rows}
+        self._send(framing.REQUEST, json.dumps(request).encode("utf-8"))
+        output = []
+        while True:
+            frame = self._next_frame()
+            if frame is _CLOSED:
+                raise AppError("The SQL session in the pod has ended.")
+            kind, payload = frame
+            if kind == framing.STDOUT:
+                output.append(payload)
+            elif kind == framing.EXIT:
+                result = framing.read_json(payload)
+                if "error" in result:
+                    raise AppError(result["error"], exit_code=result["exit_code"])
+                result["output"] = b"".join(output).decode("utf-8")
+                return result
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
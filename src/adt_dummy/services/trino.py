@@ -1,6 +1,17 @@
 """Trino query execution and SQL safety checks."""
 
+import hashlib
+import json
+import queue
 import re
+import signal
+import threading
+import time
+import weakref
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
 
 from trino.auth import BasicAuthentication
 from trino.dbapi import connect
@@ -34,7 +45,42 @@ FORBIDDEN_KEYWORDS = {
     "RENAME",
 }
 
-TOKEN_RE = re.compile(r"[A-Z_]+|[()]")
+_COMMENT = r"--[^\n]*\n?|/\*.*?(?:\*/|\Z)"
+_STRING = r"'(?:[^']+|'')*(?:'|\Z)|\"[^\"]*(?:\"|\Z)"
+
+# Each match first skips a run of characters that can never start a token
+# (digits, operators, whitespace), which keeps the scan in C for long
+# VALUES and IN lists.
+LEXER_RE = re.compile(
+    r"[^-/'\";()A-Za-z_\x80-\U0010ffff]*"
+    rf"(?:(?P<comment>{_COMMENT})"
+    rf"|(?P<string>{_STRING})"
+    r"|(?P<semicolon>;)"
+    r"|(?P<word>[^\W\d]+)"
+    r"|(?P<paren>[()])"
+    r"|(?P<other>.))",
+    re.S,
+)
+STRIP_RE = re.compile(rf"{_COMMENT}|{_STRING}", re.S)
+PLACEHOLDER_RE = re.compile(
+    rf"(?P<comment>{_COMMENT})"
+    rf"|(?P<string>{_STRING})"
+    r"|\{\{(?P<key>[^{}:]+)(?::(?P<type>[^{}]+))?\}\}",
+    re.S,
+)
+QUOTED_PLACEHOLDER_RE = re.compile(r"\{\{[^{}]+\}\}")
+TYPE_NAME_RE = re.compile(r"[A-Za-z][A-Za-z0-9_ ]*(?:\(\s*\d+\s*(?:,\s*\d+\s*)?\))?")
+WORD_TOKEN_RE = re.compile(r"[A-Z_]+")
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_PREFETCH = 8
+TIMEOUT_EXIT_CODE = 124
+INTERRUPT_EXIT_CODE = 130
+CANCEL_SIGNALS = ("SIGINT", "SIGTERM", "SIGHUP")
+PREPARED_PER_CONNECTION = 32
+
+QUERY_KEYWORDS = {"SELECT", "WITH", "SHOW", "DESCRIBE", "EXPLAIN", "VALUES"}
+SESSION_KEYWORDS = {"SET", "RESET", "USE"}
 
 
 def parse_params(param_pairs):
@@ -56,174 +102,153 @@ def apply_params(sql, params):
     return sql
 
 
-def split_sql_statements(sql):
-    statements = []
-    buffer = []
-    in_single = False
-    in_double = False
-    in_line_comment = False
-    in_block_comment = False
-    i = 0
-    while i < len(sql):
-        ch = sql[i]
-        nxt = sql[i + 1] if i + 1 < len(sql) else ""
-
-        if in_line_comment:
-            if ch == "\n":
-                in_line_comment = False
-            i += 1
-            continue
+def _param_value(value):
+    return value if isinstance(value, str) else json.dumps(value)
 
-        if in_block_comment:
-            if ch == "*" and nxt == "/":
-                in_block_comment = False
-                i += 2
-                continue
-            i += 1
-            continue
 
-        if in_single:
-            if ch == "'" and nxt == "'":
-                buffer.append(ch)
-                buffer.append(nxt)
-                i += 2
-                continue
-            if ch == "'":
-                in_single = False
-            buffer.append(ch)
-            i += 1
+def parse_param_sets(text, source="batch"):
+    """Parse JSON Lines of ``{"KEY": value}`` objects into parameter dicts."""
+    param_sets = []
+    for number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
             continue
+        try:
+            item = json.loads(line)
+        except ValueError as exc:
+            raise AppError(f"{source}:{number}: invalid JSON: {exc}") from exc
+        if not isinstance(item, dict):
+            raise AppError(f"{source}:{number}: expected a JSON object of parameters")
+        pairs = [f"{key}={_param_value(value)}" for key, value in item.items()]
+        param_sets.append(parse_params(pairs))
+    return param_sets
 
-        if in_double:
-            if ch == '"':
-                in_double = False
-            buffer.append(ch)
-            i += 1
-            continue
 
-        if ch == "-" and nxt == "-":
-            in_line_comment = True
-            i += 2
-            continue
+class PreparedQuery(namedtuple("PreparedQuery", ["sql", "values"])):
+    """A template with ``?`` placeholders and the SQL literals bound to them."""
 
-        if ch == "/" and nxt == "*":
-            in_block_comment = True
-            i += 2
-            continue
 
-        if ch == "'":
-            in_single = True
-            buffer.append(ch)
-            i += 1
-            continue
+def sql_literal(value, type_name=None):
+    """Render ``value`` as a varchar literal, or a cast to ``type_name``."""
+    quoted = "'" + value.replace("'", "''") + "'"
+    if type_name is None:
+        return quoted
+    type_name = type_name.strip()
+    if not TYPE_NAME_RE.fullmatch(type_name):
+        raise AppError(f"Invalid parameter type: {type_name}")
+    return f"CAST({quoted} AS {type_name.upper()})"
 
-        if ch == '"':
-            in_double = True
-            buffer.append(ch)
-            i += 1
-            continue
 
-        if ch == ";":
-            statement = "".join(buffer).strip()
-            if statement:
-                statements.append(statement)
-            buffer = []
-            i += 1
-            continue
+def prepare_params(sql, params):
+    """Turn ``{{KEY}}`` and ``{{KEY:type}}`` placeholders into bound parameters.
 
-        buffer.append(ch)
-        i += 1
+    Placeholders inside comments are left alone; placeholders inside quoted
+    strings or identifiers cannot be bound and are rejected.
+    """
+    values = []
 
-    trailing = "".join(buffer).strip()
-    if trailing:
-        statements.append(trailing)
-    return statements
+    def _replace(match):
+        if match.group("comment") is not None:
+            return match.group()
+        if match.group("string") is not None:
+            if QUOTED_PLACEHOLDER_RE.search(match.group()):
+                raise AppError(
+                    "Placeholders inside quotes cannot be bound in --param-mode prepare. "
+                    "Remove the quotes around {{KEY}}."
+                )
+            return match.group()
+        key = match.group("key").strip()
+        if key not in params:
+            raise AppError(f"No value for placeholder {{{{{key}}}}}. Use --param {key}=VALUE.")
+        values.append(sql_literal(params[key], match.group("type")))
+        return "?"
 
+    return PreparedQuery(PLACEHOLDER_RE.sub(_replace, sql), tuple(values))
 
-def strip_comments_and_strings(sql):
-    output = []
-    in_single = False
-    in_double = False
-    in_line_comment = False
-    in_block_comment = False
-    i = 0
-    while i < len(sql):
-        ch = sql[i]
-        nxt = sql[i + 1] if i + 1 < len(sql) else ""
-
-        if in_line_comment:
-            if ch == "\n":
-                in_line_comment = False
-                output.append(" ")
-            i += 1
-            continue
 
-        if in_block_comment:
-            if ch == "*" and nxt == "/":
-                in_block_comment = False
-                i += 2
-                continue
-            i += 1
-            continue
+def query_text(query):
+    return query.sql if isinstance(query, PreparedQuery) else query
 
-        if in_single:
-            if ch == "'" and nxt == "'":
-                i += 2
-                continue
-            if ch == "'":
-                in_single = False
-            i += 1
-            continue
 
-        if in_double:
-            if ch == '"':
-                in_double = False
-            i += 1
-            continue
+class SqlStatement(namedtuple("SqlStatement", ["text", "tokens"])):
+    """One statement: its source text and its ``(KEYWORD, depth)`` tokens."""
 
-        if ch == "-" and nxt == "-":
-            output.append(" ")
-            in_line_comment = True
-            i += 2
-            continue
 
-        if ch == "/" and nxt == "*":
-            output.append(" ")
-            in_block_comment = True
-            i += 2
-            continue
+def _word_tokens(word):
+    if word.isascii():
+        return [word.upper()]
+    return WORD_TOKEN_RE.findall(word.upper())
 
-        if ch == "'":
-            output.append(" ")
-            in_single = True
-            i += 1
-            continue
 
-        if ch == '"':
-            output.append(" ")
-            in_double = True
-            i += 1
-            continue
+def lex_sql(sql):
+    """Split, strip and tokenize ``sql`` in a single regex scan.
 
-        output.append(ch)
-        i += 1
+    Each statement keeps its original text, comments included, and
+    statements that hold nothing but comments are skipped. String literals
+    and quoted identifiers produce no tokens. Words separated only by
+    comments are joined in the tokens, as if the comments had been removed.
+    """
+    statements = []
+    pieces = []
+    tokens = []
+    depth = 0
+    statement_start = 0
+    segment_start = 0
+    run_start = 0
+    run_end = -1
+    run_text = ""
+
+    for match in LEXER_RE.finditer(sql):
+        kind = match.lastgroup
+        start, end = match.span(kind)
+        if kind == "word":
+            word = match.group(kind)
+            if start == run_end:
+                run_text += word
+                del tokens[run_start:]
+            else:
+                run_text = word
+                run_start = len(tokens)
+            for token in _word_tokens(run_text):
+                tokens.append((token, depth))
+            run_end = end
+        elif kind == "paren":
+            if match.group(kind) == "(":
+                depth += 1
+            else:
+                depth = max(0, depth - 1)
+        elif kind == "comment":
+            pieces.append(sql[segment_start:start])
+            segment_start = end
+            if run_end == start:
+                run_end = end
+        elif kind == "semicolon":
+            pieces.append(sql[segment_start:start])
+            if "".join(pieces).strip():
+                statements.append(SqlStatement(sql[statement_start:start].strip(), tokens))
+            pieces = []
+            tokens = []
+            depth = 0
+            statement_start = segment_start = end
+
+    pieces.append(sql[segment_start:])
+    if "".join(pieces).strip():
+        statements.append(SqlStatement(sql[statement_start:].strip(), tokens))
+    return statements
 
-    return "".join(output)
 
+def split_sql_statements(sql):
+    return [statement.text for statement in lex_sql(sql)]
 
-def _tokens_with_depth(cleaned_sql):
-    tokens = []
-    depth = 0
-    for match in TOKEN_RE.finditer(cleaned_sql.upper()):
-        token = match.group(0)
-        if token == "(":
-            depth += 1
-            continue
-        if token == ")":
-            depth = max(0, depth - 1)
-            continue
-        tokens.append((token, depth))
-    return tokens
+
+def _blank_comment_or_string(match):
+    text = match.group()
+    if text.startswith("--") and text.endswith("\n"):
+        return "  "
+    return " "
+
+
+def strip_comments_and_strings(sql):
+    return STRIP_RE.sub(_blank_comment_or_string, sql)
 
 
 def _main_keyword(tokens):
@@ -255,13 +280,12 @@ def _main_keyword(tokens):
 
 
 def is_read_only_sql(sql):
-    statements = split_sql_statements(sql)
+    statements = lex_sql(sql)
     if not statements:
         return True
 
     for statement in statements:
-        cleaned = strip_comments_and_strings(statement)
-        tokens = _tokens_with_depth(cleaned)
+        tokens = statement.tokens
         if not tokens:
             continue
 
@@ -289,54 +313,603 @@ def ensure_read_only(sql):
         )
 
 
+@lru_cache(maxsize=256)
+def ensure_read_only_template(sql):
+    """:func:`ensure_read_only` for prepared templates, which repeat verbatim."""
+    ensure_read_only(sql)
+
+
+def statement_kind(statement):
+    """Classify a single statement as "query", "session" or "other".
+
+    Queries only read and leave the session untouched, so they can run on any
+    connection. Session statements (SET/RESET/USE) change state that later
+    statements depend on; everything else is treated as a barrier too.
+    """
+    tokens = [token for item in lex_sql(statement) for token in item.tokens]
+    first, _ = _main_keyword(tokens)
+    if first in QUERY_KEYWORDS:
+        return "query"
+    if first in SESSION_KEYWORDS:
+        return "session"
+    return "other"
+
+
+def connection_settings():
+    return {
+        "host": env.get_env("ADT_DUMMY_TRINO_HOST", required=True),
+        "port": env.get_int_env("ADT_DUMMY_TRINO_PORT", default=443),
+        "scheme": env.get_env("ADT_DUMMY_TRINO_HTTP_SCHEME", default="https"),
+        "user": env.get_env("ADT_DUMMY_TRINO_USER", required=True),
+        "password": env.get_env("ADT_DUMMY_TRINO_PASSWORD", required=True),
+        "verify": env.get_bool_env("ADT_DUMMY_TRINO_VERIFY", default=False),
+    }
+
+
 def _trino_connection():
-    host = env.get_env("ADT_DUMMY_TRINO_HOST", required=True)
-    port = env.get_int_env("ADT_DUMMY_TRINO_PORT", default=443)
-    scheme = env.get_env("ADT_DUMMY_TRINO_HTTP_SCHEME", default="https")
-    user = env.get_env("ADT_DUMMY_TRINO_USER", required=True)
-    password = env.get_env("ADT_DUMMY_TRINO_PASSWORD", required=True)
-    verify = env.get_bool_env("ADT_DUMMY_TRINO_VERIFY", default=False)
-
-    auth = BasicAuthentication(user, password)
+    settings = connection_settings()
+    auth = BasicAuthentication(settings["user"], settings["password"])
     try:
         return connect(
-            host=host,
-            port=port,
-            user=user,
-            http_scheme=scheme,
+            host=settings["host"],
+            port=settings["port"],
+            user=settings["user"],
+            http_scheme=settings["scheme"],
             auth=auth,
-            verify=verify,
+            verify=settings["verify"],
         )
     except Exception as exc:
         raise AppError(f"Failed to connect to Trino: {exc}") from exc
 
 
-def execute_query(sql, max_rows=200):
-    conn = _trino_connection()
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+class ConnectionPool:
+    """Keeps up to ``size`` idle Trino connections warm for reuse.
+
+    Connections that ran SET/RESET/USE carry session state and are closed
+    instead of being returned, so pooled connections always start clean.
+    """
+
+    def __init__(self, size=4):
+        self.size = size
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return _trino_connection()
+
+    def release(self, conn, reusable=True):
+        with self._lock:
+            if reusable and len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+        _close_quietly(conn)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            _close_quietly(conn)
+
+
+_pool = None
+
+
+def set_connection_pool(pool):
+    global _pool
+    _pool = pool
+
+
+def _acquire():
+    if _pool is not None:
+        return _pool.acquire()
+    return _trino_connection()
+
+
+def _release(conn, reusable=True):
+    if _pool is not None:
+        _pool.release(conn, reusable=reusable)
+    else:
+        _close_quietly(conn)
+
+
+def _is_session_neutral(statements):
+    return all(statement_kind(statement) != "session" for statement in statements)
+
+
+@contextmanager
+def _connection(reusable=True):
+    conn = _acquire()
+    ok = False
     try:
-        cursor = conn.cursor()
+        yield conn
+        ok = True
+    finally:
+        _release(conn, reusable=reusable and ok)
+
+
+_END_OF_BATCHES = object()
+
+
+class RowBatches:
+    """Iterates over a cursor's result in row batches without materializing it.
+
+    With ``prefetch > 0`` a producer thread fetches up to that many batches
+    ahead into a bounded queue, so Trino pages are pulled while the caller is
+    still encoding the previous batch.
+    """
+
+    def __init__(self, cursor, max_rows=None, batch_size=DEFAULT_BATCH_SIZE, prefetch=0):
         try:
-            cursor.execute(sql)
+            description = cursor.description or []
         except Exception as exc:
-            raise AppError(f"Trino query failed: {exc}") from exc
-
+            raise AppError(f"Failed to fetch Trino results: {exc}") from exc
+        self.cursor = cursor
+        self.columns = [desc[0] for desc in description]
+        self.types = [desc[1] for desc in description]
+        self.max_rows = max_rows if max_rows and max_rows > 0 else None
+        self.batch_size = max(1, batch_size)
+        self.prefetch = max(0, prefetch)
+        self.row_count = 0
+        self.truncated = False
+
+    def _fetch(self, size):
         try:
-            columns = [desc[0] for desc in (cursor.description or [])]
-            truncated = False
-
-            if max_rows and max_rows > 0:
-                rows = cursor.fetchmany(max_rows + 1)
-                if len(rows) > max_rows:
-                    truncated = True
-                    rows = rows[:max_rows]
-            else:
-                rows = cursor.fetchall()
+            return self.cursor.fetchmany(size)
         except Exception as exc:
             raise AppError(f"Failed to fetch Trino results: {exc}") from exc
 
-        return columns, rows, truncated
+    def __iter__(self):
+        if self.prefetch:
+            return self._prefetched()
+        return self._batches()
+
+    def _batches(self):
+        while True:
+            size = self.batch_size
+            if self.max_rows is not None:
+                remaining = self.max_rows - self.row_count
+                if remaining <= 0:
+                    self.truncated = bool(self._fetch(1))
+                    return
+                size = min(size, remaining)
+            rows = self._fetch(size)
+            if not rows:
+                return
+            self.row_count += len(rows)
+            yield rows
+
+    def _prefetched(self):
+        pending = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+
+        def _put(item):
+            while not stop.is_set():
+                try:
+                    pending.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def _produce():
+            try:
+                for rows in self._batches():
+                    if not _put(rows):
+                        return
+                _put(_END_OF_BATCHES)
+            except BaseException as exc:
+                _put(exc)
+
+        producer = threading.Thread(target=_produce, name="trino-prefetch", daemon=True)
+        producer.start()
+        try:
+            while True:
+                item = pending.get()
+                if item is _END_OF_BATCHES:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+        # Only wait for a producer that finished; one stuck in a fetch is left to
+        # notice ``stop`` so the query can be cancelled without waiting for it.
+        producer.join()
+
+
+def _cancel_quietly(cursor):
+    try:
+        cursor.cancel()
+    except Exception:
+        pass
+
+
+_scope_local = threading.local()
+_scopes = set()
+_scopes_lock = threading.Lock()
+
+
+def current_scope():
+    return getattr(_scope_local, "scope", None)
+
+
+def _in_scope(func):
+    """Wrap ``func`` so it runs in the caller's :class:`QueryScope` on a worker thread."""
+    scope = current_scope()
+
+    def run(*args):
+        _scope_local.scope = scope
+        try:
+            return func(*args)
+        finally:
+            _scope_local.scope = None
+
+    return run
+
+
+class QueryScope:
+    """Cancels the Trino queries started inside it on the coordinator.
+
+    Queries are cancelled when ``timeout`` seconds pass, when the process gets
+    SIGINT/SIGTERM/SIGHUP (main thread only), when :func:`cancel_all` is
+    called, or when an error leaves the scope while they may still run.
+    Worker threads join the scope through :func:`_in_scope`.
+    """
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout
+        self.reason = None
+        self._cursors = []
+        self._lock = threading.Lock()
+        self._timer = None
+        self._handlers = {}
+        self._outer = None
+        self.thread = None
+
+    def add(self, cursor):
+        with self._lock:
+            if self.reason is None:
+                self._cursors.append(cursor)
+                return
+        raise AppError("Query cancelled before it started")
+
+    def cancel(self, reason):
+        with self._lock:
+            if self.reason is None:
+                self.reason = reason
+            cursors = list(self._cursors)
+        for cursor in cursors:
+            _cancel_quietly(cursor)
+
+    def check(self, cursor):
+        """Cancel ``cursor`` if the scope was cancelled while it was being submitted."""
+        if self.reason is not None:
+            _cancel_quietly(cursor)
+
+    def _interrupt(self, signum, frame):
+        raise KeyboardInterrupt
+
+    def __enter__(self):
+        self._outer = current_scope()
+        self.thread = threading.current_thread()
+        _scope_local.scope = self
+        with _scopes_lock:
+            _scopes.add(self)
+        if self.timeout:
+            self._timer = threading.Timer(self.timeout, self.cancel, args=("timeout",))
+            self._timer.daemon = True
+            self._timer.start()
+        if threading.current_thread() is threading.main_thread():
+            for name in CANCEL_SIGNALS:
+                signum = getattr(signal, name, None)
+                if signum is not None:
+                    self._handlers[signum] = signal.signal(signum, self._interrupt)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._timer is not None:
+            self._timer.cancel()
+        for signum, handler in self._handlers.items():
+            signal.signal(signum, handler)
+        self._handlers = {}
+        with _scopes_lock:
+            _scopes.discard(self)
+        _scope_local.scope = self._outer
+        if exc_type is None:
+            return False
+        interrupted = issubclass(exc_type, KeyboardInterrupt)
+        self.cancel("interrupt" if interrupted else "error")
+        error = self._cancelled_error(interrupted)
+        if error is None:
+            return False
+        raise error from exc
+
+    def _cancelled_error(self, interrupted=False):
+        if self.reason == "timeout":
+            return AppError(
+                f"Query timed out after {self.timeout:g}s and was cancelled on the coordinator.",
+                exit_code=TIMEOUT_EXIT_CODE,
+            )
+        if interrupted or self.reason in ("interrupt", "shutdown"):
+            return AppError(
+                "Query interrupted and cancelled on the coordinator.",
+                exit_code=INTERRUPT_EXIT_CODE,
+            )
+        return None
+
+    def check_cancelled(self):
+        """Raise the timeout or interrupt error if the scope cancelled its queries.
+
+        For callers that turn failed queries into results instead of letting
+        the error leave the scope.
+        """
+        error = self._cancelled_error()
+        if error is not None:
+            raise error
+
+
+def cancel_all(reason="shutdown"):
+    """Cancel the queries of every open :class:`QueryScope` in this process."""
+    with _scopes_lock:
+        scopes = list(_scopes)
+    for scope in scopes:
+        scope.cancel(reason)
+
+
+def cancel_thread(thread, reason="interrupt"):
+    """Cancel the queries of the :class:`QueryScope` objects opened on ``thread``."""
+    with _scopes_lock:
+        scopes = [scope for scope in _scopes if scope.thread is thread]
+    for scope in scopes:
+        scope.cancel(reason)
+
+
+_prepared = weakref.WeakKeyDictionary()
+_prepared_lock = threading.Lock()
+
+
+def _statement_name(conn, sql):
+    """Name of ``sql`` prepared on ``conn``, preparing it on first use.
+
+    Prepared statements live in the connection's client session, so pooled
+    connections keep them across requests. The least recently used ones are
+    deallocated beyond ``PREPARED_PER_CONNECTION``.
+    """
+    with _prepared_lock:
+        names = _prepared.setdefault(conn, OrderedDict())
+    name = names.get(sql)
+    if name is not None:
+        names.move_to_end(sql)
+        return name
+    name = "adt_" + hashlib.sha1(sql.encode("utf-8")).hexdigest()[:16]
+    _fetch_result(conn, f"PREPARE {name} FROM {sql}", max_rows=0)
+    names[sql] = name
+    while len(names) > PREPARED_PER_CONNECTION:
+        _, stale = names.popitem(last=False)
+        _fetch_result(conn, f"DEALLOCATE PREPARE {stale}", max_rows=0)
+    return name
+
+
+def _bind(conn, query):
+    name = _statement_name(conn, query.sql)
+    if not query.values:
+        return f"EXECUTE {name}"
+    return f"EXECUTE {name} USING {', '.join(query.values)}"
+
+
+def _execute(conn, sql, monitor=None):
+    if isinstance(sql, PreparedQuery):
+        sql = _bind(conn, sql)
+    cursor = conn.cursor()
+    scope = current_scope()
+    if scope is not None:
+        scope.add(cursor)
+    if monitor is not None:
+        monitor.start(cursor)
+    try:
+        cursor.execute(sql)
+    except Exception as exc:
+        raise AppError(f"Trino query failed: {exc}") from exc
+    if scope is not None:
+        scope.check(cursor)
+    return cursor
+
+
+def _collect(batches):
+    from adt_dummy.core.columnar import ColumnarResult
+
+    return ColumnarResult.from_batches(batches.columns, batches.types, batches)
+
+
+def _fetch_result(conn, sql, max_rows):
+    batches = RowBatches(_execute(conn, sql), max_rows=max_rows)
+    rows = _collect(batches)
+    return batches.columns, rows, batches.truncated
+
+
+@contextmanager
+def open_query(sql, monitor=None):
+    """Execute ``sql`` (text or a :class:`PreparedQuery`) and yield its cursor.
+
+    ``monitor`` (a :class:`~adt_dummy.services.progress.QueryMonitor`) sees the
+    cursor before execution starts and is finished once the caller is done.
+    """
+    statements = split_sql_statements(query_text(sql))
+    with _connection(reusable=_is_session_neutral(statements)) as conn:
+        try:
+            yield _execute(conn, sql, monitor=monitor)
+        finally:
+            if monitor is not None:
+                monitor.finish()
+
+
+@contextmanager
+def stream_query(sql, max_rows=200, batch_size=DEFAULT_BATCH_SIZE, monitor=None, prefetch=0):
+    with open_query(sql, monitor=monitor) as cursor:
+        yield RowBatches(cursor, max_rows=max_rows, batch_size=batch_size, prefetch=prefetch)
+
+
+def execute_query(sql, max_rows=200, monitor=None):
+    """Run ``sql`` and return ``(columns, rows, truncated)``.
+
+    ``rows`` is a :class:`~adt_dummy.core.columnar.ColumnarResult`: it
+    iterates and compares like a list of rows but stores them column by column.
+    """
+    with stream_query(sql, max_rows=max_rows, monitor=monitor) as batches:
+        rows = _collect(batches)
+        return batches.columns, rows, batches.truncated
+
+
+class _WorkerConnections:
+    """One connection per worker thread, prepared with ``session_statements``."""
+
+    def __init__(self, session_statements=()):
+        self.session_statements = list(session_statements)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def get(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = _acquire()
+            with self._lock:
+                self._connections.append(conn)
+            for statement in self.session_statements:
+                _fetch_result(conn, statement, max_rows=0)
+            self._local.conn = conn
+        return conn
+
+    def release(self, reusable=True):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            _release(conn, reusable=reusable and not self.session_statements)
+
+
+@contextmanager
+def _worker_pool(max_workers):
+    """A thread pool whose running queries are cancelled before an error waits for them."""
+    scope = current_scope()
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        yield pool
+    except BaseException as exc:
+        if scope is not None:
+            scope.cancel("interrupt" if isinstance(exc, KeyboardInterrupt) else "error")
+        raise
     finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _run_parallel(items, session_statements, max_rows, parallel):
+    workers = _WorkerConnections(session_statements)
+
+    @_in_scope
+    def run(statement):
+        return _fetch_result(workers.get(), statement, max_rows)
+
+    try:
+        with _worker_pool(min(parallel, len(items))) as pool:
+            futures = [pool.submit(run, statement) for _, statement in items]
+            for (index, statement), future in zip(items, futures):
+                yield (index, statement) + future.result()
+    finally:
+        workers.release()
+
+
+def run_script(statements, max_rows=200, parallel=1):
+    """Run statements in order, yielding ``(index, statement, columns, rows, truncated)``.
+
+    Everything runs on one connection so SET SESSION/USE carry over. With
+    ``parallel > 1`` consecutive queries between two barriers (session or
+    write statements) run concurrently on worker connections, which replay
+    the session statements seen so far. Results are still yielded in order.
+    """
+    session_statements = []
+    pending = []
+    with _connection(reusable=_is_session_neutral(statements)) as conn:
+        for index, statement in enumerate(statements, start=1):
+            kind = statement_kind(statement)
+            if kind == "query" and parallel > 1:
+                pending.append((index, statement))
+                continue
+            yield from _flush_pending(conn, pending, session_statements, max_rows, parallel)
+            pending = []
+            yield (index, statement) + _fetch_result(conn, statement, max_rows)
+            if kind == "session":
+                session_statements.append(statement)
+        yield from _flush_pending(conn, pending, session_statements, max_rows, parallel)
+
+
+def _flush_pending(conn, pending, session_statements, max_rows, parallel):
+    if len(pending) == 1:
+        index, statement = pending[0]
+        yield (index, statement) + _fetch_result(conn, statement, max_rows)
+    elif pending:
+        yield from _run_parallel(pending, list(session_statements), max_rows, parallel)
+
+
+class SessionConnection:
+    """One connection kept across calls, so SET SESSION/USE carry over between them."""
+
+    def __init__(self):
+        self._conn = None
+
+    def execute(self, sql, max_rows=200):
+        """Run ``sql`` and return ``(columns, rows, truncated)`` like :func:`execute_query`."""
+        if self._conn is None:
+            self._conn = _acquire()
+        return _fetch_result(self._conn, sql, max_rows)
+
+    def close(self):
+        if self._conn is not None:
+            _release(self._conn, reusable=False)
+            self._conn = None
+
+
+class BatchResult(
+    namedtuple("BatchResult", ["index", "columns", "rows", "truncated", "error", "duration"])
+):
+    """Outcome of one batch item; ``error`` is ``None`` when it succeeded."""
+
+
+def run_batch(queries, max_rows=200, concurrency=4):
+    """Run each query (text or :class:`PreparedQuery`), yielding :class:`BatchResult` in order.
+
+    Items run on up to ``concurrency`` worker connections that are reused
+    across items, so a prepared template is prepared once per connection. A
+    failing item is reported in its result and does not stop the batch.
+    """
+    if not queries:
+        return
+    workers = _WorkerConnections()
+    neutral = _is_session_neutral([query_text(query) for query in queries])
+
+    @_in_scope
+    def run(sql):
+        started = time.monotonic()
         try:
-            conn.close()
-        except Exception:
-            pass
+            columns, rows, truncated = _fetch_result(workers.get(), sql, max_rows)
+            error = None
+        except AppError as exc:
+            columns, rows, truncated, error = [], [], False, str(exc)
+        return columns, rows, truncated, error, time.monotonic() - started
+
+    try:
+        with _worker_pool(min(concurrency, len(queries))) as pool:
+            futures = [pool.submit(run, query) for query in queries]
+            for index, future in enumerate(futures, start=1):
+                yield BatchResult(index, *future.result())
+    finally:
+        workers.release(reusable=neutral)
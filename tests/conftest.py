@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+
+from adt_dummy.services import trino
+
+
+class FakeCursor:
+    """Stands in for a trino DB-API cursor.
+
+    A cursor from :meth:`FakeConnection.cursor` gets its result for each
+    statement from the owning :class:`FakeTrino`'s ``respond``. ``error`` is
+    raised once the rows run out.
+    """
+
+    query_id = "20240101_000000_00001_abcde"
+    info_uri = "http://trino/ui/query.html?20240101_000000_00001_abcde"
+
+    def __init__(self, description=None, rows=(), stats=None, error=None, conn=None):
+        self.description = description
+        self.stats = stats or {}
+        self.error = error
+        self.conn = conn
+        self.cancelled = threading.Event()
+        self._rows = list(rows)
+
+    def execute(self, sql):
+        self.conn.executed.append(sql)
+        self.description, self._rows = None, []
+        result = self.conn.trino.respond(self, sql)
+        if result is not None:
+            self.description, rows = result
+            self._rows = list(rows)
+
+    def fetchmany(self, size):
+        if not self._rows and self.error is not None:
+            raise self.error
+        batch, self._rows = self._rows[:size], self._rows[size:]
+        return batch
+
+    def cancel(self):
+        self.cancelled.set()
+
+
+class FakeConnection:
+    def __init__(self, fake):
+        self.trino = fake
+        self.executed = []
+        self.cursors = []
+        self.closed = False
+
+    def cursor(self):
+        cursor = FakeCursor(conn=self)
+        self.cursors.append(cursor)
+        return cursor
+
+    def close(self):
+        self.closed = True
+
+
+def echo(cursor, sql):
+    """Default response: one varchar row holding the statement."""
+    return [("value", "varchar")], [[sql]]
+
+
+class FakeTrino:
+    """Replaces the Trino client.
+
+    ``respond(cursor, sql)`` returns ``(description, rows)`` for a result
+    set or ``None`` for a statement without one; it may raise, block on
+    ``cursor.cancelled`` or set ``cursor.stats``.
+    """
+
+    def __init__(self, respond=echo):
+        self.respond = respond
+        self.connections = []
+        self._lock = threading.Lock()
+
+    def connect(self):
+        conn = FakeConnection(self)
+        with self._lock:
+            self.connections.append(conn)
+        return conn
+
+    def cursor(self, description=None, rows=(), stats=None, error=None):
+        """A cursor that already holds a result, for code that reads cursors."""
+        return FakeCursor(description, rows, stats=stats, error=error)
+
+    @property
+    def executed(self):
+        return [sql for conn in self.connections for sql in conn.executed]
+
+    @property
+    def cursors(self):
+        return [cursor for conn in self.connections for cursor in conn.cursors]
+
+
+@pytest.fixture
+def fake_trino(monkeypatch):
+    fake = FakeTrino()
+    monkeypatch.setattr(trino, "_trino_connection", fake.connect)
+    return fake
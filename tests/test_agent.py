@@ -0,0 +1,130 @@
+import io
+import sys
+import textwrap
+import threading
+from pathlib import Path
+
+import pytest
+
+import adt_dummy
+from adt_dummy import local
+from adt_dummy.core.errors import AppError
+from adt_dummy.services import agent
+
+FAKE_WORKER = textwrap.dedent(
+    """
+    import sys
+
+    import click
+
+    from adt_dummy.core import control
+    from adt_dummy.services import agent
+
+    @click.group()
+    def group():
+        pass
+
+    @group.command(name="query")
+    @click.option("--fail", is_flag=True)
+    def fake_query(fail):
+        sql = click.get_text_stream("stdin").read()
+        click.echo(sql.upper() * 1000, nl=False)
+        click.echo("note", err=True)
+        control.emit("progress", {})
+        if fail:
+            raise SystemExit(3)
+
+    agent.work(group, sys.stdin.buffer, sys.stdout.buffer)
+    """
+)
+
+LOSING_WORKER = textwrap.dedent(
+    """
+    import sys
+
+    from adt_dummy.core import framing
+    from adt_dummy.services import agent
+
+    framing.write_channel_frame(sys.stdout.buffer, agent.READY_CHANNEL, framing.EXIT, b"{}")
+    sys.stdout.buffer.flush()
+    framing.read_frame(sys.stdin.buffer)
+    framing.read_frame(sys.stdin.buffer)
+    """
+)
+
+
+@pytest.fixture
+def agent_socket(monkeypatch, tmp_path):
+    monkeypatch.setenv("PYTHONPATH", str(Path(adt_dummy.__file__).parents[1]))
+    path = tmp_path / "agent.sock"
+    servers = []
+
+    def start(cmd, target=None):
+        server = agent.AgentServer(path, agent.Agent(lambda: cmd, timeout=10, target=target))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return path
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+        server.agent.close()
+
+
+def test_forward_runs_commands_on_one_exec(agent_socket, monkeypatch, capfd):
+    path = agent_socket([sys.executable, "-c", FAKE_WORKER])
+    args = ["dami", "__remote", "query"]
+    assert agent.forward(args, stdin_data="select 1", capture_output=True, path=path) == (
+        "SELECT 1" * 1000
+    )
+
+    monkeypatch.setenv("ADT_DUMMY_TRANSPORT_COMPRESSION", "gzip")
+    sink = io.BytesIO()
+    controls = []
+    assert agent.forward(args, "x", stream_to=sink, on_control=controls.append, path=path) is None
+    assert sink.getvalue() == b"X" * 1000
+    assert controls == [b'{"kind": "progress", "data": {}}']
+
+    with pytest.raises(AppError) as excinfo:
+        agent.forward(args + ["--fail"], stdin_data="y", capture_output=True, path=path)
+    assert excinfo.value.exit_code == 3
+    assert "note\n" in capfd.readouterr().err
+
+    status = agent.request("status", path)
+    assert status["requests"] == 3
+    assert status["connected"]
+
+
+def test_forward_falls_back_without_agent(agent_socket, tmp_path):
+    args = ["dami", "__remote", "query"]
+    assert agent.forward(args, path=tmp_path / "missing.sock") is agent.UNAVAILABLE
+
+    path = agent_socket([sys.executable, "-c", "pass"])
+    assert agent.forward(args, capture_output=True, path=path) is agent.UNAVAILABLE
+    assert agent.forward(["dami", "__remote", "shell"], path=path) is agent.UNAVAILABLE
+    assert not agent.request("status", path)["connected"]
+
+
+def test_forward_does_not_fall_back_once_the_request_was_delivered(agent_socket):
+    path = agent_socket([sys.executable, "-c", LOSING_WORKER])
+    with pytest.raises(AppError, match="lost its exec"):
+        agent.forward(["dami", "__remote", "query"], capture_output=True, path=path)
+
+
+def test_proxy_falls_back_when_the_agent_serves_another_target(agent_socket, monkeypatch):
+    monkeypatch.setenv("ADT_DUMMY_KUBECTL_CONTEXT", "prod")
+    monkeypatch.setenv("ADT_DUMMY_NAMESPACE", "ns")
+    target = local.agent_target()
+    path = agent_socket([sys.executable, "-c", FAKE_WORKER], target=dict(target, context="dev"))
+    monkeypatch.setenv("ADT_DUMMY_AGENT_SOCKET", str(path))
+    monkeypatch.setenv("ADT_DUMMY_TRANSPORT_COMPRESSION", "none")
+    monkeypatch.setattr(local, "cached_pod", lambda *args, **kwargs: ("pod-a", False))
+    monkeypatch.setattr(local, "_exec_in_pod", lambda namespace, pod, args, **kwargs: "own exec")
+    args = ["dami", "__remote", "query"]
+
+    assert local.proxy_to_remote(args, stdin_data="x", capture_output=True) == "own exec"
+    assert agent.request("status", path)["requests"] == 0
+
+    monkeypatch.setenv("ADT_DUMMY_KUBECTL_CONTEXT", "dev")
+    assert local.proxy_to_remote(args, stdin_data="x", capture_output=True) == "X" * 1000
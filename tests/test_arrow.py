@@ -0,0 +1,35 @@
+import datetime
+import io
+from decimal import Decimal
+
+import pytest
+
+from adt_dummy.core import output
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+COLUMNS = ["id", "amount", "day", "tags"]
+TYPES = ["bigint", "decimal(10, 2)", "date", "array(varchar)"]
+BATCHES = [
+    [[1, Decimal("1.50"), datetime.date(2024, 1, 1), ["a"]]],
+    [[2, None, datetime.date(2024, 1, 2), None]],
+]
+
+
+def test_write_parquet_stream_keeps_types():
+    sink = io.BytesIO()
+    output.write_stream(COLUMNS, BATCHES, "parquet", sink, types=TYPES)
+    table = pq.read_table(pa.BufferReader(sink.getvalue()))
+    assert table.schema.field("id").type == pa.int64()
+    assert table.schema.field("amount").type == pa.decimal128(10, 2)
+    assert table.column("day").to_pylist() == [datetime.date(2024, 1, 1), datetime.date(2024, 1, 2)]
+    assert table.column("tags").to_pylist() == ['["a"]', None]
+
+
+def test_write_arrow_stream_is_ipc_file():
+    sink = io.BytesIO()
+    output.write_stream(COLUMNS, BATCHES, "arrow", sink, types=TYPES)
+    table = pa.ipc.open_file(pa.BufferReader(sink.getvalue())).read_all()
+    assert table.num_rows == 2
+    assert table.column("amount").to_pylist() == [Decimal("1.50"), None]
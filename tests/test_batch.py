@@ -0,0 +1,103 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from adt_dummy.cli import cli
+from adt_dummy.core.errors import AppError
+from adt_dummy.services import trino
+
+
+@pytest.fixture
+def batch_trino(fake_trino):
+    def respond(cursor, sql):
+        if "missing" in sql:
+            raise RuntimeError("Table not found")
+        return [("value", "varchar")], [[sql]]
+
+    fake_trino.respond = respond
+    return fake_trino
+
+
+def test_parse_param_sets():
+    text = '{"DAY": "2024-01-01", "LIMIT": 5}\n\n{"DAY": "2024-01-02", "LIMIT": 6}\n'
+    assert trino.parse_param_sets(text) == [
+        {"DAY": "2024-01-01", "LIMIT": "5"},
+        {"DAY": "2024-01-02", "LIMIT": "6"},
+    ]
+
+
+def test_parse_param_sets_reports_line():
+    with pytest.raises(AppError, match="params.jsonl:2"):
+        trino.parse_param_sets('{"A": "1"}\n["A"]\n', source="params.jsonl")
+
+
+def test_run_batch_reuses_connections_and_keeps_going(batch_trino):
+    queries = [f"SELECT * FROM {table}" for table in ["a", "missing", "b", "c"]]
+
+    results = list(trino.run_batch(queries, concurrency=2))
+
+    assert [result.index for result in results] == [1, 2, 3, 4]
+    assert results[0].rows == [["SELECT * FROM a"]]
+    assert "Table not found" in results[1].error
+    assert results[3].error is None
+    assert len(batch_trino.connections) <= 2
+    assert sum(len(conn.executed) for conn in batch_trino.connections) == 4
+
+
+def test_remote_batch_writes_sections_and_summary(batch_trino):
+    envelope = json.dumps(
+        {"sql": "SELECT '{{T}}' AS {{COL}}", "params": [{"T": "a"}, {"T": "missing"}]}
+    )
+    result = CliRunner(mix_stderr=False).invoke(
+        cli,
+        ["__remote", "query", "--stdin", "--batch-stdin", "--format", "csv", "--param", "COL=v"],
+        input=envelope,
+    )
+
+    assert result.exit_code != 0
+    assert "-- [1] T=a\nvalue\nSELECT 'a' AS v" in result.stdout
+    assert "[2]" not in result.stdout
+    assert "1 of 2 batch items failed" in str(result.exception)
+    assert "error" in result.stderr
+
+
+def test_batch_rejects_write_items_before_running(batch_trino):
+    envelope = json.dumps({"sql": "DELETE FROM {{T}}", "params": [{"T": "a"}]})
+    result = CliRunner().invoke(
+        cli, ["__remote", "query", "--stdin", "--batch-stdin"], input=envelope
+    )
+
+    assert isinstance(result.exception, AppError)
+    assert batch_trino.connections == []
+
+
+def test_prepared_batch_prepares_once_per_connection(batch_trino):
+    queries = [trino.prepare_params("SELECT {{V}}", {"V": str(value)}) for value in range(5)]
+
+    results = list(trino.run_batch(queries, concurrency=1))
+
+    assert all(result.error is None for result in results)
+    (conn,) = batch_trino.connections
+    prepares = [sql for sql in conn.executed if sql.startswith("PREPARE")]
+    assert len(prepares) == 1
+    assert prepares[0].endswith("FROM SELECT ?")
+    assert conn.executed[-1].endswith("USING '4'")
+
+
+def test_batch_timeout_exits_with_the_timeout_code(batch_trino):
+    def respond(cursor, sql):
+        if "slow" in sql:
+            cursor.cancelled.wait(5)
+            raise RuntimeError("Query was canceled")
+        return [("value", "varchar")], [[sql]]
+
+    batch_trino.respond = respond
+    envelope = json.dumps({"sql": "SELECT '{{T}}'", "params": [{"T": "a"}, {"T": "slow"}]})
+    result = CliRunner(mix_stderr=False).invoke(
+        cli, ["__remote", "query", "--stdin", "--batch-stdin", "--timeout", "1"], input=envelope
+    )
+
+    assert isinstance(result.exception, AppError)
+    assert result.exception.exit_code == trino.TIMEOUT_EXIT_CODE
+    assert "timed out after 1s" in str(result.exception)
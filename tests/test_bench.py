@@ -0,0 +1,54 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from adt_dummy.cli import cli
+from adt_dummy.core.control import CONTROL_PREFIX
+from adt_dummy.services import bench, trino
+
+
+@pytest.fixture
+def bench_trino(fake_trino):
+    def respond(cursor, sql):
+        cursor.stats = {"state": "FINISHED", "processedBytes": 300}
+        return [("n", "bigint")], [[i] for i in range(3)]
+
+    fake_trino.respond = respond
+    return fake_trino
+
+
+def test_percentile_interpolates():
+    values = [1.0, 2.0, 3.0, 4.0]
+    assert bench.percentile(values, 50) == pytest.approx(2.5)
+    assert bench.percentile(values, 99) == pytest.approx(3.97)
+    assert bench.percentile([], 95) == 0.0
+
+
+def test_run_benchmark_reports_latency_and_throughput(bench_trino):
+    seen = []
+    report = bench.run_benchmark(
+        "SELECT 1", iterations=5, warmup=2, concurrency=2, on_run=lambda n, run: seen.append(n)
+    )
+
+    assert seen == [1, 2, 3, 4, 5]
+    assert report["errors"] == 0
+    assert report["rows"] == 15
+    assert report["processed_bytes"] == 1500
+    assert 0 < report["first_row"]["p50"] <= report["total"]["p50"]
+    assert len(bench_trino.connections) <= 2
+    assert trino._pool is None
+
+
+def test_remote_bench_emits_report(bench_trino):
+    result = CliRunner(mix_stderr=False).invoke(
+        cli, ["__remote", "bench", "query", "-n", "2", "--warmup", "0", "SELECT 1"]
+    )
+
+    assert result.exit_code == 0, result.stderr
+    assert "run 2/2" in result.stdout
+    prefix = CONTROL_PREFIX.decode()
+    line = next(line for line in result.stderr.split("\n") if line.startswith(prefix))
+    message = json.loads(line[len(prefix) :])
+    assert message["kind"] == "bench"
+    assert message["data"]["iterations"] == 2
@@ -0,0 +1,62 @@
+import os
+import time
+
+import pytest
+
+from adt_dummy import k8s
+from adt_dummy.core.cache import ResultCache, cache_key, cache_namespace
+
+
+def _store(cache, key, data, ttl=60):
+    with cache.writer(key, ttl) as handle:
+        handle.write(data)
+
+
+def test_cache_round_trip(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=1024)
+    key = cache_key("SELECT 1", "csv", 200)
+    assert cache.get(key) is None
+    _store(cache, key, b"a\n1\n")
+    data_path, meta = cache.get(key)
+    assert data_path.read_bytes() == b"a\n1\n"
+    assert meta["size"] == 4
+
+
+def test_cache_expires_entries(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=1024)
+    _store(cache, "k", b"x", ttl=-1)
+    assert cache.get("k") is None
+    assert not list(tmp_path.iterdir())
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=10)
+    _store(cache, "old", b"12345")
+    past = time.time() - 100
+    os.utime(tmp_path / "old.data", (past, past))
+    _store(cache, "new", b"12345")
+    _store(cache, "newest", b"12345")
+    assert cache.get("old") is None
+    assert cache.get("new") is not None
+    assert cache.get("newest") is not None
+
+
+def test_cache_discards_failed_writes(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=1024)
+    with pytest.raises(RuntimeError):
+        with cache.writer("k", 60) as handle:
+            handle.write(b"partial")
+            raise RuntimeError("boom")
+    assert cache.get("k") is None
+    assert not list(tmp_path.iterdir())
+
+
+def test_cache_namespace_follows_the_current_kube_context(monkeypatch):
+    monkeypatch.delenv("ADT_DUMMY_IN_CLUSTER", raising=False)
+    context = ["cluster-a"]
+    monkeypatch.setattr(k8s, "get_current_context", lambda: context[0])
+    first = cache_key(cache_namespace())
+    context[0] = "cluster-b"
+    assert cache_key(cache_namespace()) != first
+    context[0] = "cluster-a"
+    assert cache_key(cache_namespace()) == first
@@ -0,0 +1,75 @@
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+from adt_dummy.core.errors import AppError
+from adt_dummy.services import trino
+
+
+def _block_until_cancelled(cursor, sql):
+    if not cursor.cancelled.wait(5):
+        raise AssertionError("query was never cancelled")
+    raise RuntimeError("Query was canceled")
+
+
+def test_timeout_cancels_running_query(fake_trino):
+    fake_trino.respond = _block_until_cancelled
+
+    with pytest.raises(AppError, match="timed out after 0.05s") as excinfo:
+        with trino.QueryScope(timeout=0.05):
+            trino.execute_query("SELECT 1")
+
+    assert excinfo.value.exit_code == trino.TIMEOUT_EXIT_CODE
+    assert fake_trino.cursors[0].cancelled.is_set()
+
+
+def test_sigterm_cancels_running_query(fake_trino):
+    fake_trino.respond = _block_until_cancelled
+    previous = signal.getsignal(signal.SIGTERM)
+    timer = threading.Timer(0.05, os.kill, args=(os.getpid(), signal.SIGTERM))
+
+    with pytest.raises(AppError, match="interrupted") as excinfo:
+        with trino.QueryScope():
+            timer.start()
+            trino.execute_query("SELECT 1")
+
+    assert excinfo.value.exit_code == trino.INTERRUPT_EXIT_CODE
+    assert fake_trino.cursors[0].cancelled.is_set()
+    assert signal.getsignal(signal.SIGTERM) is previous
+
+
+def test_error_after_execute_cancels_query(fake_trino):
+    fake_trino.respond = lambda cursor, sql: ([("n", "integer")], [])
+
+    with pytest.raises(BrokenPipeError):
+        with trino.QueryScope():
+            with trino.stream_query("SELECT 1"):
+                raise BrokenPipeError
+
+    assert fake_trino.cursors[0].cancelled.is_set()
+
+
+@pytest.mark.parametrize(
+    "run",
+    [
+        lambda: list(trino.run_batch(["SELECT 1", "SELECT 2"], concurrency=2)),
+        lambda: list(trino.run_script(["SELECT 1", "SELECT 2"], parallel=2)),
+    ],
+    ids=["batch", "script"],
+)
+def test_interrupt_cancels_parallel_queries_before_waiting(fake_trino, run):
+    fake_trino.respond = _block_until_cancelled
+    timer = threading.Timer(0.1, os.kill, args=(os.getpid(), signal.SIGTERM))
+    started = time.monotonic()
+
+    with pytest.raises(AppError, match="interrupted"):
+        with trino.QueryScope():
+            timer.start()
+            run()
+
+    assert time.monotonic() - started < 2
+    assert len(fake_trino.cursors) == 2
+    assert all(cursor.cancelled.is_set() for cursor in fake_trino.cursors)
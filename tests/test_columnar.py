@@ -0,0 +1,106 @@
+import sys
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+from adt_dummy.core.columnar import ColumnarResult
+from adt_dummy.core.output import format_output, write_stream
+
+TYPES = [
+    "bigint",
+    "tinyint",
+    "double",
+    "boolean",
+    "decimal(10,2)",
+    "decimal(38,4)",
+    "date",
+    "timestamp(3)",
+    "timestamp(3) with time zone",
+    "time(3)",
+    "varchar",
+    "array(integer)",
+]
+COLUMNS = [f"c{i}" for i in range(len(TYPES))]
+ZONE = timezone(timedelta(hours=-5))
+
+
+def _row(i):
+    if i % 5 == 4:
+        return [None] * len(TYPES)
+    return [
+        i * 10**12,
+        i % 100,
+        i / 7,
+        i % 2 == 0,
+        Decimal(f"{i}.{i % 100:02d}"),
+        Decimal(f"-{i}.0001"),
+        date(2024, 1, 1) + timedelta(days=i),
+        datetime(1969, 12, 31, 23, 59, 59, 999000) + timedelta(milliseconds=i),
+        datetime(2024, 3, 1, 8, 30, tzinfo=ZONE) + timedelta(seconds=i),
+        time(23, 59, 59, 999000),
+        f"status-{i % 3}",
+        [i, None],
+    ]
+
+
+ROWS = [_row(i) for i in range(23)]
+
+
+def _result(rows=ROWS, size=4):
+    return ColumnarResult.from_batches(
+        COLUMNS, TYPES, [rows[start : start + size] for start in range(0, len(rows), size)]
+    )
+
+
+def test_rows_round_trip_with_types_and_nulls():
+    result = _result()
+    assert len(result) == len(ROWS)
+    assert result == ROWS
+    for got, expected in zip(result, ROWS):
+        assert [type(value) for value in got] == [type(value) for value in expected]
+        assert [str(value) for value in got] == [str(value) for value in expected]
+    assert result.column_values(10)[:4] == ["status-0", "status-1", "status-2", "status-0"]
+
+
+def test_unexpected_values_fall_back_without_losing_rows():
+    rows = [[1, Decimal("1.50")], [2.5, Decimal("1.5")], ["x", Decimal("NaN")]]
+    result = ColumnarResult.from_batches(
+        ["n", "d"], ["integer", "decimal(4,2)"], [rows[:1], rows[1:]]
+    )
+    assert result == rows
+    assert [str(value) for value in result.column_values(1)] == ["1.50", "1.5", "NaN"]
+
+
+def test_formats_match_the_list_of_rows():
+    result = _result()
+    for fmt in ("table", "csv", "json", "jsonl"):
+        assert format_output(COLUMNS, result, fmt) == format_output(COLUMNS, ROWS, fmt)
+
+
+def test_streaming_writers_consume_stored_batches():
+    class Sink:
+        def __init__(self):
+            self.chunks = []
+
+        def write(self, data):
+            self.chunks.append(data)
+
+        def flush(self):
+            pass
+
+    sink = Sink()
+    write_stream(COLUMNS, _result().batches(), "csv", sink)
+    assert b"".join(sink.chunks).decode() == format_output(COLUMNS, ROWS, "csv")
+    assert len(sink.chunks) == 1 + 6
+
+
+def test_columns_take_a_fraction_of_the_row_memory():
+    rows = [
+        [i, f"customer_{i % 50}", date(2024, 1, 1 + i % 28), Decimal(f"{i % 997}.25"), i / 3]
+        for i in range(20000)
+    ]
+    types = ["bigint", "varchar", "date", "decimal(12,2)", "double"]
+    result = ColumnarResult.from_batches(list("abcde"), types, [rows[:10000], rows[10000:]])
+    boxed = sys.getsizeof(rows) + sum(
+        sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row) for row in rows
+    )
+    assert result.nbytes * 5 < boxed
@@ -0,0 +1,121 @@
+import gzip
+import hashlib
+import io
+import json
+from decimal import Decimal
+
+import pytest
+
+from adt_dummy.core import export, wire
+from adt_dummy.core.errors import AppError
+from adt_dummy.services import trino
+
+COLUMNS = ["id", "name", "amount"]
+TYPES = ["bigint", "varchar", "decimal(10,2)"]
+ROWS = [[i, f"name, {i}", Decimal(f"{i}.50")] for i in range(10)]
+
+
+def _batches(rows=ROWS, size=3):
+    return [rows[start : start + size] for start in range(0, len(rows), size)]
+
+
+def _read_parts(directory, manifest):
+    contents = []
+    for part in manifest["parts"]:
+        data = (directory / part["file"]).read_bytes()
+        assert hashlib.sha256(data).hexdigest() == part["sha256"]
+        assert len(data) == part["bytes"]
+        contents.append(data)
+    return contents
+
+
+def test_csv_parts_are_split_by_rows_compressed_and_listed(tmp_path):
+    writer = export.PartWriter(tmp_path / "out", COLUMNS, TYPES, "csv", part_rows=4, workers=2)
+    manifest = writer.write(_batches())
+
+    assert json.loads((tmp_path / "out" / "manifest.json").read_text()) == manifest
+    assert [part["file"] for part in manifest["parts"]] == [
+        "part-00000.csv.gz",
+        "part-00001.csv.gz",
+        "part-00002.csv.gz",
+    ]
+    assert [part["rows"] for part in manifest["parts"]] == [4, 4, 2]
+    assert manifest["rows"] == 10 and manifest["compression"] == "gzip"
+    lines = []
+    for data in _read_parts(tmp_path / "out", manifest):
+        text = gzip.decompress(data).decode()
+        assert text.startswith("id,name,amount\r\n")
+        lines += text.splitlines()[1:]
+    assert lines == [f'{i},"name, {i}",{i}.50' for i in range(10)]
+
+
+def test_jsonl_parts_are_split_by_size(tmp_path):
+    zstd = pytest.importorskip("zstandard")
+    rows = [[i, "x" * 100, Decimal("1.00")] for i in range(50)]
+    writer = export.PartWriter(
+        tmp_path, COLUMNS, TYPES, "jsonl", part_rows=0, part_bytes=1000, compression="zstd:5"
+    )
+    manifest = writer.write(_batches(rows, size=7))
+
+    assert len(manifest["parts"]) > 5
+    decoded = []
+    for part, data in zip(manifest["parts"], _read_parts(tmp_path, manifest)):
+        assert part["file"].endswith(".jsonl.zst")
+        text = zstd.ZstdDecompressor().decompressobj().decompress(data)
+        assert len(text) == part["uncompressed_bytes"] < 1000 + 200
+        decoded += [json.loads(line) for line in text.splitlines()]
+    assert [item["id"] for item in decoded] == list(range(50))
+
+
+def test_parquet_parts_keep_column_types(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    manifest = export.PartWriter(tmp_path, COLUMNS, TYPES, "parquet", part_rows=6).write(_batches())
+
+    assert manifest["compression"] == "none"
+    tables = [pq.read_table(tmp_path / part["file"]) for part in manifest["parts"]]
+    assert [table.num_rows for table in tables] == [6, 4]
+    assert str(tables[0].schema.field("amount").type) == "decimal128(10, 2)"
+    rows = [[i, "x" * 100, Decimal("1.00")] for i in range(50)]
+    directory = tmp_path / "sized"
+    writer = export.PartWriter(directory, COLUMNS, TYPES, "parquet", part_rows=0, part_bytes=1000)
+    manifest = writer.write(_batches(rows, size=7))
+    assert [part["rows"] for part in manifest["parts"]] == [9] * 5 + [5]
+    with pytest.raises(AppError, match="not supported for parquet"):
+        export.PartWriter(tmp_path / "x", COLUMNS, TYPES, "parquet", compression="gzip")
+
+
+def test_failed_part_stops_the_export_without_a_manifest(tmp_path, monkeypatch):
+    def fail(path, blocks, codec, level):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(export, "_write_text_part", fail)
+    writer = export.PartWriter(tmp_path, COLUMNS, TYPES, "csv", part_rows=2)
+    with pytest.raises(OSError, match="disk full"):
+        writer.write(_batches())
+    assert list(tmp_path.iterdir()) == []
+    with pytest.raises(AppError, match="not empty"):
+        (tmp_path / "keep").write_text("x")
+        export.PartWriter(tmp_path, COLUMNS, TYPES, "csv").write(_batches())
+
+
+def test_local_query_exports_typed_rows_from_the_pod(fake_trino, monkeypatch, tmp_path):
+    from adt_dummy.commands import query
+
+    def fake_proxy(command_args, stream_to, **kwargs):
+        assert "--wire" in command_args and "--output-dir" not in command_args
+        sink = io.BytesIO()
+        cursor = fake_trino.cursor(list(zip(COLUMNS, TYPES)), ROWS)
+        wire.write_result(trino.RowBatches(cursor, batch_size=4), sink)
+        stream_to.write(sink.getvalue())
+
+    monkeypatch.setattr(query, "proxy_to_remote", fake_proxy)
+    options = query.QueryOptions(
+        fmt="csv", max_rows=0, output_dir=str(tmp_path / "out"), part_rows=5, compression="none"
+    )
+    query._query_local("SELECT 1", options, use_cache=False, refresh=False, cache_ttl=0)
+
+    manifest = json.loads((tmp_path / "out" / "manifest.json").read_text())
+    assert [part["rows"] for part in manifest["parts"]] == [5, 5]
+    assert manifest["types"] == TYPES
+    first = (tmp_path / "out" / "part-00000.csv").read_text().splitlines()
+    assert first[:2] == ["id,name,amount", '0,"name, 0",0.50']
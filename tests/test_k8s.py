@@ -1,5 +1,12 @@
+import json
+import os
+import subprocess
+
 import pytest
+from click.testing import CliRunner
 
+from adt_dummy import k8s, local
+from adt_dummy.cli import cli
 from adt_dummy.core.errors import AppError
 from adt_dummy.k8s import select_pod_from_json
 
@@ -27,3 +34,174 @@ def test_select_pod_explicit():
 def test_select_pod_no_items():
     with pytest.raises(AppError):
         select_pod_from_json({"items": []})
+
+
+def test_select_pod_strategies():
+    data = {
+        "items": [
+            {"metadata": {"name": name}, "status": {"phase": "Running"}}
+            for name in ("pod-c", "pod-a", "pod-b")
+        ]
+        + [
+            {
+                "metadata": {"name": "pod-d", "deletionTimestamp": "2024-01-01T00:00:00Z"},
+                "status": {"phase": "Running"},
+            }
+        ]
+    }
+    picks = [select_pod_from_json(data, strategy="round-robin", turn=turn) for turn in range(4)]
+    assert picks == ["pod-a", "pod-b", "pod-c", "pod-a"]
+    assert select_pod_from_json(data, strategy="first", avoid={"pod-c"}) == "pod-a"
+    assert select_pod_from_json(data, avoid={"pod-a", "pod-b", "pod-c"}) == "pod-c"
+    assert select_pod_from_json(data, strategy="random") in {"pod-a", "pod-b", "pod-c"}
+
+    probed = []
+
+    def load(pods):
+        probed.append(pods)
+        return {"pod-c": 2.5, "pod-b": 0.5}
+
+    assert select_pod_from_json(data, strategy="least-loaded", avoid={"pod-a"}, load=load) == (
+        "pod-b"
+    )
+    assert probed == [["pod-c", "pod-b"]]
+
+
+def test_load_does_not_count_the_resident_server_and_agent(monkeypatch, tmp_path):
+    from adt_dummy.services import load
+
+    commands = {
+        "10": ["python", "-m", "dami", "__remote", "server"],
+        "11": ["dami", "__remote", "--compress", "zstd:3", "agent"],
+        "12": ["dami", "__remote", "--compress", "zstd:3", "query", "--stdin"],
+        "13": ["dami", "__remote", "py"],
+        "14": ["bash"],
+    }
+    for pid, argv in commands.items():
+        (tmp_path / pid).mkdir()
+        (tmp_path / pid / "cmdline").write_bytes("\0".join(argv).encode() + b"\0")
+    monkeypatch.setattr(load, "PROC_ROOT", str(tmp_path))
+    assert load.active_commands() == 2
+
+
+def test_probe_load_runs_remote_load(monkeypatch, tmp_path):
+    monkeypatch.setenv("ADT_DUMMY_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("ADT_DUMMY_KUBECTL_CONTEXT", "dev")
+    monkeypatch.setattr(k8s, "kubectl_path", lambda: "kubectl")
+    result = CliRunner().invoke(cli, ["__remote", "load"])
+    assert result.exit_code == 0
+    snapshot = json.loads(result.output)
+    busy = json.dumps(dict(snapshot, active=snapshot["active"] + 3))
+
+    def fake_run(cmd, timeout=None, check=True):
+        pod = cmd[cmd.index("--") - 1]
+        if pod == "pod-slow":
+            raise AppError("Command timed out")
+        output = {"pod-a": busy, "pod-b": result.output, "pod-old": ""}[pod]
+        return subprocess.CompletedProcess(cmd, 0 if output else 2, output, "")
+
+    monkeypatch.setattr(k8s, "run_command", fake_run)
+    scores = k8s.probe_load("ns", ["pod-a", "pod-b", "pod-old", "pod-slow"])
+    assert set(scores) == {"pod-a", "pod-b"}
+    assert scores["pod-a"] > scores["pod-b"]
+    assert k8s.cooling_pods("ns") == {"pod-slow"}
+
+
+def test_find_pod_skips_failed_pods_and_rotates(monkeypatch, tmp_path):
+    monkeypatch.setenv("ADT_DUMMY_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("ADT_DUMMY_KUBECTL_CONTEXT", "dev")
+    monkeypatch.setenv("ADT_DUMMY_POD_STRATEGY", "round-robin")
+    data = {
+        "items": [
+            {"metadata": {"name": name}, "status": {"phase": "Running"}}
+            for name in ("pod-a", "pod-b", "pod-c")
+        ]
+    }
+    monkeypatch.setattr(k8s, "get_pods_json", lambda *args, **kwargs: data)
+    first = k8s.find_pod("ns", "app=a")
+    picks = [first] + [k8s.find_pod("ns", "app=a") for _ in range(2)]
+    assert sorted(picks) == ["pod-a", "pod-b", "pod-c"]
+
+    k8s.mark_pod_failed("ns", "pod-b")
+    assert k8s.cooling_pods("ns") == {"pod-b"}
+    assert "pod-b" not in {k8s.find_pod("ns", "app=a") for _ in range(3)}
+    monkeypatch.setenv("ADT_DUMMY_POD_COOLDOWN_SECONDS", "0")
+    assert k8s.cooling_pods("ns") == set()
+
+
+def test_cached_pod_reuses_selection(monkeypatch, tmp_path):
+    monkeypatch.setenv("ADT_DUMMY_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("ADT_DUMMY_KUBECTL_CONTEXT", "dev")
+    lookups = []
+
+    def fake_find_pod(namespace, selector, explicit_pod=None, timeout=None):
+        lookups.append(selector)
+        return f"pod-{len(lookups)}"
+
+    monkeypatch.setattr(k8s, "find_pod", fake_find_pod)
+    assert k8s.cached_pod("ns", "app=a") == ("pod-1", False)
+    assert k8s.cached_pod("ns", "app=a") == ("pod-1", True)
+    assert k8s.cached_pod("ns", "app=b") == ("pod-2", False)
+    monkeypatch.setenv("ADT_DUMMY_KUBECTL_CONTEXT", "prod")
+    assert k8s.cached_pod("ns", "app=a") == ("pod-3", False)
+
+    k8s.forget_pod("ns", "app=a")
+    assert k8s.cached_pod("ns", "app=a") == ("pod-4", False)
+    monkeypatch.setenv("ADT_DUMMY_POD_CACHE_TTL_SECONDS", "0")
+    assert k8s.cached_pod("ns", "app=a") == ("pod-5", False)
+
+
+def test_current_context_cached_until_kubeconfig_changes(monkeypatch, tmp_path):
+    kubeconfig = tmp_path / "config"
+    kubeconfig.write_text("current-context: dev\n")
+    monkeypatch.setenv("ADT_DUMMY_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("KUBECONFIG", str(kubeconfig))
+    monkeypatch.delenv("ADT_DUMMY_KUBECTL_CONTEXT", raising=False)
+    monkeypatch.setattr(k8s, "kubectl_path", lambda: "kubectl")
+    calls = []
+
+    def fake_run_command(args, **kwargs):
+        calls.append(args)
+        return subprocess.CompletedProcess(args, 0, stdout=f"ctx-{len(calls)}\n", stderr="")
+
+    monkeypatch.setattr(k8s, "run_command", fake_run_command)
+    assert k8s.get_current_context() == "ctx-1"
+    assert k8s.get_current_context() == "ctx-1"
+    os.utime(kubeconfig, ns=(0, 10**9))
+    assert k8s.get_current_context() == "ctx-2"
+    assert len(calls) == 2
+
+
+def test_proxy_rediscovers_when_cached_pod_is_gone(monkeypatch):
+    pods = iter([("old", True), ("new", False)])
+    monkeypatch.setattr(local, "cached_pod", lambda *args, **kwargs: next(pods))
+    forgotten = []
+    monkeypatch.setattr(local, "forget_pod", lambda *args: forgotten.append(args))
+    failed = []
+    monkeypatch.setattr(local, "mark_pod_failed", lambda namespace, pod: failed.append(pod))
+    monkeypatch.setattr(local, "pod_is_gone", lambda namespace, pod, timeout=None: True)
+    execs = []
+
+    def fake_exec(namespace, pod, command_args, **options):
+        execs.append(pod)
+        if pod == "old":
+            raise AppError('pods "old" not found')
+        return "ok"
+
+    monkeypatch.setattr(local, "_exec_in_pod", fake_exec)
+    assert local.proxy_to_remote(["dami", "version"], capture_output=True) == "ok"
+    assert execs == ["old", "new"]
+    assert len(forgotten) == 1
+    assert failed == ["old"]
+
+
+def test_proxy_keeps_error_from_live_pod(monkeypatch):
+    monkeypatch.setattr(local, "cached_pod", lambda *args, **kwargs: ("pod-a", True))
+    monkeypatch.setattr(local, "pod_is_gone", lambda namespace, pod, timeout=None: False)
+
+    def fake_exec(namespace, pod, command_args, **options):
+        raise AppError("query failed")
+
+    monkeypatch.setattr(local, "_exec_in_pod", fake_exec)
+    with pytest.raises(AppError, match="query failed"):
+        local.proxy_to_remote(["dami", "query"], capture_output=True)
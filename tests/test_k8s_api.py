@@ -0,0 +1,195 @@
+import base64
+import hashlib
+import io
+import json
+import struct
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from adt_dummy import k8s, k8s_api, local
+from adt_dummy.core.errors import AppError
+
+pytest.importorskip("yaml")
+pytest.importorskip("websocket")
+
+PODS = {
+    "items": [
+        {"metadata": {"name": "toolbox-a"}, "status": {"phase": "Pending"}},
+        {"metadata": {"name": "toolbox-b"}, "status": {"phase": "Running"}},
+    ]
+}
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def _read_frame(rfile):
+    first, second = rfile.read(2)
+    length = second & 0x7F
+    if length == 126:
+        (length,) = struct.unpack(">H", rfile.read(2))
+    elif length == 127:
+        (length,) = struct.unpack(">Q", rfile.read(8))
+    mask = rfile.read(4)
+    payload = bytes(b ^ mask[i % 4] for i, b in enumerate(rfile.read(length)))
+    return first & 0x0F, payload
+
+
+def _write_frame(wfile, payload, opcode=0x2):
+    header = bytes([0x80 | opcode])
+    if len(payload) < 126:
+        header += bytes([len(payload)])
+    elif len(payload) < 65536:
+        header += bytes([126]) + struct.pack(">H", len(payload))
+    else:
+        header += bytes([127]) + struct.pack(">Q", len(payload))
+    wfile.write(header + payload)
+    wfile.flush()
+
+
+class _FakeApi(BaseHTTPRequestHandler):
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        self.requests.append((self.command, url.path, query, self.headers.get("Authorization")))
+        if url.path.endswith("/exec"):
+            return self._exec(query)
+        if url.path == "/api/v1/namespaces/ns/pods":
+            return self._reply(200, PODS)
+        if url.path == "/api/v1/namespaces/ns/pods/toolbox-b":
+            return self._reply(200, PODS["items"][1])
+        self._reply(404, {"kind": "Status", "reason": "NotFound", "message": "not found"})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests.append((self.command, self.path, body, self.headers.get("Authorization")))
+        allowed = body["spec"]["resourceAttributes"]["namespace"] == "ns"
+        self._reply(201, {"status": {"allowed": allowed}})
+
+    def _exec(self, query):
+        key = self.headers["Sec-WebSocket-Key"] + WS_GUID
+        accept = base64.b64encode(hashlib.sha1(key.encode()).digest()).decode()
+        self.send_response(101)
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept)
+        self.send_header("Sec-WebSocket-Protocol", k8s_api.EXEC_PROTOCOL)
+        self.end_headers()
+        self.wfile.flush()
+
+        received = b""
+        if query["stdin"] == ["true"]:
+            while True:
+                _, payload = _read_frame(self.rfile)
+                if payload == bytes([k8s_api.CLOSE, k8s_api.STDIN]):
+                    break
+                received += payload[1:]
+        _write_frame(self.wfile, bytes([k8s_api.STDOUT]) + received.upper())
+        _write_frame(self.wfile, bytes([k8s_api.STDERR]) + b"note\n")
+        if query["command"][-1] == "fail":
+            status = {
+                "status": "Failure",
+                "reason": "NonZeroExitCode",
+                "details": {"causes": [{"reason": "ExitCode", "message": "3"}]},
+            }
+        else:
+            status = {"status": "Success"}
+        _write_frame(self.wfile, bytes([k8s_api.ERROR]) + json.dumps(status).encode())
+        _write_frame(self.wfile, struct.pack(">H", 1000), opcode=0x8)
+        self.close_connection = True
+
+
+@pytest.fixture
+def api(monkeypatch, tmp_path):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeApi)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    (tmp_path / "token").write_text("secret\n")
+    kubeconfig = tmp_path / "config"
+    kubeconfig.write_text(
+        f"""
+current-context: dev
+contexts:
+- name: dev
+  context: {{cluster: local, user: me}}
+clusters:
+- name: local
+  cluster: {{server: "http://127.0.0.1:{server.server_address[1]}"}}
+users:
+- name: me
+  user: {{tokenFile: token}}
+"""
+    )
+    monkeypatch.setenv("KUBECONFIG", str(kubeconfig))
+    monkeypatch.setenv("ADT_DUMMY_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("ADT_DUMMY_K8S_BACKEND", "api")
+    monkeypatch.delenv("ADT_DUMMY_KUBECTL_CONTEXT", raising=False)
+    monkeypatch.setattr(k8s_api, "_clients", {})
+    _FakeApi.requests = []
+    yield _FakeApi.requests
+    server.shutdown()
+    server.server_close()
+
+
+def test_api_backend_lookups(api):
+    assert k8s.get_current_context() == "dev"
+    assert k8s.find_pod("ns", "app=toolbox") == "toolbox-b"
+    assert k8s.find_pod("ns", "app=toolbox", explicit_pod="toolbox-b") == "toolbox-b"
+    with pytest.raises(AppError, match="Pod not found: gone"):
+        k8s.find_pod("ns", "app=toolbox", explicit_pod="gone")
+    assert k8s.pod_is_gone("ns", "gone")
+    assert not k8s.pod_is_gone("ns", "toolbox-b")
+    assert k8s.can_exec("ns") == "yes"
+    assert k8s.can_exec("other") == "no"
+
+    assert api[0][2] == {"labelSelector": ["app=toolbox"]}
+    assert {request[3] for request in api} == {"Bearer secret"}
+
+
+def test_api_exec_streams_and_reports_exit_code(api, capfd):
+    stdout, stderr = io.BytesIO(), io.BytesIO()
+    client = k8s_api.client()
+    assert client.exec("ns", "toolbox-b", ["dami"], stdout, stderr, input_data=b"x" * 70000) == 0
+    assert stdout.getvalue() == b"X" * 70000
+    assert stderr.getvalue() == b"note\n"
+    assert client.exec("ns", "toolbox-b", ["dami", "fail"], stdout, stderr) == 3
+
+    options = dict(
+        tty=False,
+        interactive=False,
+        needs_stdin=True,
+        stdin_data="select 1",
+        timeout=10,
+        capture_output=True,
+        stream_to=None,
+        on_control=None,
+    )
+    assert local._exec_in_pod("ns", "toolbox-b", ["dami"], **options) == "SELECT 1"
+    with pytest.raises(AppError) as excinfo:
+        local._exec_in_pod("ns", "toolbox-b", ["dami", "fail"], **options)
+    assert excinfo.value.exit_code == 3
+    assert "note\n" in capfd.readouterr().err
+    command, path, query, _ = api[-1]
+    assert path == "/api/v1/namespaces/ns/pods/toolbox-b/exec"
+    assert query["command"] == ["dami", "fail"]
+
+
+def test_auto_backend_needs_the_websocket_client(api, monkeypatch):
+    monkeypatch.setenv("ADT_DUMMY_K8S_BACKEND", "auto")
+    assert k8s.api_client() is k8s_api.client()
+    monkeypatch.setitem(sys.modules, "websocket", None)
+    assert k8s.api_client() is None
@@ -0,0 +1,128 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from adt_dummy.cli import cli
+from adt_dummy.commands import meta as meta_cmd
+from adt_dummy.services import meta
+
+COLUMNS = [
+    ["sales", "orders", "order_id", "bigint", 1],
+    ["sales", "orders", "customer_id", "bigint", 2],
+    ["sales", "customers", "customer_id", "bigint", 1],
+    ["sales", "customers", "full_name", "varchar", 2],
+    ["web", "events", "event_time", "timestamp(3)", 1],
+]
+
+
+def _metadata(cursor, sql):
+    if sql == "SHOW CATALOGS":
+        return [("Catalog", "varchar")], [["hive"], ["system"]]
+    if "schemata" in sql:
+        return [("schema_name", "varchar")], [["sales"], ["web"]]
+    if ".tables" in sql:
+        tables = (("sales", "customers"), ("sales", "orders"), ("web", "events"))
+        description = [("table_schema", "varchar"), ("table_name", "varchar")]
+        return description, [[schema, table, "BASE TABLE"] for schema, table in tables]
+    rows = [row for row in COLUMNS if "'web'" not in sql or row[0] == "web"]
+    return [("table_schema", "varchar")] * 5, rows
+
+
+@pytest.fixture
+def meta_trino(fake_trino):
+    fake_trino.respond = _metadata
+    return fake_trino
+
+
+def _cache(tmp_path):
+    return meta.MetadataCache(tmp_path / "meta.sqlite3", "ns")
+
+
+def test_bulk_load_stores_each_schema_and_searches_columns(meta_trino, tmp_path):
+    records = list(meta.load(["schemas", "tables", "columns"], "hive"))
+    assert [record["level"] for record in records] == ["schemas"] + ["tables"] * 2 + ["columns"] * 2
+    assert '"hive".information_schema.columns' in meta_trino.executed[-1]
+    assert "table_schema <> 'information_schema'" in meta_trino.executed[-1]
+
+    with _cache(tmp_path) as cache:
+        for record in records:
+            cache.store(record)
+        assert cache.is_fresh("columns", "hive", "sales")
+        assert not cache.is_fresh("columns", "hive", "other")
+        assert cache.tables("hive", "sales") == [
+            ["customers", "BASE TABLE"],
+            ["orders", "BASE TABLE"],
+        ]
+        assert cache.columns("hive", "sales", "orders") == [
+            ["order_id", "bigint"],
+            ["customer_id", "bigint"],
+        ]
+        assert cache.search("CUSTOMER") == [
+            ["hive", "sales", "customers", "customer_id", "bigint"],
+            ["hive", "sales", "orders", "customer_id", "bigint"],
+        ]
+        assert cache.search("_id", limit=1) == [
+            ["hive", "sales", "customers", "customer_id", "bigint"]
+        ]
+        assert cache.search("%") == []
+        assert cache.complete_tables("hive.s") == ["hive.sales.customers", "hive.sales.orders"]
+        assert cache.complete_schemas("hive.w") == ["hive.web"]
+
+        cache.store({"level": "columns", "catalog": "hive", "schema": "web", "columns": []})
+        assert cache.search("event") == []
+        assert cache.search("full") != []
+
+
+def test_requested_schemas_without_rows_are_recorded(meta_trino):
+    records = list(meta.load(["columns"], "hive", ["web", "empty"]))
+    assert [(record["schema"], len(record["columns"])) for record in records] == [
+        ("web", 1),
+        ("empty", 0),
+    ]
+
+
+def test_columns_load_one_schema_once_and_complete_from_cache(meta_trino, monkeypatch, tmp_path):
+    monkeypatch.setenv("ADT_DUMMY_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("ADT_DUMMY_KUBECTL_CONTEXT", "dev")
+    calls = []
+
+    def fake_proxy(command_args, stream_to, **kwargs):
+        calls.append(command_args)
+        result = CliRunner().invoke(cli, command_args[1:])
+        assert result.exit_code == 0, result.output
+        for start in range(0, len(result.output), 7):
+            stream_to.write(result.output[start : start + 7].encode())
+
+    monkeypatch.setattr(meta_cmd, "proxy_to_remote", fake_proxy)
+    runner = CliRunner(mix_stderr=False)
+    for _ in range(2):
+        result = runner.invoke(cli, ["meta", "columns", "Hive.Sales.Orders", "--format", "json"])
+        assert result.exit_code == 0, result.stderr
+        assert json.loads(result.stdout)[1] == {"column": "customer_id", "type": "bigint"}
+    assert calls == [
+        [
+            "dami",
+            "__remote",
+            "meta",
+            "load",
+            "--level",
+            "columns",
+            "--catalog",
+            "hive",
+            "--schema",
+            "sales",
+        ]
+    ]
+
+    complete = meta_cmd.meta_columns_cmd.params[-1].shell_complete
+    names = [item.value for item in complete(None, "hive.sales.c")]
+    assert names == ["hive.sales.customers"]
+
+    result = runner.invoke(cli, ["meta", "columns", "hive.sales.missing"])
+    assert result.exit_code != 0
+    assert len(calls) == 1
+
+    monkeypatch.setenv("ADT_DUMMY_META_COLUMNS_TTL_SECONDS", "-1")
+    runner.invoke(cli, ["meta", "columns", "hive.sales.orders"])
+    assert len(calls) == 2
@@ -1,5 +1,10 @@
+import io
 import json
 
+import pytest
+from click.testing import CliRunner
+
+from adt_dummy.cli import cli
 from adt_dummy.core import output
 
 
@@ -26,3 +31,76 @@ def test_format_json():
     rendered = output.format_output(columns, rows, "json")
     data = json.loads(rendered)
     assert data == [{"a": 1, "b": "x"}]
+
+
+def test_write_csv_stream_flushes_batches():
+    sink = io.BytesIO()
+    output.write_stream(["a", "b"], [[(1, "x")], [(2, "y")]], "csv", sink)
+    assert sink.getvalue().decode().replace("\r\n", "\n") == "a,b\n1,x\n2,y\n"
+
+
+def test_write_jsonl_stream():
+    sink = io.BytesIO()
+    output.write_stream(["a", "b"], [[(1, "x")], [(2, "y")]], "jsonl", sink)
+    lines = sink.getvalue().decode().splitlines()
+    assert [json.loads(line) for line in lines] == [{"a": 1, "b": "x"}, {"a": 2, "b": "y"}]
+
+
+def _table(batches, **options):
+    sink = io.BytesIO()
+    output.write_stream(["id", "name"], batches, "table", sink, **options)
+    return sink.getvalue().decode()
+
+
+def test_table_stream_matches_format_table_when_it_fits():
+    rows = [(1, "x"), (22, None)]
+    assert _table([rows[:1], rows[1:]]) == output.format_table(["id", "name"], rows) + "\n"
+
+
+def test_table_stream_spills_with_exact_widths():
+    batches = [[(1, "short")], [(22, "a much longer name")]]
+    lines = _table(batches, max_memory=1).splitlines()
+    assert lines[0] == "|   id | name               |"
+    assert lines[1] == "|------|--------------------|"
+    assert lines[2] == "|    1 | short              |"
+    assert lines[3] == "|   22 | a much longer name |"
+
+
+def test_table_stream_sample_truncates_outliers():
+    batches = [[(1, "abc")], [(2, "abcdefghij")]]
+    lines = _table(batches, sample_rows=1).splitlines()
+    assert lines[0] == "|   id | name   |"
+    assert lines[3] == "|    2 | abc... |"
+
+
+def test_replace_on_success_keeps_the_old_file_on_failure(tmp_path):
+    path = tmp_path / "out.csv"
+    path.write_text("old\n")
+    with pytest.raises(KeyboardInterrupt):
+        with output.replace_on_success(path) as handle:
+            handle.write(b"partial")
+            raise KeyboardInterrupt
+    assert path.read_text() == "old\n"
+    assert list(tmp_path.iterdir()) == [path]
+
+    with output.replace_on_success(path, "w") as handle:
+        handle.write("new\n")
+    assert path.read_text() == "new\n"
+
+
+def test_failed_query_leaves_output_file_untouched(fake_trino, tmp_path):
+    def respond(cursor, sql):
+        cursor.error = RuntimeError("connection reset")
+        return [("n", "integer")], [[i] for i in range(5)]
+
+    fake_trino.respond = respond
+    path = tmp_path / "out.csv"
+    path.write_text("previous result\n")
+    for fmt in ("csv", "json"):
+        result = CliRunner().invoke(
+            cli,
+            ["__remote", "query", "--stdin", "--format", fmt, "--output", str(path)],
+            input="SELECT n FROM t",
+        )
+        assert result.exit_code != 0
+    assert path.read_text() == "previous result\n"
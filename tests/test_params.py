@@ -13,3 +13,20 @@ def test_apply_params():
 def test_parse_params_rejects_invalid():
     with pytest.raises(AppError):
         trino.parse_params(["NOEQUALS"])
+
+
+def test_prepare_params_binds_typed_values():
+    params = trino.parse_params(["DAY=2024-01-01", "NAME=O'Brien"])
+    sql = "SELECT * FROM t -- {{DAY}}\nWHERE day = {{DAY:date}} AND name = {{NAME}}"
+    query = trino.prepare_params(sql, params)
+    assert query.sql == "SELECT * FROM t -- {{DAY}}\nWHERE day = ? AND name = ?"
+    assert query.values == ("CAST('2024-01-01' AS DATE)", "'O''Brien'")
+
+
+def test_prepare_params_rejects_quoted_and_missing_placeholders():
+    with pytest.raises(AppError, match="inside quotes"):
+        trino.prepare_params("SELECT '{{DAY}}'", {"DAY": "x"})
+    with pytest.raises(AppError, match="No value"):
+        trino.prepare_params("SELECT {{DAY}}", {})
+    with pytest.raises(AppError, match="Invalid parameter type"):
+        trino.prepare_params("SELECT {{DAY:date); DROP}}", {"DAY": "x"})
@@ -0,0 +1,33 @@
+import io
+import sys
+
+from adt_dummy.core.proc import stream_command
+
+
+def test_stream_command_copies_stdout_bytes():
+    sink = io.BytesIO()
+    code = "import sys; sys.stdout.buffer.write(sys.stdin.buffer.read().upper() + b'\\xff')"
+    returncode = stream_command([sys.executable, "-c", code], sink, input_data="abc")
+    assert returncode == 0
+    assert sink.getvalue() == b"ABC\xff"
+
+
+def test_stream_command_propagates_exit_code():
+    sink = io.BytesIO()
+    code = "import sys; print('partial'); sys.exit(3)"
+    assert stream_command([sys.executable, "-c", code], sink) == 3
+    assert sink.getvalue().strip() == b"partial"
+
+
+def test_stream_command_hands_control_lines_to_callback(capfd):
+    sink = io.BytesIO()
+    messages = []
+    code = (
+        'import sys; sys.stderr.write(\'working\\r\\x1eadt-dummy:{"kind": "stats"}\\n\');'
+        "sys.stderr.write('done\\n'); print('out')"
+    )
+    returncode = stream_command([sys.executable, "-c", code], sink, on_control=messages.append)
+    assert returncode == 0
+    assert sink.getvalue().strip() == b"out"
+    assert messages == [b'{"kind": "stats"}']
+    assert capfd.readouterr().err == "working\rdone\n"
@@ -0,0 +1,124 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from adt_dummy.services import profile
+
+QUERY_INFO = {
+    "queryId": "20240101_000000_00001_abcde",
+    "state": "FINISHED",
+    "finalQueryInfo": True,
+    "queryStats": {
+        "elapsedTime": "2.50s",
+        "queuedTime": "10.00ms",
+        "planningTime": "120.00ms",
+        "totalCpuTime": "4.00s",
+        "peakUserMemoryReservation": "1.50MB",
+        "rawInputPositions": 1000,
+        "rawInputDataSize": "64.00kB",
+        "spilledDataSize": "0B",
+    },
+    "outputStage": {
+        "stageId": "20240101_000000_00001_abcde.0",
+        "state": "FINISHED",
+        "stageStats": {
+            "totalScheduledTime": "1.00s",
+            "totalCpuTime": "500.00ms",
+            "operatorSummaries": [
+                {
+                    "stageId": 0,
+                    "pipelineId": 0,
+                    "operatorId": 1,
+                    "planNodeId": "5",
+                    "operatorType": "TaskOutputOperator",
+                    "addInputWall": "10.00ms",
+                    "getOutputWall": "0.00ns",
+                    "finishWall": "1.00ms",
+                    "inputPositions": 10,
+                }
+            ],
+        },
+        "subStages": [
+            {
+                "stageId": "20240101_000000_00001_abcde.1",
+                "state": "FINISHED",
+                "stageStats": {
+                    "totalScheduledTime": "3.00s",
+                    "spilledDataSize": "2.00MB",
+                    "operatorSummaries": [
+                        {
+                            "stageId": 1,
+                            "pipelineId": 0,
+                            "operatorId": 0,
+                            "planNodeId": "0",
+                            "operatorType": "TableScanOperator",
+                            "addInputWall": "0.00ns",
+                            "getOutputWall": "2.00s",
+                            "finishWall": "0.00ns",
+                            "getOutputCpu": "1.50s",
+                            "inputPositions": 1000,
+                            "inputDataSize": "64.00kB",
+                            "spilledDataSize": "2.00MB",
+                        }
+                    ],
+                },
+            }
+        ],
+    },
+}
+
+
+def test_parse_duration_and_data_size():
+    assert profile.parse_duration("12.50ms") == pytest.approx(0.0125)
+    assert profile.parse_duration("2.00m") == 120
+    assert profile.parse_data_size("1.50MB") == 1572864
+    assert profile.parse_data_size("0B") == 0
+
+
+def test_summarize_orders_operators_by_wall_time():
+    summary = profile.summarize(QUERY_INFO)
+    assert [stage["stage"][-2:] for stage in summary["stages"]] == [".0", ".1"]
+    assert summary["stages"][1]["spilled_bytes"] == 2 * 1024 * 1024
+    top = summary["operators"][0]
+    assert top["operator"] == "TableScanOperator"
+    assert top["wall_seconds"] == pytest.approx(2.0)
+    assert top["cpu_seconds"] == pytest.approx(1.5)
+
+    rendered = profile.format_profile(summary)
+    assert "elapsed 2.50s" in rendered
+    assert rendered.index("TableScanOperator") < rendered.index("TaskOutputOperator")
+
+
+def test_fetch_query_info_uses_trino_settings(monkeypatch):
+    seen = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            seen["path"] = self.path
+            seen["user"] = self.headers["X-Trino-User"]
+            body = json.dumps(QUERY_INFO).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("ADT_DUMMY_TRINO_HOST", "127.0.0.1")
+    monkeypatch.setenv("ADT_DUMMY_TRINO_PORT", str(server.server_address[1]))
+    monkeypatch.setenv("ADT_DUMMY_TRINO_HTTP_SCHEME", "http")
+    monkeypatch.setenv("ADT_DUMMY_TRINO_USER", "analyst")
+    monkeypatch.setenv("ADT_DUMMY_TRINO_PASSWORD", "secret")
+    try:
+        info = profile.fetch_query_info(QUERY_INFO["queryId"])
+    finally:
+        server.shutdown()
+
+    assert info["queryId"] == QUERY_INFO["queryId"]
+    assert seen == {"path": f"/v1/query/{QUERY_INFO['queryId']}", "user": "analyst"}
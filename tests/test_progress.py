@@ -0,0 +1,68 @@
+import io
+import sys
+
+import pytest
+
+from adt_dummy.commands import query
+from adt_dummy.core.control import ControlCollector
+from adt_dummy.services.progress import QueryMonitor, format_progress
+
+
+def test_format_progress_shows_splits_and_sizes():
+    line = format_progress(
+        {
+            "state": "RUNNING",
+            "elapsedTimeMillis": 2500,
+            "queuedTimeMillis": 100,
+            "cpuTimeMillis": 4000,
+            "processedRows": 1_250_000,
+            "processedBytes": 3 * 1024 * 1024,
+            "totalSplits": 40,
+            "completedSplits": 10,
+        }
+    )
+    assert "RUNNING" in line
+    assert "elapsed 2.5s" in line
+    assert "rows 1.2M" in line
+    assert "bytes 3.0MB" in line
+    assert "splits 10/40 (25%)" in line
+
+
+def test_format_progress_handles_missing_stats():
+    assert format_progress({}).startswith("STARTING")
+
+
+def test_monitor_final_snapshot(fake_trino):
+    monitor = QueryMonitor()
+    cursor = fake_trino.cursor(stats={"state": "FINISHED", "processedRows": 5})
+    monitor.start(cursor)
+    monitor.finish()
+    assert monitor.final["query_id"] == cursor.query_id
+    assert monitor.final["stats"]["processedRows"] == 5
+
+
+def test_control_collector_keeps_last_message_per_kind():
+    collector = ControlCollector()
+    collector(b'{"kind": "stats", "data": {"a": 1}}')
+    collector(b"not json")
+    collector(b'{"kind": "stats", "data": {"a": 2}}')
+    assert collector.get("stats") == {"a": 2}
+    assert collector.get("profile") is None
+
+
+class _Tty(io.StringIO):
+    def isatty(self):
+        return True
+
+
+@pytest.mark.parametrize(
+    "stdout, output_path, expected",
+    [(_Tty(), None, False), (_Tty(), "out.csv", True), (io.StringIO(), None, True)],
+)
+def test_progress_defaults_off_when_rows_share_the_terminal(
+    monkeypatch, stdout, output_path, expected
+):
+    monkeypatch.setattr(sys, "stderr", _Tty())
+    monkeypatch.setattr(sys, "stdout", stdout)
+    options = query.QueryOptions(output_path=output_path)
+    assert query._default_progress(options) is expected
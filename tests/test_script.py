@@ -0,0 +1,30 @@
+from adt_dummy.services import trino
+
+
+def _select_rows(cursor, sql):
+    if sql.startswith("SELECT"):
+        return [("value", "varchar")], [[sql]]
+    return None
+
+
+def test_statement_kind():
+    assert trino.statement_kind("SELECT 1") == "query"
+    assert trino.statement_kind("-- note\nWITH t AS (SELECT 1) SELECT * FROM t") == "query"
+    assert trino.statement_kind("SET SESSION query_max_run_time = '1h'") == "session"
+    assert trino.statement_kind("USE hive.default") == "session"
+    assert trino.statement_kind("INSERT INTO t VALUES (1)") == "other"
+
+
+def test_run_script_parallel_keeps_order_and_replays_session(fake_trino):
+    fake_trino.respond = _select_rows
+    statements = ["USE hive.default", "SELECT 1", "SELECT 2", "SELECT 3"]
+
+    results = list(trino.run_script(statements, parallel=2))
+
+    assert [result[0] for result in results] == [1, 2, 3, 4]
+    assert [result[3] for result in results[1:]] == [[["SELECT 1"]], [["SELECT 2"]], [["SELECT 3"]]]
+    main, *workers = fake_trino.connections
+    assert main.executed == ["USE hive.default"]
+    assert workers
+    for worker in workers:
+        assert worker.executed[0] == "USE hive.default"
@@ -0,0 +1,107 @@
+import io
+import os
+import signal
+import socket
+import sys
+import threading
+
+import click
+
+from adt_dummy.core import framing
+from adt_dummy.services import server, trino
+
+
+@click.group()
+def group():
+    pass
+
+
+@group.command(name="query")
+@click.option("--fail", is_flag=True)
+def fake_query(fail):
+    sql = click.get_text_stream("stdin").read()
+    click.echo(sql.upper(), nl=False)
+    click.echo("note", err=True)
+    if fail:
+        raise SystemExit(3)
+
+
+@group.command(name="slow")
+def slow():
+    with trino.QueryScope():
+        trino.execute_query("SELECT 1")
+
+
+@group.command(name="crash")
+def crash():
+    raise RuntimeError("boom")
+
+
+def _forward(monkeypatch, socket_path, args, stdin):
+    stdout = io.TextIOWrapper(io.BytesIO())
+    stderr = io.TextIOWrapper(io.BytesIO())
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(stdin)))
+    monkeypatch.setattr(sys, "stdout", stdout)
+    monkeypatch.setattr(sys, "stderr", stderr)
+    exit_code = server.forward(args, read_stdin=True, path=socket_path)
+    return exit_code, stdout.buffer.getvalue(), stderr.buffer.getvalue()
+
+
+def test_forward_runs_command_on_server(monkeypatch, tmp_path):
+    socket_path = str(tmp_path / "server.sock")
+    query_server = server.QueryServer(socket_path, group)
+    thread = threading.Thread(target=query_server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        assert _forward(monkeypatch, socket_path, ["query"], b"select 1") == (
+            0,
+            b"SELECT 1",
+            b"note\n",
+        )
+        exit_code, _, _ = _forward(monkeypatch, socket_path, ["query", "--fail"], b"x")
+        assert exit_code == 3
+        monkeypatch.setattr(server, "FORWARDED_COMMANDS", {"query", "crash"})
+        assert _forward(monkeypatch, socket_path, ["crash"], b"") == (1, b"", b"Error: boom\n")
+    finally:
+        query_server.shutdown()
+        query_server.server_close()
+
+
+def test_forward_falls_back_without_server(tmp_path):
+    assert server.forward(["query"], read_stdin=True, path=str(tmp_path / "missing.sock")) is None
+
+
+def _block_until_cancelled(cursor, sql):
+    if not cursor.cancelled.wait(5):
+        raise AssertionError("query was never cancelled")
+    raise RuntimeError("Query was canceled")
+
+
+def test_interrupt_and_disconnect_cancel_the_served_query(fake_trino, monkeypatch, tmp_path):
+    fake_trino.respond = _block_until_cancelled
+    monkeypatch.setattr(server, "FORWARDED_COMMANDS", {"slow"})
+    socket_path = str(tmp_path / "server.sock")
+    query_server = server.QueryServer(socket_path, group)
+    threading.Thread(target=query_server.serve_forever, daemon=True).start()
+    try:
+        timer = threading.Timer(0.2, os.kill, args=(os.getpid(), signal.SIGINT))
+        timer.start()
+        exit_code, _, err = _forward(monkeypatch, socket_path, ["slow"], b"")
+        assert exit_code == trino.INTERRUPT_EXIT_CODE
+        assert b"interrupted" in err
+        assert fake_trino.cursors[0].cancelled.is_set()
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+            with sock.makefile("rwb") as stream:
+                framing.write_json_frame(stream, framing.REQUEST, {"args": ["slow"]})
+                framing.write_frame(stream, framing.STDIN, b"")
+                stream.flush()
+                for _ in range(50):
+                    if len(fake_trino.cursors) == 2:
+                        break
+                    threading.Event().wait(0.05)
+        assert fake_trino.cursors[1].cancelled.wait(2)
+    finally:
+        query_server.shutdown()
+        query_server.server_close()
@@ -0,0 +1,112 @@
+import io
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+import adt_dummy
+from adt_dummy.cli import cli
+from adt_dummy.core import framing
+from adt_dummy.core.errors import AppError
+from adt_dummy.services import session
+
+
+def _session_statements(cursor, sql):
+    conn = cursor.conn
+    if sql.startswith("USE"):
+        conn.schema = sql.split()[1]
+        return None
+    if "missing" in sql:
+        raise RuntimeError("Table does not exist")
+    return [("n", "integer"), ("schema", "varchar")], [
+        [i, getattr(conn, "schema", None)] for i in range(1, 4)
+    ]
+
+
+@pytest.fixture
+def session_trino(fake_trino):
+    fake_trino.respond = _session_statements
+    return fake_trino
+
+
+def test_statements_share_one_connection_and_its_session(session_trino):
+    current = session.Session()
+    assert current.run("USE hive.sales")["output"] == ""
+    result = current.run("SELECT n FROM t", fmt="csv", max_rows=2)
+    assert result["output"].splitlines() == ["n,schema", "1,hive.sales", "2,hive.sales"]
+    assert (result["rows"], result["truncated"]) == (2, True)
+    with pytest.raises(AppError, match="read-only"):
+        current.run("DROP TABLE t")
+    current.close()
+    assert len(session_trino.connections) == 1
+
+
+def test_repl_runs_multiline_statements_and_meta_commands(session_trino, monkeypatch):
+    monkeypatch.setenv("ADT_DUMMY_IN_CLUSTER", "1")
+    script = (
+        "\\format csv\nUSE hive.sales; SELECT\n  n FROM t;\nDROP TABLE t;\n\\max-rows 1\nSELECT 1"
+    )
+    result = CliRunner(mix_stderr=False).invoke(cli, ["sql"], input=script)
+
+    assert result.exit_code == 0, result.stderr
+    csv = ["n,schema", "1,hive.sales", "2,hive.sales", "3,hive.sales"]
+    assert result.stdout.split("\n") == csv + csv[:2] + [""]
+    assert "format: csv" in result.stderr
+    assert "Query rejected" in result.stderr
+    assert "(1 row, " in result.stderr and "truncated" in result.stderr
+    assert len(session_trino.connections) == 1
+    assert session_trino.connections[0].executed == [
+        "USE hive.sales",
+        "SELECT\n  n FROM t",
+        "SELECT 1",
+    ]
+
+
+def test_serve_answers_requests_until_stdin_closes(session_trino):
+    requests = io.BytesIO()
+    for sql in ("SELECT 1", "SELECT * FROM missing", "SELECT 2"):
+        framing.write_json_frame(
+            requests, framing.REQUEST, {"sql": sql, "format": "jsonl", "max_rows": 0}
+        )
+    requests.seek(0)
+    replies = io.BytesIO()
+    session.serve(requests, replies)
+
+    replies.seek(0)
+    frames = []
+    while (frame := framing.read_frame(replies)) is not None:
+        frames.append(frame)
+    kinds = [kind for kind, _ in frames]
+    assert kinds == [framing.STDOUT, framing.EXIT, framing.EXIT, framing.STDOUT, framing.EXIT]
+    assert "Table does not exist" in framing.read_json(frames[2][1])["error"]
+    assert framing.read_json(frames[4][1])["rows"] == 3
+
+
+def test_remote_session_talks_to_a_long_lived_process(monkeypatch, capfd):
+    code = textwrap.dedent(
+        """
+        import sys
+        sys.path.insert(0, sys.argv[1])
+        from conftest import FakeTrino
+        from test_sql import _session_statements
+        from adt_dummy.services import session, trino
+        fake = FakeTrino(_session_statements)
+        trino._trino_connection = fake.connect
+        session.serve(sys.stdin.buffer, sys.stdout.buffer)
+        print("connections:", len(fake.connections), file=sys.stderr)
+        """
+    )
+    monkeypatch.setenv("PYTHONPATH", str(Path(adt_dummy.__file__).parents[1]))
+    remote = session.RemoteSession([sys.executable, "-c", code, str(Path(__file__).parent)])
+    remote.run("USE hive.web")
+    result = remote.run("SELECT 1", fmt="csv")
+    with pytest.raises(AppError, match="does not exist"):
+        remote.run("SELECT * FROM missing")
+    again = remote.run("SELECT 1", fmt="csv")
+    remote.close()
+
+    assert result["output"].splitlines()[1] == "1,hive.web"
+    assert again["output"] == result["output"]
+    assert "connections: 1" in capfd.readouterr().err
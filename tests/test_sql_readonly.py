@@ -31,3 +31,22 @@ def test_read_only_allows_keyword_as_identifier():
 
 def test_read_only_blocks_set_role():
     assert not trino.is_read_only_sql("SET ROLE admin")
+
+
+def test_split_keeps_strings_and_comments():
+    sql = "SELECT ';' AS semi -- trailing; comment\nFROM t; /* block; */ SHOW TABLES; -- end"
+    assert trino.split_sql_statements(sql) == [
+        "SELECT ';' AS semi -- trailing; comment\nFROM t",
+        "/* block; */ SHOW TABLES",
+    ]
+
+
+@pytest.mark.parametrize("sql", ["SELECT/* hint */1", "SELECT a--c\nFROM t", "a--x\nb"])
+def test_split_does_not_glue_words_around_comments(sql):
+    assert trino.split_sql_statements(sql + ";") == [sql]
+
+
+def test_read_only_large_values_list():
+    values = ", ".join(f"({i}, 'DROP ''{i}''')" for i in range(20000))
+    assert trino.is_read_only_sql(f"SELECT * FROM (VALUES {values}) AS t(id, name)")
+    assert not trino.is_read_only_sql(f"INSERT INTO t VALUES {values}")
@@ -0,0 +1,81 @@
+import io
+import os
+import sys
+
+import pytest
+
+from adt_dummy.core import transport
+from adt_dummy.core.errors import AppError
+from adt_dummy.core.proc import stream_command
+
+CODECS = [codec for codec in transport.CODECS if transport.available(codec)]
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_compressed_stream_round_trip(codec):
+    raw = io.BytesIO()
+    writer = transport.CompressingWriter(raw, codec, transport.DEFAULT_LEVELS[codec])
+    payload = b"".join(b"%d,row %d\n" % (i, i) for i in range(50000))
+    for start in range(0, len(payload), 1000):
+        writer.write(payload[start : start + 1000])
+    writer.close()
+    assert len(raw.getvalue()) < len(payload)
+
+    out = io.BytesIO()
+    sink = transport.DecompressingSink(out, codec)
+    data = raw.getvalue()
+    for start in range(0, len(data), 333):
+        sink.write(data[start : start + 333])
+    sink.check_complete()
+    assert out.getvalue() == payload
+
+    reader = io.BufferedReader(transport.DecompressingReader(io.BytesIO(data), codec))
+    assert reader.read() == payload
+
+
+def test_truncated_stream_is_reported():
+    data = transport.compress_all("gzip", 6, b"x" * 10000)
+    sink = transport.DecompressingSink(io.BytesIO(), "gzip")
+    sink.write(data[:-4])
+    with pytest.raises(AppError, match="ended early"):
+        sink.check_complete()
+
+
+def test_flag_is_added_after_remote_and_stripped_for_the_server():
+    args = transport.with_flag(["dami", "__remote", "query", "--stdin"], "zstd:3")
+    assert args == ["dami", "__remote", "--compress", "zstd:3", "query", "--stdin"]
+    assert transport.strip_flag(args[2:]) == ["query", "--stdin"]
+    assert transport.strip_flag(["query"]) == ["query"]
+
+
+def test_parse_spec_validates_codec_and_level():
+    assert transport.parse_spec("gzip") == ("gzip", 6)
+    assert transport.parse_spec("zstd:-1") == ("zstd", -1)
+    with pytest.raises(AppError, match="Unknown"):
+        transport.parse_spec("brotli:3")
+    with pytest.raises(AppError, match="between"):
+        transport.parse_spec("gzip:12")
+
+
+def test_local_spec_honours_env(monkeypatch):
+    monkeypatch.setenv("ADT_DUMMY_TRANSPORT_COMPRESSION", "none")
+    assert transport.local_spec() is None
+    monkeypatch.setenv("ADT_DUMMY_TRANSPORT_COMPRESSION", "gzip")
+    monkeypatch.setenv("ADT_DUMMY_TRANSPORT_COMPRESSION_LEVEL", "1")
+    assert transport.local_spec() == "gzip:1"
+
+
+def test_remote_command_reads_and_writes_compressed_streams(monkeypatch):
+    code = "for i in range(2000):\n    print(f'{i},' + 'ab' * 20)\n"
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join(sys.path))
+    monkeypatch.setenv("ADT_DUMMY_IN_CLUSTER", "1")
+    command = [sys.executable, "-c", "from adt_dummy.cli import main; main()"]
+    command += ["__remote", "--compress", "gzip:1", "py", "--stdin", "run"]
+    out = io.BytesIO()
+    sink = transport.DecompressingSink(out, "gzip")
+    stdin_data = transport.compress_all("gzip", 1, code)
+    assert stream_command(command, sink, input_data=stdin_data) == 0
+    sink.check_complete()
+    lines = out.getvalue().decode().splitlines()
+    assert len(lines) == 2000
+    assert lines[-1] == "1999," + "ab" * 20
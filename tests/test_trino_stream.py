@@ -0,0 +1,67 @@
+import pytest
+
+from adt_dummy.core.errors import AppError
+from adt_dummy.services import trino
+
+DESCRIPTION = [("n", "integer")]
+
+
+def test_row_batches_respects_batch_size(fake_trino):
+    batches = trino.RowBatches(
+        fake_trino.cursor(DESCRIPTION, [[i] for i in range(5)]), max_rows=0, batch_size=2
+    )
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert batches.row_count == 5
+    assert not batches.truncated
+
+
+def test_row_batches_truncates_at_max_rows(fake_trino):
+    batches = trino.RowBatches(
+        fake_trino.cursor(DESCRIPTION, [[i] for i in range(5)]), max_rows=3, batch_size=2
+    )
+    assert [row for batch in batches for row in batch] == [[0], [1], [2]]
+    assert batches.truncated
+
+
+def test_row_batches_exact_max_rows_is_not_truncated(fake_trino):
+    batches = trino.RowBatches(
+        fake_trino.cursor(DESCRIPTION, [[i] for i in range(3)]), max_rows=3, batch_size=10
+    )
+    assert sum(len(batch) for batch in batches) == 3
+    assert not batches.truncated
+
+
+def test_row_batches_prefetch_keeps_order_and_truncation(fake_trino):
+    batches = trino.RowBatches(
+        fake_trino.cursor(DESCRIPTION, [[i] for i in range(25)]),
+        max_rows=20,
+        batch_size=3,
+        prefetch=2,
+    )
+    assert [row[0] for batch in batches for row in batch] == list(range(20))
+    assert batches.row_count == 20
+    assert batches.truncated
+
+
+def test_row_batches_prefetch_reraises_fetch_errors(fake_trino):
+    batches = trino.RowBatches(
+        fake_trino.cursor(DESCRIPTION, [[1], [2]], error=RuntimeError("connection reset")),
+        max_rows=0,
+        batch_size=1,
+        prefetch=1,
+    )
+    with pytest.raises(AppError, match="connection reset"):
+        list(batches)
+
+
+def test_row_batches_prefetch_stops_producer_when_abandoned(fake_trino):
+    batches = trino.RowBatches(
+        fake_trino.cursor(DESCRIPTION, [[i] for i in range(100)]),
+        max_rows=0,
+        batch_size=1,
+        prefetch=1,
+    )
+    iterator = iter(batches)
+    assert next(iterator) == [[0]]
+    iterator.close()
+    assert batches.row_count < 100
@@ -0,0 +1,139 @@
+import io
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from trino.client import NamedRowTuple
+
+from adt_dummy.core import wire
+from adt_dummy.core.errors import AppError
+from adt_dummy.core.output import format_output
+from adt_dummy.services import trino
+
+ROWS = [
+    [
+        1,
+        "a\nb",
+        None,
+        1.5,
+        True,
+        Decimal("12.30"),
+        date(2024, 1, 2),
+        datetime(2024, 1, 2, 3, 4, 5, 678000),
+        datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=3))),
+        time(12, 30),
+        b"\x00\xff",
+        uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        [date(2024, 1, 1), None],
+        {"k": Decimal("1.0"), "$": 2},
+        NamedRowTuple([1, "x"], ["id", "name"], ["integer", "varchar"]),
+        timedelta(days=1, seconds=2),
+    ]
+]
+COLUMNS = [f"c{i}" for i in range(len(ROWS[0]))]
+TYPES = [
+    "integer",
+    "varchar",
+    "varchar",
+    "double",
+    "boolean",
+    "decimal(4,2)",
+    "date",
+    "timestamp(6)",
+    "timestamp(0) with time zone",
+    "time(0)",
+    "varbinary",
+    "uuid",
+    "array(date)",
+    "map(varchar, decimal(2,1))",
+    "row(id integer, name varchar)",
+    "interval day to second",
+]
+
+
+@pytest.fixture
+def stream(fake_trino):
+    def write(rows, max_rows=0, batch_size=1):
+        cursor = fake_trino.cursor(list(zip(COLUMNS, TYPES)), rows)
+        sink = io.BytesIO()
+        wire.write_result(trino.RowBatches(cursor, max_rows, batch_size), sink)
+        return sink.getvalue()
+
+    return write
+
+
+def _receive(data, render, chunk=7):
+    receiver = wire.ResultReceiver(render, queue_size=1)
+    with receiver:
+        for start in range(0, len(data), chunk):
+            receiver.write(data[start : start + chunk])
+    return receiver
+
+
+def test_rows_decode_to_the_values_the_client_returned():
+    decoded = wire.decode_rows(wire.encode_rows(ROWS, TYPES), TYPES)
+    assert decoded == ROWS
+    assert [type(value) for value in decoded[0]] == [type(value) for value in ROWS[0]]
+    assert repr(decoded[0][14]) == repr(ROWS[0][14])
+    for fmt in ("table", "csv", "json", "jsonl"):
+        assert format_output(COLUMNS, decoded, fmt) == format_output(COLUMNS, ROWS, fmt)
+
+
+def test_values_that_do_not_match_the_column_type_keep_their_type():
+    rows = [["2024-01-01", Decimal("1.5")], [None, None]]
+    types = ["date", "varchar"]
+    assert wire.decode_rows(wire.encode_rows(rows, types), types) == rows
+
+
+def test_receiver_renders_batches_with_schema_and_truncation(stream):
+    seen = {}
+
+    def render(batches):
+        seen["columns"] = batches.columns
+        seen["rows"] = [row for batch in batches for row in batch]
+        seen["truncated"] = batches.truncated
+        seen["count"] = batches.row_count
+
+    _receive(stream(ROWS * 5, max_rows=3), render)
+    assert seen == {"columns": COLUMNS, "rows": ROWS * 3, "truncated": True, "count": 3}
+
+
+def test_receiver_reports_a_stream_that_ends_early(stream):
+    data = stream(ROWS * 3)
+    with pytest.raises(AppError, match="ended early"):
+        _receive(data[:-10], lambda batches: list(batches))
+
+
+def test_receiver_stops_the_transfer_when_rendering_fails(stream):
+    def render(batches):
+        raise OSError("broken pipe")
+
+    receiver = wire.ResultReceiver(render, queue_size=1)
+    data = stream(ROWS * 50)
+    with pytest.raises(OSError, match="broken pipe"):
+        with receiver:
+            for start in range(0, len(data), 64):
+                receiver.write(data[start : start + 64])
+
+
+def test_local_query_renders_cached_results_in_any_format(stream, monkeypatch, tmp_path):
+    from adt_dummy.commands import query
+
+    calls = []
+
+    def fake_proxy(command_args, stream_to, **kwargs):
+        calls.append(command_args)
+        stream_to.write(stream(ROWS * 4, batch_size=3))
+
+    monkeypatch.setattr(query, "proxy_to_remote", fake_proxy)
+    monkeypatch.setenv("ADT_DUMMY_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("ADT_DUMMY_KUBECTL_CONTEXT", "dev")
+    for fmt in ("csv", "json"):
+        options = query.QueryOptions(fmt=fmt, max_rows=0, output_path=str(tmp_path / fmt))
+        query._query_local("SELECT 1", options, use_cache=True, refresh=False, cache_ttl=60)
+        expected = format_output(COLUMNS, ROWS * 4, fmt)
+        assert (tmp_path / fmt).read_bytes().decode().strip() == expected.strip()
+
+    assert len(calls) == 1
+    assert "--wire" in calls[0]